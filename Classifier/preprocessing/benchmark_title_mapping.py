@@ -0,0 +1,60 @@
+# benchmark_title_mapping.py
+"""
+Row-wise .apply vs distinct-value mapping of SF CallType.
+
+Times the old per-row apply of create_montgomery_format / map_sf_to_taxonomy
+against create_titles / map_taxonomy on the full SF export, and checks that
+both give identical results.
+
+Usage:
+    python benchmark_title_mapping.py
+    python benchmark_title_mapping.py --data C:/Capstone/SF_data.csv --repeat 3
+"""
+import os
+import sys
+import argparse
+from time import perf_counter
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from utils.dataset_loader import load_dataset
+from sf_fix_vocabulary import SF_PATH, create_montgomery_format, create_titles
+from sf_preprocessing import map_sf_to_taxonomy, map_taxonomy
+
+
+def best_of(fn, repeat):
+    best, result = None, None
+    for _ in range(repeat):
+        started = perf_counter()
+        result = fn()
+        elapsed = perf_counter() - started
+        best = elapsed if best is None else min(best, elapsed)
+    return best, result
+
+
+def compare(name, call_types, rowwise, vectorized, repeat):
+    # row-wise baseline runs on plain strings, as the scripts used to
+    as_object = call_types.astype(object)
+    old_s, old = best_of(lambda: as_object.apply(rowwise), repeat)
+    new_s, new = best_of(lambda: vectorized(call_types), repeat)
+    if not old.astype(object).equals(new.astype(object)):
+        raise AssertionError(f"{name}: vectorized output differs from row-wise apply")
+    print(f"{name:<22}{old_s:>12.3f}{new_s:>12.3f}{old_s / max(new_s, 1e-9):>10.1f}x")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark SF CallType title/taxonomy mapping")
+    parser.add_argument('--data', default=SF_PATH)
+    parser.add_argument('--repeat', type=int, default=1)
+    args = parser.parse_args()
+
+    sf = load_dataset(args.data, ['CallType'], {'CallType': 'category'})
+    print(f"{len(sf):,} rows, {sf['CallType'].nunique()} distinct CallTypes\n")
+
+    print(f"{'mapping':<22}{'apply s':>12}{'distinct s':>12}{'speedup':>11}")
+    print("-" * 57)
+    compare('montgomery title', sf['CallType'], create_montgomery_format, create_titles, args.repeat)
+    compare('taxonomy', sf['CallType'], map_sf_to_taxonomy, map_taxonomy, args.repeat)
+
+
+if __name__ == '__main__':
+    main()
@@ -405,81 +405,88 @@ TRAFFIC_TEMPLATES = {
     ]
 }
 
-print("="*70)
-print("GENERATING NATURAL LANGUAGE AUGMENTATION DATASET")
-print("="*70)
+TEMPLATES_BY_TYPE = {
+    'EMS': EMS_TEMPLATES,
+    'Fire': FIRE_TEMPLATES,
+    'Traffic': TRAFFIC_TEMPLATES,
+}
+
+if __name__ == '__main__':
+    print("="*70)
+    print("GENERATING NATURAL LANGUAGE AUGMENTATION DATASET")
+    print("="*70)
 
-# Load original Montgomery data
-print("\nLoading Montgomery dataset...")
-df = pd.read_csv('C:/Capstone/Data/cleaned_data.csv')
-print(f"Original dataset: {len(df):,} records")
+    # Load original Montgomery data
+    print("\nLoading Montgomery dataset...")
+    df = pd.read_csv('C:/Capstone/Data/cleaned_data.csv')
+    print(f"Original dataset: {len(df):,} records")
 
-# Create augmented dataset
-augmented_records = []
+    # Create augmented dataset
+    augmented_records = []
 
-print("\nGenerating natural language variations...")
+    print("\nGenerating natural language variations...")
 
-# Process each row in Montgomery data
-for idx, row in df.iterrows():
-    emergency_type = row['emergency_type']
-    emergency_subtype = row['emergency_subtype']
+    # Process each row in Montgomery data
+    for idx, row in df.iterrows():
+        emergency_type = row['emergency_type']
+        emergency_subtype = row['emergency_subtype']
     
-    # Select appropriate template dictionary
-    if emergency_type == 'EMS':
-        templates = EMS_TEMPLATES
-    elif emergency_type == 'Fire':
-        templates = FIRE_TEMPLATES
-    elif emergency_type == 'Traffic':
-        templates = TRAFFIC_TEMPLATES
-    else:
-        continue
+        # Select appropriate template dictionary
+        if emergency_type == 'EMS':
+            templates = EMS_TEMPLATES
+        elif emergency_type == 'Fire':
+            templates = FIRE_TEMPLATES
+        elif emergency_type == 'Traffic':
+            templates = TRAFFIC_TEMPLATES
+        else:
+            continue
     
-    # If we have templates for this subtype, create variations
-    if emergency_subtype in templates:
-        # Pick 1 random variation for this record (to keep dataset manageable)
-        natural_desc = random.choice(templates[emergency_subtype])
+        # If we have templates for this subtype, create variations
+        if emergency_subtype in templates:
+            # Pick 1 random variation for this record (to keep dataset manageable)
+            natural_desc = random.choice(templates[emergency_subtype])
         
-        # Create augmented record
-        augmented_records.append({
-            'emergency_title': natural_desc,
-            'emergency_type': emergency_type,
-            'emergency_subtype': emergency_subtype,
-            'latitude': row.get('latitude'),
-            'longitude': row.get('longitude'),
-            'zipcode': row.get('zipcode'),
-            'timestamp': row.get('timestamp'),
-            'district': row.get('district')
-        })
+            # Create augmented record
+            augmented_records.append({
+                'emergency_title': natural_desc,
+                'emergency_type': emergency_type,
+                'emergency_subtype': emergency_subtype,
+                'latitude': row.get('latitude'),
+                'longitude': row.get('longitude'),
+                'zipcode': row.get('zipcode'),
+                'timestamp': row.get('timestamp'),
+                'district': row.get('district')
+            })
     
-    if (idx + 1) % 10000 == 0:
-        print(f"  Processed {idx + 1:,} records...")
+        if (idx + 1) % 10000 == 0:
+            print(f"  Processed {idx + 1:,} records...")
 
-# Create augmented dataframe
-augmented_df = pd.DataFrame(augmented_records)
+    # Create augmented dataframe
+    augmented_df = pd.DataFrame(augmented_records)
 
-print(f"\n✅ Generated {len(augmented_df):,} natural language records")
+    print(f"\n✅ Generated {len(augmented_df):,} natural language records")
 
-# Combine original + augmented
-combined_df = pd.concat([df, augmented_df], ignore_index=True)
+    # Combine original + augmented
+    combined_df = pd.concat([df, augmented_df], ignore_index=True)
 
-print(f"\n📊 Combined Dataset Statistics:")
-print(f"  Original records: {len(df):,}")
-print(f"  Augmented records: {len(augmented_df):,}")
-print(f"  Total records: {len(combined_df):,}")
+    print(f"\n📊 Combined Dataset Statistics:")
+    print(f"  Original records: {len(df):,}")
+    print(f"  Augmented records: {len(augmented_df):,}")
+    print(f"  Total records: {len(combined_df):,}")
 
-print(f"\n  Emergency type distribution:")
-for etype in ['EMS', 'Fire', 'Traffic']:
-    count = len(combined_df[combined_df['emergency_type'] == etype])
-    pct = (count / len(combined_df)) * 100
-    print(f"    {etype}: {count:,} ({pct:.1f}%)")
+    print(f"\n  Emergency type distribution:")
+    for etype in ['EMS', 'Fire', 'Traffic']:
+        count = len(combined_df[combined_df['emergency_type'] == etype])
+        pct = (count / len(combined_df)) * 100
+        print(f"    {etype}: {count:,} ({pct:.1f}%)")
 
-# Save combined dataset
-output_path = 'C:/Capstone/Data/montgomery_with_natural_language.csv'
-combined_df.to_csv(output_path, index=False)
+    # Save combined dataset
+    output_path = 'C:/Capstone/Data/montgomery_with_natural_language.csv'
+    combined_df.to_csv(output_path, index=False)
 
-print(f"\n✅ Saved combined dataset to:")
-print(f"   {output_path}")
-print("\n" + "="*70)
-print("AUGMENTATION COMPLETE")
-print("="*70)
-print("\nNext step: Retrain classifiers on combined dataset")
\ No newline at end of file
+    print(f"\n✅ Saved combined dataset to:")
+    print(f"   {output_path}")
+    print("\n" + "="*70)
+    print("AUGMENTATION COMPLETE")
+    print("="*70)
+    print("\nNext step: Retrain classifiers on combined dataset")
\ No newline at end of file
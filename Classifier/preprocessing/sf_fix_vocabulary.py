@@ -1,9 +1,37 @@
+import os
+import sys
+import numpy as np
 import pandas as pd
 
-# Load SF data
-print("Loading SF data...")
-sf = pd.read_csv('C:/Capstone/SF_data.csv', low_memory=False)
-print(f"Loaded {len(sf)} rows")
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from utils.dataset_loader import load_dataset
+from utils.text_mapping import keyword_pattern, map_distinct
+
+SF_PATH = 'C:/Capstone/SF_data.csv'
+
+# EMS mappings
+EMS_KEYWORDS = [
+    'MEDICAL', 'ILLNESS', 'INJURY', 'CARDIAC', 'OVERDOSE',
+    'SEIZURE', 'BREATHING', 'UNCONSCIOUS', 'CHEST PAIN'
+]
+
+# Fire mappings
+FIRE_KEYWORDS = [
+    'FIRE', 'EXPLOSION', 'SMOKE', 'ALARM', 'HAZMAT', 'GAS LEAK',
+    'ELECTRICAL HAZARD', 'FUEL SPILL', 'ODOR'
+]
+
+# Traffic mappings
+TRAFFIC_KEYWORDS = [
+    'VEHICLE', 'ACCIDENT', 'COLLISION', 'TRAFFIC', 'EXTRICATION'
+]
+
+# checked in this order, like the if/elif chain below
+CATEGORY_PATTERNS = [
+    ('Fire', keyword_pattern(FIRE_KEYWORDS)),
+    ('EMS', keyword_pattern(EMS_KEYWORDS)),
+    ('Traffic', keyword_pattern(TRAFFIC_KEYWORDS)),
+]
 
 # Map SF CallType to Montgomery-style emergency_title format
 def create_montgomery_format(call_type):
@@ -14,57 +42,60 @@ def create_montgomery_format(call_type):
     """
     call_type_clean = str(call_type).strip().upper()
     
-    # EMS mappings
-    ems_keywords = [
-        'MEDICAL', 'ILLNESS', 'INJURY', 'CARDIAC', 'OVERDOSE', 
-        'SEIZURE', 'BREATHING', 'UNCONSCIOUS', 'CHEST PAIN'
-    ]
-    
-    # Fire mappings
-    fire_keywords = [
-        'FIRE', 'EXPLOSION', 'SMOKE', 'ALARM', 'HAZMAT', 'GAS LEAK',
-        'ELECTRICAL HAZARD', 'FUEL SPILL', 'ODOR'
-    ]
-    
-    # Traffic mappings
-    traffic_keywords = [
-        'VEHICLE', 'ACCIDENT', 'COLLISION', 'TRAFFIC', 'EXTRICATION'
-    ]
-    
     # Determine category and format like Montgomery
-    if any(kw in call_type_clean for kw in fire_keywords):
+    if any(kw in call_type_clean for kw in FIRE_KEYWORDS):
         return f"Fire: {call_type_clean}"
-    elif any(kw in call_type_clean for kw in ems_keywords):
+    elif any(kw in call_type_clean for kw in EMS_KEYWORDS):
         return f"EMS: {call_type_clean}"
-    elif any(kw in call_type_clean for kw in traffic_keywords):
+    elif any(kw in call_type_clean for kw in TRAFFIC_KEYWORDS):
         return f"Traffic: {call_type_clean}"
     else:
         return None  # Incompatible type
 
-# Create Montgomery-style emergency_title
-print("\nCreating Montgomery-format titles...")
-sf['emergency_title'] = sf['CallType'].apply(create_montgomery_format)
-
-# Filter out incompatible types (None values)
-sf_compatible = sf[sf['emergency_title'].notna()].copy()
-
-# Extract emergency_type from the prefix
-sf_compatible['emergency_type'] = sf_compatible['emergency_title'].str.split(':', n=1).str[0]
-
-print(f"\n=== Preprocessing Results ===")
-print(f"Original SF rows: {len(sf)}")
-print(f"Compatible rows: {len(sf_compatible)} ({len(sf_compatible)/len(sf)*100:.1f}%)")
-print(f"\nDistribution:")
-print(sf_compatible['emergency_type'].value_counts())
-
-print(f"\nSample transformed titles:")
-for et in ['EMS', 'Fire', 'Traffic']:
-    print(f"\n{et} examples:")
-    samples = sf_compatible[sf_compatible['emergency_type'] == et]['emergency_title'].unique()[:3]
-    for s in samples:
-        print(f"  {s}")
-
-# Save processed data
-output_path = 'C:/Capstone/Data/sf_montgomery_format.csv'
-sf_compatible[['emergency_title', 'emergency_type']].to_csv(output_path, index=False)
-print(f"\nSaved to: {output_path}")
\ No newline at end of file
+
+def montgomery_titles(call_types):
+    """Vectorized create_montgomery_format over a Series of (distinct) CallTypes."""
+    clean = call_types.astype(str).str.strip().str.upper()
+    conditions = [clean.str.contains(pattern) for _, pattern in CATEGORY_PATTERNS]
+    choices = [category + ': ' + clean for category, _ in CATEGORY_PATTERNS]
+    return np.select(conditions, choices, default=None)
+
+
+def create_titles(call_types):
+    """Montgomery-format title for every row, computed once per distinct CallType."""
+    return map_distinct(call_types, montgomery_titles)
+
+
+if __name__ == '__main__':
+    # Load SF data (CallType is the only column used; categorical keeps it small)
+    print("Loading SF data...")
+    sf = load_dataset(SF_PATH, ['CallType'], {'CallType': 'category'}, cache=False)
+    print(f"Loaded {len(sf)} rows")
+
+    # Create Montgomery-style emergency_title (once per distinct CallType)
+    print("\nCreating Montgomery-format titles...")
+    sf['emergency_title'] = create_titles(sf['CallType'])
+
+    # Filter out incompatible types (None values)
+    sf_compatible = sf[sf['emergency_title'].notna()].copy()
+
+    # Extract emergency_type from the prefix
+    sf_compatible['emergency_type'] = sf_compatible['emergency_title'].str.split(':', n=1).str[0]
+
+    print(f"\n=== Preprocessing Results ===")
+    print(f"Original SF rows: {len(sf)}")
+    print(f"Compatible rows: {len(sf_compatible)} ({len(sf_compatible)/len(sf)*100:.1f}%)")
+    print(f"\nDistribution:")
+    print(sf_compatible['emergency_type'].value_counts())
+
+    print(f"\nSample transformed titles:")
+    for et in ['EMS', 'Fire', 'Traffic']:
+        print(f"\n{et} examples:")
+        samples = sf_compatible[sf_compatible['emergency_type'] == et]['emergency_title'].unique()[:3]
+        for s in samples:
+            print(f"  {s}")
+
+    # Save processed data
+    output_path = 'C:/Capstone/Data/sf_montgomery_format.csv'
+    sf_compatible[['emergency_title', 'emergency_type']].to_csv(output_path, index=False)
+    print(f"\nSaved to: {output_path}")
\ No newline at end of file
@@ -1,48 +1,71 @@
+import os
+import sys
+import numpy as np
 import pandas as pd
 
-# Load SF data
-sf = pd.read_csv('C:/Capstone/SF_data.csv')
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from utils.dataset_loader import load_dataset
+from utils.text_mapping import keyword_pattern, map_distinct
 
-print(f"Total SF rows: {len(sf)}")
-print(f"\nUnique CallTypes: {sf['CallType'].nunique()}")
-print(f"\nCallType value counts:")
-print(sf['CallType'].value_counts().head(20))
+SF_PATH = 'C:/Capstone/SF_data.csv'
+
+# checked in order: Fire, then EMS, then Traffic
+TAXONOMY_KEYWORDS = [
+    ('Fire', ['fire', 'explosion', 'smoke', 'alarm', 'hazmat']),
+    ('EMS', ['medical', 'illness', 'injury', 'cardiac',
+             'overdose', 'seizure', 'breathing']),
+    ('Traffic', ['vehicle', 'accident', 'collision', 'traffic']),
+]
+TAXONOMY_PATTERNS = [(category, keyword_pattern(keywords)) for category, keywords in TAXONOMY_KEYWORDS]
 
 # Map SF CallType to your EMS/Fire/Traffic taxonomy
 def map_sf_to_taxonomy(call_type):
     call_type = str(call_type).lower()
     
-    # Fire mappings
-    if any(kw in call_type for kw in ['fire', 'explosion', 'smoke', 'alarm', 'hazmat']):
-        return 'Fire'
-    
-    # EMS mappings
-    if any(kw in call_type for kw in ['medical', 'illness', 'injury', 'cardiac', 
-                                        'overdose', 'seizure', 'breathing']):
-        return 'EMS'
-    
-    # Traffic mappings
-    if any(kw in call_type for kw in ['vehicle', 'accident', 'collision', 'traffic']):
-        return 'Traffic'
+    for category, keywords in TAXONOMY_KEYWORDS:
+        if any(kw in call_type for kw in keywords):
+            return category
     
     return 'Other'
 
-# Apply mapping
-sf['emergency_type'] = sf['CallType'].apply(map_sf_to_taxonomy)
-
-print(f"\n=== Mapped SF Data ===")
-print(sf['emergency_type'].value_counts())
-print(f"\nSample mappings:")
-for et in ['EMS', 'Fire', 'Traffic']:
-    print(f"\n{et} examples:")
-    print(sf[sf['emergency_type'] == et]['CallType'].value_counts().head(5))
-
-# Keep only EMS/Fire/Traffic (drop 'Other')
-sf_clean = sf[sf['emergency_type'].isin(['EMS', 'Fire', 'Traffic'])].copy()
-print(f"\n=== After filtering ===")
-print(f"Total compatible rows: {len(sf_clean)}")
-print(sf_clean['emergency_type'].value_counts())
-
-# Save for validation
-sf_clean[['CallType', 'emergency_type']].to_csv('C:/Capstone/Data/sf_clean_mapped.csv', index=False)
-print("\nSaved to C:/Capstone/Data/sf_clean_mapped.csv")
\ No newline at end of file
+
+def taxonomy_for(call_types):
+    """Vectorized map_sf_to_taxonomy over a Series of (distinct) CallTypes."""
+    lowered = call_types.astype(str).str.lower()
+    conditions = [lowered.str.contains(pattern) for _, pattern in TAXONOMY_PATTERNS]
+    return np.select(conditions, [category for category, _ in TAXONOMY_PATTERNS], default='Other')
+
+
+def map_taxonomy(call_types):
+    """Taxonomy for every row, computed once per distinct CallType."""
+    return map_distinct(call_types, taxonomy_for)
+
+
+if __name__ == '__main__':
+    # Load SF data (CallType is the only column used; categorical keeps it small)
+    sf = load_dataset(SF_PATH, ['CallType'], {'CallType': 'category'}, cache=False)
+
+    print(f"Total SF rows: {len(sf)}")
+    print(f"\nUnique CallTypes: {sf['CallType'].nunique()}")
+    print(f"\nCallType value counts:")
+    print(sf['CallType'].value_counts().head(20))
+
+    # Apply mapping
+    sf['emergency_type'] = map_taxonomy(sf['CallType'])
+
+    print(f"\n=== Mapped SF Data ===")
+    print(sf['emergency_type'].value_counts())
+    print(f"\nSample mappings:")
+    for et in ['EMS', 'Fire', 'Traffic']:
+        print(f"\n{et} examples:")
+        print(sf[sf['emergency_type'] == et]['CallType'].value_counts().head(5))
+
+    # Keep only EMS/Fire/Traffic (drop 'Other')
+    sf_clean = sf[sf['emergency_type'].isin(['EMS', 'Fire', 'Traffic'])].copy()
+    print(f"\n=== After filtering ===")
+    print(f"Total compatible rows: {len(sf_clean)}")
+    print(sf_clean['emergency_type'].value_counts())
+
+    # Save for validation
+    sf_clean[['CallType', 'emergency_type']].to_csv('C:/Capstone/Data/sf_clean_mapped.csv', index=False)
+    print("\nSaved to C:/Capstone/Data/sf_clean_mapped.csv")
\ No newline at end of file
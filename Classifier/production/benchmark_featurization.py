@@ -0,0 +1,92 @@
+# benchmark_featurization.py
+"""
+Per-call featurization cost: main + subtype `vect.transform([text])` vs the
+shared single-pass featurizer (featurizer.py).
+
+Both paths run over the same call titles. The script checks that every
+matrix matches sklearn exactly (same indices, same float values) and then
+reports the mean microseconds per call for each path.
+
+Usage:
+    python benchmark_featurization.py --calls 5000 [--compact]
+"""
+import os
+import sys
+import argparse
+from time import perf_counter
+
+from compact_model import MODELS_DIR, load_bundle
+from featurizer import projection_for, same_matrix, SharedFeaturizer
+
+SAMPLE_TITLES = [
+    "EMS - CARDIAC EMERGENCY",
+    "EMS - RESPIRATORY EMERGENCY",
+    "FIRE - BUILDING FIRE",
+    "FIRE - FIRE ALARM",
+    "TRAFFIC - VEHICLE ACCIDENT",
+    "TRAFFIC - DISABLED VEHICLE",
+    "elderly man fell down the stairs and is not responding",
+    "smoke coming from the kitchen of a two story house",
+    "two car crash on the highway with injuries",
+]
+
+
+def load_models(compact):
+    load = lambda name: load_bundle(os.path.join(MODELS_DIR, name), prefer_compact=compact)
+    main = load('XGBoost_Combined_MultiJurisdiction.pkl')
+    subtypes = {t: load(f'XGBoost_{t}_Subtype.pkl') for t in ['EMS', 'Fire', 'Traffic']}
+    return main, subtypes
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark shared vs per-model TF-IDF featurization")
+    parser.add_argument('--calls', type=int, default=5000)
+    parser.add_argument('--compact', action='store_true', help="use the compact model export")
+    args = parser.parse_args()
+
+    main_bundle, subtypes = load_models(args.compact)
+    # cycle through distinct strings so the shared path cannot reuse n-grams across calls
+    calls = [(f"{SAMPLE_TITLES[i % len(SAMPLE_TITLES)]} {i}", ['EMS', 'Fire', 'Traffic'][i % 3])
+             for i in range(args.calls)]
+
+    # reference: sklearn is the source of truth, so always compare against the pickles
+    ref_main, ref_subtypes = load_models(compact=False) if args.compact else (main_bundle, subtypes)
+    main_proj = projection_for(main_bundle['vect'])
+    sub_proj = {t: projection_for(b['vect']) for t, b in subtypes.items()}
+    featurizer = SharedFeaturizer()
+
+    mismatches = 0
+    for text, etype in calls[:500]:
+        if not same_matrix(featurizer.transform(main_proj, text), ref_main['vect'].transform([text])):
+            mismatches += 1
+        if not same_matrix(featurizer.transform(sub_proj[etype], text), ref_subtypes[etype]['vect'].transform([text])):
+            mismatches += 1
+
+    started = perf_counter()
+    for text, etype in calls:
+        main_bundle['vect'].transform([text])
+        subtypes[etype]['vect'].transform([text])
+    separate = (perf_counter() - started) / len(calls)
+
+    featurizer = SharedFeaturizer()
+    started = perf_counter()
+    for text, etype in calls:
+        featurizer.transform(main_proj, text)
+        featurizer.transform(sub_proj[etype], text)
+    shared = (perf_counter() - started) / len(calls)
+
+    print("=" * 60)
+    print(f"FEATURIZATION BENCHMARK ({len(calls):,} calls, {'compact' if args.compact else 'pickle'} models)")
+    print("=" * 60)
+    print(f"Separate transforms: {separate * 1e6:8.1f} µs/call")
+    print(f"Shared featurizer:   {shared * 1e6:8.1f} µs/call")
+    print(f"Speedup:             {separate / shared:8.2f}x")
+
+    if mismatches:
+        print(f"❌ {mismatches} matrices differ from sklearn")
+        sys.exit(1)
+    print("✅ Output identical to sklearn on the first 500 calls")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,136 @@
+# benchmark_model_load.py
+"""
+Cold-load benchmark for the classifier bundles: pickled joblib dicts vs the
+compact export (see compact_model.py).
+
+Each run happens in a fresh interpreter so nothing is already imported or
+cached in-process. For every format we report:
+  - load time of the main + three subtype bundles
+  - RSS added by loading them (measured after sklearn/xgboost are imported)
+  - whether predictions on a few sample titles match the pickled models
+
+Usage:
+    python compact_model.py            # export first
+    python benchmark_model_load.py --runs 5
+"""
+import os
+import sys
+import json
+import argparse
+import statistics
+import subprocess
+
+BUNDLES = [
+    'XGBoost_Combined_MultiJurisdiction.pkl',
+    'XGBoost_EMS_Subtype.pkl',
+    'XGBoost_Fire_Subtype.pkl',
+    'XGBoost_Traffic_Subtype.pkl',
+]
+SAMPLE_TITLES = [
+    "EMS - CARDIAC EMERGENCY",
+    "FIRE - BUILDING FIRE",
+    "TRAFFIC - VEHICLE ACCIDENT",
+    "cardiac arrest patient",
+    "structure fire reported",
+    "car crash on highway",
+]
+
+
+def rss_mb():
+    """Resident set size of this process in MB."""
+    try:
+        import psutil
+        return psutil.Process().memory_info().rss / 1024 ** 2
+    except ImportError:
+        pass
+    try:
+        with open('/proc/self/status') as f:
+            for line in f:
+                if line.startswith('VmRSS:'):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    import resource  # peak rather than current, but good enough where /proc is missing
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def measure(fmt):
+    """Child process: load every bundle in `fmt` and print one JSON line."""
+    from time import perf_counter
+    import joblib  # noqa: F401  (import cost is not part of the load time)
+    import sklearn.feature_extraction.text  # noqa: F401
+    import xgboost  # noqa: F401
+    from compact_model import MODELS_DIR, load_bundle
+
+    baseline = rss_mb()
+    started = perf_counter()
+    bundles = {
+        name: load_bundle(os.path.join(MODELS_DIR, name), prefer_compact=(fmt == 'compact'))
+        for name in BUNDLES
+    }
+    load_seconds = perf_counter() - started
+    loaded_rss = rss_mb()
+
+    predictions = {}
+    for name, bundle in bundles.items():
+        X = bundle['vect'].transform(SAMPLE_TITLES)
+        encoded = bundle['model'].predict(X)
+        predictions[name] = [str(p) for p in bundle['label_encoder'].inverse_transform(encoded)]
+
+    print(json.dumps({
+        'load_seconds': load_seconds,
+        'rss_mb': loaded_rss - baseline,
+        'predictions': predictions,
+    }))
+
+
+def run_child(fmt):
+    out = subprocess.run(
+        [sys.executable, os.path.abspath(__file__), '--child', fmt],
+        capture_output=True, text=True, check=True,
+        cwd=os.path.dirname(os.path.abspath(__file__)),
+    )
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark classifier bundle load time and memory")
+    parser.add_argument('--runs', type=int, default=5)
+    parser.add_argument('--child', choices=['pickle', 'compact'], help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        measure(args.child)
+        return
+
+    results = {}
+    for fmt in ['pickle', 'compact']:
+        runs = [run_child(fmt) for _ in range(args.runs)]
+        results[fmt] = {
+            'load_seconds': statistics.median(r['load_seconds'] for r in runs),
+            'rss_mb': statistics.median(r['rss_mb'] for r in runs),
+            'predictions': runs[0]['predictions'],
+        }
+
+    print("=" * 60)
+    print(f"MODEL LOAD BENCHMARK (median of {args.runs} cold starts)")
+    print("=" * 60)
+    print(f"{'format':<10}{'load (s)':>12}{'RSS (MB)':>12}")
+    for fmt, r in results.items():
+        print(f"{fmt:<10}{r['load_seconds']:>12.3f}{r['rss_mb']:>12.1f}")
+
+    speedup = results['pickle']['load_seconds'] / max(results['compact']['load_seconds'], 1e-9)
+    saved = results['pickle']['rss_mb'] - results['compact']['rss_mb']
+    print(f"\nLoad speedup: {speedup:.1f}x, RSS saved per worker: {saved:.1f} MB")
+
+    if results['pickle']['predictions'] == results['compact']['predictions']:
+        print("✅ Predictions match on sample titles")
+    else:
+        print("❌ Predictions differ between formats")
+        for name in BUNDLES:
+            print(f"  {name}: {results['pickle']['predictions'][name]} vs {results['compact']['predictions'][name]}")
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,78 @@
+# benchmark_vectorizers.py
+"""
+Serving cost of TF-IDF (fitted vocabulary) vs hashing bundles.
+
+For every bundle present in models/ under both names (X.pkl and
+X_Hashing.pkl) this reports the file size, the joblib load time and the
+per-call featurize + predict time. Accuracy comparisons belong to the
+validation scripts; pass them the *_Hashing.pkl path or --vectorizer hashing.
+
+Usage:
+    python benchmark_vectorizers.py --calls 2000
+"""
+import os
+import argparse
+from time import perf_counter
+import joblib
+
+from compact_model import MODELS_DIR
+
+BUNDLES = [
+    'XGBoost_Combined_MultiJurisdiction',
+    'XGBoost_EMS_Subtype',
+    'XGBoost_Fire_Subtype',
+    'XGBoost_Traffic_Subtype',
+]
+SAMPLE_TITLES = [
+    "EMS - CARDIAC EMERGENCY",
+    "FIRE - BUILDING FIRE",
+    "TRAFFIC - VEHICLE ACCIDENT",
+    "elderly man fell down the stairs and is not responding",
+    "smoke coming from the kitchen of a two story house",
+    "two car crash on the highway with injuries",
+]
+
+
+def measure(path, calls):
+    started = perf_counter()
+    bundle = joblib.load(path)
+    load_seconds = perf_counter() - started
+
+    texts = [f"{SAMPLE_TITLES[i % len(SAMPLE_TITLES)]} {i}" for i in range(calls)]
+    started = perf_counter()
+    vectors = [bundle['vect'].transform([t]) for t in texts]
+    featurize = (perf_counter() - started) / calls
+    started = perf_counter()
+    for X in vectors:
+        bundle['model'].predict(X)
+    predict = (perf_counter() - started) / calls
+
+    return {
+        'size_mb': os.path.getsize(path) / 1024 ** 2,
+        'load_s': load_seconds,
+        'featurize_us': featurize * 1e6,
+        'predict_us': predict * 1e6,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare TF-IDF and hashing bundle serving cost")
+    parser.add_argument('--calls', type=int, default=2000)
+    args = parser.parse_args()
+
+    print("=" * 84)
+    print(f"{'bundle':<38}{'kind':<9}{'size MB':>9}{'load s':>9}{'feat µs':>10}{'pred µs':>10}")
+    print("=" * 84)
+    for name in BUNDLES:
+        for kind, filename in [('tfidf', f'{name}.pkl'), ('hashing', f'{name}_Hashing.pkl')]:
+            path = os.path.join(MODELS_DIR, filename)
+            if not os.path.exists(path):
+                print(f"{name:<38}{kind:<9}{'missing':>9}")
+                continue
+            r = measure(path, args.calls)
+            print(f"{name:<38}{kind:<9}{r['size_mb']:>9.2f}{r['load_s']:>9.3f}"
+                  f"{r['featurize_us']:>10.1f}{r['predict_us']:>10.1f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -4,8 +4,19 @@ ML Classifier service for emergency call classification.
 Provides both main type classification (EMS/Fire/Traffic) and 
 cascading subtype classification.
 """
-import joblib
 import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from compact_model import load_bundle
+from featurizer import projection_for, shared_featurizer
+
+# "hashing" serves the *_Hashing.pkl bundles (HashingVectorizer + idf, no vocabulary)
+VECTORIZER = os.getenv('CLASSIFIER_VECTORIZER', 'tfidf')
+
+
+def bundle_name(name):
+    return f'{name}_Hashing.pkl' if VECTORIZER == 'hashing' else f'{name}.pkl'
 
 
 class EmergencyClassifier:
@@ -14,24 +25,26 @@ class EmergencyClassifier:
     def __init__(self, model_path=None):
         if model_path is None:
             base_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))  
-            model_path = os.path.join(base_dir, 'models', 'XGBoost_Combined_MultiJurisdiction.pkl')
+            model_path = os.path.join(base_dir, 'models', bundle_name('XGBoost_Combined_MultiJurisdiction'))
         
         self.model_path = model_path
         self.model = None
         self.vectorizer = None
         self.label_encoder = None
+        self.projection = None
         self._load_model()
     
     def _load_model(self):
         """Load the trained model from disk."""
         try:
             print(f"Loading main classifier from: {self.model_path}")
-            model_bundle = joblib.load(self.model_path)
+            model_bundle = load_bundle(self.model_path)
             
             if isinstance(model_bundle, dict):
                 self.model = model_bundle.get('model')
                 self.vectorizer = model_bundle.get('vect')
                 self.label_encoder = model_bundle.get('label_encoder')
+                self.projection = projection_for(self.vectorizer)
             else:
                 self.model = model_bundle
             
@@ -46,8 +59,8 @@ class EmergencyClassifier:
         if not self.model or not self.vectorizer:
             raise Exception("Model not loaded properly")
         
-        # Vectorize text
-        text_vec = self.vectorizer.transform([text])
+        # Vectorize text (n-grams are shared with the subtype model)
+        text_vec = shared_featurizer.transform(self.projection, text)
         
         # Predict
         prediction_encoded = self.model.predict(text_vec)[0]
@@ -72,20 +85,21 @@ class SubtypeClassifier:
         
         # Load all three subtype models
         for emergency_type in ['EMS', 'Fire', 'Traffic']:
-            model_path = os.path.join(models_dir, f'XGBoost_{emergency_type}_Subtype.pkl')
+            model_path = os.path.join(models_dir, bundle_name(f'XGBoost_{emergency_type}_Subtype'))
             self.classifiers[emergency_type] = self._load_model(model_path, emergency_type)
     
     def _load_model(self, model_path, emergency_type):
         """Load a single subtype model."""
         try:
             print(f"Loading {emergency_type} subtype classifier from: {model_path}")
-            model_bundle = joblib.load(model_path)
+            model_bundle = load_bundle(model_path)
             
             if isinstance(model_bundle, dict):
                 classifier = {
                     'model': model_bundle.get('model'),
                     'vectorizer': model_bundle.get('vect'),
-                    'label_encoder': model_bundle.get('label_encoder')
+                    'label_encoder': model_bundle.get('label_encoder'),
+                    'projection': projection_for(model_bundle.get('vect'))
                 }
             else:
                 classifier = {'model': model_bundle}
@@ -110,8 +124,8 @@ class SubtypeClassifier:
             return "Unknown"
         
         try:
-            # Vectorize text
-            text_vec = classifier['vectorizer'].transform([text])
+            # Vectorize text, reusing the n-grams the main classifier extracted
+            text_vec = shared_featurizer.transform(classifier['projection'], text)
             
             # Predict
             prediction_encoded = classifier['model'].predict(text_vec)[0]
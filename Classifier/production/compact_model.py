@@ -0,0 +1,277 @@
+# compact_model.py
+"""
+Compact on-disk format for the classifier bundles.
+
+The training scripts save each model as a pickled dict
+({'model': XGBClassifier, 'vect': TfidfVectorizer, 'label_encoder': LabelEncoder}).
+Unpickling that is slow and every worker ends up with its own copy of the
+15k-entry vocabulary dict. `export_bundle` rewrites a bundle as a directory:
+
+    vocab.npy        sorted vocabulary terms (fixed-width unicode array)
+    vocab_index.npy  column index of each sorted term
+    idf.npy          idf weights by column
+    booster.ubj      XGBoost booster in its native UBJSON format
+    meta.json        vectorizer settings, label classes, source file
+
+The .npy files are opened with mmap_mode='r', so workers on the same host
+share those pages through the OS page cache. `load_bundle` returns the same
+{'model', 'vect', 'label_encoder'} dict shape as the pickle, so the service
+code does not care which format it loaded.
+
+Usage:
+    python compact_model.py                 # export every models/*.pkl bundle
+    python compact_model.py path/to/x.pkl   # export one bundle
+"""
+import os
+import sys
+import json
+import argparse
+import numpy as np
+import scipy.sparse as sp
+
+FORMAT_VERSION = 1
+MODELS_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'models')
+COMPACT_DIR = os.path.join(MODELS_DIR, 'compact')
+
+# TfidfVectorizer settings that affect transform(); copied into meta.json
+VECTORIZER_PARAMS = [
+    'input', 'encoding', 'decode_error', 'strip_accents', 'lowercase',
+    'preprocessor', 'tokenizer', 'analyzer', 'stop_words', 'token_pattern',
+    'ngram_range', 'binary', 'norm', 'use_idf', 'smooth_idf', 'sublinear_tf',
+]
+
+# settings that decide which n-grams the analyzer emits
+ANALYZER_PARAMS = [
+    'input', 'encoding', 'decode_error', 'strip_accents', 'lowercase',
+    'preprocessor', 'tokenizer', 'analyzer', 'stop_words', 'token_pattern', 'ngram_range',
+]
+
+
+def analyzer_signature(params):
+    """Hashable key: vectorizers with equal signatures produce identical n-grams."""
+    def freeze(value):
+        if isinstance(value, (list, tuple)):
+            return tuple(value)
+        if isinstance(value, (set, frozenset)):
+            return tuple(sorted(value))
+        return value
+    return tuple((name, freeze(params.get(name))) for name in ANALYZER_PARAMS)
+
+
+def compact_path(pkl_path):
+    """models/XGBoost_EMS_Subtype.pkl -> models/compact/XGBoost_EMS_Subtype"""
+    name = os.path.splitext(os.path.basename(pkl_path))[0]
+    return os.path.join(COMPACT_DIR, name)
+
+
+# -------------------------
+# Export
+# -------------------------
+def export_bundle(pkl_path, out_dir=None):
+    """Write the compact form of a pickled bundle and return its directory."""
+    import joblib
+
+    out_dir = out_dir or compact_path(pkl_path)
+    bundle = joblib.load(pkl_path)
+    if not isinstance(bundle, dict):
+        raise ValueError(f"{pkl_path} is not a model bundle dict")
+
+    vect = bundle['vect']
+    if not hasattr(vect, 'vocabulary_'):
+        raise ValueError(f"{pkl_path} has no vocabulary to compact (hashing vectorizer?)")
+    params = vect.get_params()
+    for name in ('preprocessor', 'tokenizer'):
+        if params.get(name) is not None:
+            raise ValueError(f"{pkl_path}: custom {name} cannot be exported")
+    if callable(params.get('analyzer')):
+        raise ValueError(f"{pkl_path}: custom analyzer cannot be exported")
+
+    os.makedirs(out_dir, exist_ok=True)
+
+    terms = sorted(vect.vocabulary_)
+    np.save(os.path.join(out_dir, 'vocab.npy'), np.array(terms, dtype=str))
+    np.save(os.path.join(out_dir, 'vocab_index.npy'),
+            np.array([vect.vocabulary_[t] for t in terms], dtype=np.int32))
+    if params['use_idf']:
+        np.save(os.path.join(out_dir, 'idf.npy'), np.asarray(vect.idf_, dtype=np.float64))
+
+    bundle['model'].get_booster().save_model(os.path.join(out_dir, 'booster.ubj'))
+
+    label_encoder = bundle.get('label_encoder')
+    meta = {
+        'format': FORMAT_VERSION,
+        'source': os.path.basename(pkl_path),
+        'n_features': len(terms),
+        'vectorizer': {
+            name: (list(params[name]) if isinstance(params[name], (tuple, frozenset, set)) else params[name])
+            for name in VECTORIZER_PARAMS
+        },
+        'classes': [str(c) for c in label_encoder.classes_] if label_encoder is not None else None,
+        'n_classes': int(getattr(bundle['model'], 'n_classes_', 0) or 0),
+    }
+    with open(os.path.join(out_dir, 'meta.json'), 'w', encoding='utf-8') as f:
+        json.dump(meta, f, indent=2)
+
+    return out_dir
+
+
+# -------------------------
+# Load
+# -------------------------
+class CompactVectorizer:
+    """TfidfVectorizer.transform() over a memory-mapped sorted vocabulary."""
+
+    def __init__(self, directory, meta):
+        from sklearn.feature_extraction.text import TfidfVectorizer
+
+        params = dict(meta['vectorizer'])
+        params['ngram_range'] = tuple(params['ngram_range'])
+        params.setdefault('binary', False)
+        if isinstance(params['stop_words'], list):
+            params['stop_words'] = frozenset(params['stop_words'])
+        self.params = params
+        self.n_features = meta['n_features']
+
+        # an unfitted vectorizer still builds the exact same analyzer
+        self.analyzer = TfidfVectorizer(**params).build_analyzer()
+        self.terms = np.load(os.path.join(directory, 'vocab.npy'), mmap_mode='r')
+        self.columns = np.load(os.path.join(directory, 'vocab_index.npy'), mmap_mode='r')
+        self.max_term_len = self.terms.dtype.itemsize // 4
+        idf_path = os.path.join(directory, 'idf.npy')
+        self.idf = np.load(idf_path, mmap_mode='r') if params['use_idf'] else None
+
+    def lookup(self, terms):
+        """Column index of each term, or -1 if it is not in the vocabulary."""
+        columns = np.full(len(terms), -1, dtype=np.int64)
+        candidates = [i for i, t in enumerate(terms) if len(t) <= self.max_term_len]
+        if not candidates:
+            return columns
+        wanted = np.array([terms[i] for i in candidates], dtype=self.terms.dtype)
+        pos = np.searchsorted(self.terms, wanted)
+        pos = np.minimum(pos, len(self.terms) - 1)
+        found = self.terms[pos] == wanted
+        columns[np.asarray(candidates)[found]] = self.columns[pos[found]]
+        return columns
+
+    def signature(self):
+        return analyzer_signature(self.params)
+
+    def analyze(self, text):
+        return self.analyzer(text)
+
+    def count_matrix(self, analyzed):
+        """CSR term counts for a list of analyzed documents (lists of n-grams)."""
+        indptr = [0]
+        indices = []
+        for doc in analyzed:
+            columns = self.lookup(doc)
+            columns = columns[columns >= 0]
+            indices.append(columns)
+            indptr.append(indptr[-1] + len(columns))
+        indices = np.concatenate(indices) if indices else np.empty(0, dtype=np.int64)
+        data = np.ones(len(indices), dtype=np.int64)
+        X = sp.csr_matrix((data, indices, np.asarray(indptr)), shape=(len(analyzed), self.n_features))
+        X.sum_duplicates()
+        X.sort_indices()
+        return X
+
+    def weight(self, counts):
+        """Apply sublinear tf, idf and row normalization like TfidfTransformer."""
+        X = counts.astype(np.float64)
+        if self.params['binary']:
+            X.data.fill(1)
+        if self.params['sublinear_tf']:
+            np.log(X.data, X.data)
+            X.data += 1
+        if self.idf is not None:
+            X = X @ sp.diags(np.asarray(self.idf))
+            X = sp.csr_matrix(X)
+        if self.params['norm']:
+            from sklearn.preprocessing import normalize
+            X = normalize(X, norm=self.params['norm'], copy=False)
+        return X
+
+    def transform_analyzed(self, analyzed):
+        return self.weight(self.count_matrix(analyzed))
+
+    def transform(self, texts):
+        return self.transform_analyzed([self.analyzer(t) for t in texts])
+
+
+class CompactModel:
+    """Booster loaded from UBJSON with the XGBClassifier.predict() contract."""
+
+    def __init__(self, directory, meta):
+        import xgboost as xgb
+
+        self.booster = xgb.Booster()
+        self.booster.load_model(os.path.join(directory, 'booster.ubj'))
+        self.n_classes = meta['n_classes']
+
+    def predict_proba(self, X):
+        proba = self.booster.inplace_predict(X)
+        if proba.ndim == 1:
+            proba = np.column_stack([1 - proba, proba])
+        return proba
+
+    def predict(self, X):
+        return np.argmax(self.predict_proba(X), axis=1)
+
+
+class CompactLabels:
+    """Minimal LabelEncoder stand-in for decoding predictions."""
+
+    def __init__(self, classes):
+        self.classes_ = np.array(classes, dtype=object)
+
+    def inverse_transform(self, y):
+        return self.classes_[np.asarray(y, dtype=np.int64)]
+
+
+def load_compact(directory):
+    with open(os.path.join(directory, 'meta.json'), 'r', encoding='utf-8') as f:
+        meta = json.load(f)
+    if meta.get('format') != FORMAT_VERSION:
+        raise ValueError(f"{directory}: unsupported compact model format {meta.get('format')}")
+    return {
+        'model': CompactModel(directory, meta),
+        'vect': CompactVectorizer(directory, meta),
+        'label_encoder': CompactLabels(meta['classes']) if meta['classes'] is not None else None,
+    }
+
+
+def load_bundle(pkl_path, prefer_compact=True):
+    """
+    Load a model bundle, using its compact export when one exists and is at
+    least as new as the pickle. Falls back to joblib otherwise.
+    """
+    directory = compact_path(pkl_path)
+    meta_path = os.path.join(directory, 'meta.json')
+    if prefer_compact and os.path.exists(meta_path) and (
+        not os.path.exists(pkl_path) or os.path.getmtime(meta_path) >= os.path.getmtime(pkl_path)
+    ):
+        return load_compact(directory)
+
+    import joblib
+    return joblib.load(pkl_path)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Export pickled model bundles to the compact format")
+    parser.add_argument('bundles', nargs='*', help="bundle .pkl files (default: every models/*.pkl)")
+    args = parser.parse_args()
+
+    bundles = args.bundles or sorted(
+        os.path.join(MODELS_DIR, f) for f in os.listdir(MODELS_DIR) if f.endswith('.pkl')
+    )
+    for pkl_path in bundles:
+        try:
+            out_dir = export_bundle(pkl_path)
+        except ValueError as e:
+            print(f"⏭️  Skipped {os.path.basename(pkl_path)}: {e}")
+            continue
+        print(f"✅ {os.path.basename(pkl_path)} -> {out_dir}")
+
+
+if __name__ == '__main__':
+    sys.exit(main())
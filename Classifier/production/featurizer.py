@@ -0,0 +1,184 @@
+# featurizer.py
+"""
+Single-pass TF-IDF featurization shared by the main and subtype classifiers.
+
+Every call is vectorized twice: once by the main model and once by the
+chosen subtype model. Both vectorizers use the same word (1, 3) n-gram
+analyzer, and extracting the n-grams is the expensive part. SharedFeaturizer
+analyzes each text once per distinct analyzer configuration and keeps the
+n-grams in a small LRU. Each model then only maps those n-grams to its own
+vocabulary columns and applies its own idf/normalization.
+
+The output is the same sparse matrix that `vect.transform([text])` returns.
+Hashing bundles (HashingVectorizer + TfidfTransformer pipelines) go through
+the same cache. Their "projection" is just hashing plus the stored idf.
+Projections use only public sklearn attributes, and projection_for() checks
+them against `vect.transform` on a few probe texts, falling back to plain
+`vect.transform` if a sklearn upgrade ever makes them disagree.
+"""
+import threading
+from collections import OrderedDict
+import numpy as np
+import scipy.sparse as sp
+
+from compact_model import analyzer_signature
+
+
+class SklearnProjection:
+    """Projects analyzed n-grams through a fitted sklearn TfidfVectorizer."""
+
+    def __init__(self, vect):
+        self.vect = vect
+        self.analyzer = vect.build_analyzer()
+        self._signature = analyzer_signature(vect.get_params())
+
+    def signature(self):
+        return self._signature
+
+    def analyze(self, text):
+        return self.analyzer(text)
+
+    def transform_analyzed(self, analyzed):
+        # same steps as CountVectorizer._count_vocab(fixed_vocab=True) + TfidfTransformer
+        vocabulary = self.vect.vocabulary_
+        indptr = [0]
+        indices = []
+        for doc in analyzed:
+            indices.extend(vocabulary[term] for term in doc if term in vocabulary)
+            indptr.append(len(indices))
+        data = np.ones(len(indices), dtype=self.vect.dtype)
+        X = sp.csr_matrix(
+            (data, np.asarray(indices, dtype=np.int64), np.asarray(indptr, dtype=np.int64)),
+            shape=(len(analyzed), len(vocabulary)), dtype=self.vect.dtype,
+        )
+        X.sum_duplicates()
+        X.sort_indices()
+        if self.vect.binary:
+            X.data.fill(1)
+        # same steps as TfidfTransformer.transform, from the public idf_ / norm
+        if self.vect.sublinear_tf:
+            np.log(X.data, X.data)
+            X.data += 1
+        if self.vect.use_idf:
+            X = X @ sp.diags(self.vect.idf_)
+        if self.vect.norm is not None:
+            from sklearn.preprocessing import normalize
+            X = normalize(X, norm=self.vect.norm, copy=False)
+        return X
+
+
+class HashingProjection:
+    """Projects analyzed n-grams through a HashingVectorizer -> TfidfTransformer pipeline."""
+
+    def __init__(self, pipeline):
+        self.hashing, self.tfidf = pipeline.steps[0][1], pipeline.steps[1][1]
+        self.analyzer = self.hashing.build_analyzer()
+        self._signature = analyzer_signature(self.hashing.get_params())
+        # same hasher HashingVectorizer builds, from its public params
+        from sklearn.feature_extraction import FeatureHasher
+        self.hasher = FeatureHasher(
+            n_features=self.hashing.n_features, input_type="string",
+            dtype=self.hashing.dtype, alternate_sign=self.hashing.alternate_sign,
+        )
+
+    def signature(self):
+        return self._signature
+
+    def analyze(self, text):
+        return self.analyzer(text)
+
+    def transform_analyzed(self, analyzed):
+        # same steps as HashingVectorizer.transform, then the fitted idf
+        X = self.hasher.transform(analyzed)
+        if self.hashing.binary:
+            X.data.fill(1)
+        if self.hashing.norm is not None:
+            from sklearn.preprocessing import normalize
+            X = normalize(X, norm=self.hashing.norm, copy=False)
+        return self.tfidf.transform(X, copy=False)
+
+
+class DirectProjection:
+    """Fallback: no shared analysis, just `vect.transform` on the raw text."""
+
+    def __init__(self, vect):
+        self.vect = vect
+        self._signature = ("direct", id(vect))
+
+    def signature(self):
+        return self._signature
+
+    def analyze(self, text):
+        return text
+
+    def transform_analyzed(self, analyzed):
+        return self.vect.transform(analyzed)
+
+
+# texts projection_for() checks every sklearn-backed projection against
+PROBE_TEXTS = [
+    "EMS - CARDIAC EMERGENCY",
+    "FIRE - BUILDING FIRE",
+    "TRAFFIC - VEHICLE ACCIDENT",
+    "elderly man fell down the stairs and is not responding",
+    "smoke coming from the kitchen of a two story house",
+    "",
+]
+
+
+def same_matrix(a, b):
+    """True if two sparse matrices have the same structure and bit-identical values."""
+    a, b = a.tocsr(), b.tocsr()
+    a.sort_indices()
+    b.sort_indices()
+    return (a.shape == b.shape and np.array_equal(a.indptr, b.indptr)
+            and np.array_equal(a.indices, b.indices) and np.array_equal(a.data, b.data))
+
+
+def matches_vectorizer(projection, vect, texts=PROBE_TEXTS):
+    return all(
+        same_matrix(projection.transform_analyzed([projection.analyze(t)]), vect.transform([t]))
+        for t in texts
+    )
+
+
+def projection_for(vect):
+    """Compact vectorizers already project; sklearn ones get wrapped and checked."""
+    if hasattr(vect, 'transform_analyzed'):
+        return vect
+    projection = HashingProjection(vect) if hasattr(vect, 'steps') else SklearnProjection(vect)
+    if not matches_vectorizer(projection, vect):
+        print(f"⚠️  {type(projection).__name__} does not match vect.transform; using vect.transform directly")
+        return DirectProjection(vect)
+    return projection
+
+
+class SharedFeaturizer:
+    """Caches analyzed n-grams per (analyzer, text) so each text is tokenized once."""
+
+    def __init__(self, maxsize=256):
+        self.maxsize = maxsize
+        self._ngrams = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _analyze(self, projection, text):
+        key = (projection.signature(), text)
+        with self._lock:
+            ngrams = self._ngrams.get(key)
+            if ngrams is not None:
+                self._ngrams.move_to_end(key)
+                return ngrams
+
+        ngrams = projection.analyze(text)
+        with self._lock:
+            self._ngrams[key] = ngrams
+            while len(self._ngrams) > self.maxsize:
+                self._ngrams.popitem(last=False)
+        return ngrams
+
+    def transform(self, projection, text):
+        return projection.transform_analyzed([self._analyze(projection, text)])
+
+
+# one cache for the whole process so classify_call and classify_subtype share it
+shared_featurizer = SharedFeaturizer()
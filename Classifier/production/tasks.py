@@ -15,7 +15,9 @@ sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(__file__)), 'cri
 # Import database config and classifier
 sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..', 'crisislens-API'))
 from db_config import get_connection
+from latency_metrics import mark, record_stages, WORKER_STAGES
 from Classifier.production.classifier_service import classify_call, classify_subtype
+from rq import get_current_job
 
 
 def calculate_age_group(age):
@@ -43,7 +45,18 @@ def generate_response_time(emergency_type):
         return random.randint(8, 15)
 
 
-def process_emergency_call(raw_call_id):
+def record_latency(trace):
+    """Push this job's stage timings to the shared Redis histograms (RQ jobs only)."""
+    job = get_current_job()
+    if job is None:
+        return
+    try:
+        record_stages(job.connection, trace, WORKER_STAGES)
+    except Exception as e:
+        print(f"⚠️  Could not record latency for call: {e}")
+
+
+def process_emergency_call(raw_call_id, trace=None):
     """
     Main processing function for emergency calls.
     
@@ -54,7 +67,11 @@ def process_emergency_call(raw_call_id):
     4. Enrich with additional data
     5. Insert into enriched_calls table
     6. Mark raw call as processed
+
+    `trace` holds the API's stage timestamps; this job adds its own and
+    records the per-stage latencies.
     """
+    trace = mark(dict(trace or {}), 'job_started')
     try:
         print(f"\n{'='*60}")
         print(f"Processing call ID: {raw_call_id}")
@@ -81,6 +98,7 @@ def process_emergency_call(raw_call_id):
             # Step 3: Classify subtype using cascading classifier
             emergency_subtype = classify_subtype(description, emergency_type)
             print(f"🏷️  Subtype: {emergency_subtype}")
+            mark(trace, 'classified')
             
             # Step 4: Enrich
             age_group = calculate_age_group(raw_call.get('age'))
@@ -123,11 +141,14 @@ def process_emergency_call(raw_call_id):
             
             cursor.execute(insert_query, values)
             enriched_id = cursor.lastrowid
+            mark(trace, 'enriched_inserted')
             
             # Step 6: Mark as processed
             cursor.execute("UPDATE raw_calls SET processed = 1 WHERE id = %s", (raw_call_id,))
             
             conn.commit()
+            mark(trace, 'committed')
+            record_latency(trace)
             
             print(f"✅ Enriched call inserted with ID: {enriched_id}")
             print(f"✅ Raw call {raw_call_id} marked as processed")
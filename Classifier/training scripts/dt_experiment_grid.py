@@ -2,11 +2,12 @@
 import sys, os
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))  # add classifier root
 import pandas as pd
-from sklearn.feature_extraction.text import TfidfVectorizer
 from sklearn.tree import DecisionTreeClassifier
 from sklearn.pipeline import Pipeline
-from sklearn.metrics import classification_report, confusion_matrix, accuracy_score
-from utils.data_split import train_test_split_by_title
+from sklearn.metrics import classification_report, confusion_matrix, accuracy_score, f1_score
+from utils.feature_store import load_features
+from utils.grid_runner import run_grid, grid_args, print_summary
+import time
 import joblib
 
 DATA_PATH = "C:/Capstone/Data/cleaned_data.csv"
@@ -21,24 +22,23 @@ configs = [
 
 tfidf_cfg = {"ngram_range": (1,3), "min_df": 5, "max_features": 15000}
 
-def run_config(cfg, X_train, X_test, y_train, y_test):
-    tfidf = TfidfVectorizer(stop_words="english",
-                            ngram_range=tfidf_cfg["ngram_range"],
-                            max_features=tfidf_cfg["max_features"],
-                            min_df=tfidf_cfg["min_df"])
-    clf = Pipeline([
-        ("tfidf", tfidf),
-        ("dt", DecisionTreeClassifier(
-            class_weight="balanced",
-            random_state=42,
-            max_depth=cfg["max_depth"],
-            min_samples_leaf=cfg["min_samples_leaf"],
-            min_samples_split=cfg["min_samples_split"]
-        ))
-    ])
+def run_config(cfg, n_threads=1):
+    # trees are single-threaded, so n_threads only bounds BLAS inside the worker
+    X_train_t, X_test_t, y_train, y_test, tfidf = load_features(DATA_PATH, tfidf_cfg)
+    dt = DecisionTreeClassifier(
+        class_weight="balanced",
+        random_state=42,
+        max_depth=cfg["max_depth"],
+        min_samples_leaf=cfg["min_samples_leaf"],
+        min_samples_split=cfg["min_samples_split"]
+    )
     print(f"\n=== Running {cfg['name']} | max_depth={cfg['max_depth']} min_leaf={cfg['min_samples_leaf']} min_split={cfg['min_samples_split']} ===")
-    clf.fit(X_train, y_train)
-    y_pred = clf.predict(X_test)
+    t0 = time.time()
+    dt.fit(X_train_t, y_train)
+    train_time = time.time() - t0
+    # the cached vectorizer is already fitted, so the saved pipeline is the same as fitting end to end
+    clf = Pipeline([("tfidf", tfidf), ("dt", dt)])
+    y_pred = dt.predict(X_test_t)
     acc = accuracy_score(y_test, y_pred)
     print(f"Accuracy: {acc:.4f}")
     print("Classification report:")
@@ -47,12 +47,21 @@ def run_config(cfg, X_train, X_test, y_train, y_test):
     print(confusion_matrix(y_test, y_pred, labels=clf.classes_))
 
     # Save model
-    joblib.dump(clf, os.path.join(OUT_DIR, f"{cfg['name']}.pkl"))
-    print("Saved model to", os.path.join(OUT_DIR, f"{cfg['name']}.pkl"))
+    model_path = os.path.join(OUT_DIR, f"{cfg['name']}.pkl")
+    joblib.dump(clf, model_path)
+    print("Saved model to", model_path)
+
+    return {
+        "metrics": {"accuracy": acc, "macro_f1": f1_score(y_test, y_pred, average="macro")},
+        "timings": {"train_seconds": train_time},
+        "model_path": model_path,
+    }
 
 if __name__ == "__main__":
-    df = pd.read_csv(DATA_PATH)
-    df = df.dropna(subset=["emergency_title", "emergency_type"])
-    X_train, X_test, y_train, y_test = train_test_split_by_title(df, text_col="emergency_title", label_col="emergency_type", test_size=0.2, random_state=42)
-    for cfg in configs:
-        run_config(cfg, X_train, X_test, y_train, y_test)
+    args = grid_args(__file__, "Decision tree pruning grid")
+    load_features(DATA_PATH, tfidf_cfg)  # featurize once before the workers start
+    jobs = [(cfg["name"], {"cfg": cfg}) for cfg in configs]
+    results = run_grid(jobs, run_config, args.ledger, max_workers=args.workers,
+                       threads_per_job=args.threads or 1, rerun_failed=not args.no_retry_failed,
+                       data_paths=[DATA_PATH])
+    print_summary(results)
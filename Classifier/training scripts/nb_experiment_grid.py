@@ -2,11 +2,12 @@
 import sys, os
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))  # project classifier root
 import pandas as pd
-from sklearn.feature_extraction.text import TfidfVectorizer
 from sklearn.naive_bayes import MultinomialNB
 from sklearn.pipeline import Pipeline
-from sklearn.metrics import classification_report, confusion_matrix, accuracy_score
-from utils.data_split import train_test_split_by_title
+from sklearn.metrics import classification_report, confusion_matrix, accuracy_score, f1_score
+from utils.feature_store import load_features
+from utils.grid_runner import run_grid, grid_args, print_summary
+import time
 
 DATA_PATH = "C:/Capstone/Data/cleaned_data.csv"
 
@@ -16,15 +17,16 @@ configs = [
     {"name": "NB_lr_like",  "ngram_range": (1,3), "min_df": 5, "max_features": 15000},
 ]
 
-def run_config(cfg, X_train, X_test, y_train, y_test):
-    tfidf = TfidfVectorizer(stop_words="english",
-                            ngram_range=cfg["ngram_range"],
-                            max_features=cfg["max_features"],
-                            min_df=cfg["min_df"])
-    clf = Pipeline([("tfidf", tfidf), ("nb", MultinomialNB())])
+def run_config(cfg, n_threads=1):
+    # each config is its own TF-IDF, fitted once and then reused from the feature cache
+    X_train_t, X_test_t, y_train, y_test, tfidf = load_features(DATA_PATH, cfg)
+    nb = MultinomialNB()
     print(f"\n=== Running {cfg['name']} | ngram={cfg['ngram_range']} min_df={cfg['min_df']} max_feat={cfg['max_features']} ===")
-    clf.fit(X_train, y_train)
-    y_pred = clf.predict(X_test)
+    t0 = time.time()
+    nb.fit(X_train_t, y_train)
+    train_time = time.time() - t0
+    clf = Pipeline([("tfidf", tfidf), ("nb", nb)])
+    y_pred = nb.predict(X_test_t)
     acc = accuracy_score(y_test, y_pred)
     print(f"Accuracy: {acc:.4f}")
     print("Classification report:")
@@ -40,11 +42,20 @@ def run_config(cfg, X_train, X_test, y_train, y_test):
         joblib.dump(clf, joblib_path)
         print("Saved model to", joblib_path)
     except Exception:
-        pass
+        joblib_path = None
+
+    return {
+        "metrics": {"accuracy": acc, "macro_f1": f1_score(y_test, y_pred, average="macro")},
+        "timings": {"train_seconds": train_time},
+        "model_path": joblib_path,
+    }
 
 if __name__ == "__main__":
-    df = pd.read_csv(DATA_PATH)
-    df = df.dropna(subset=["emergency_title", "emergency_type"])
-    X_train, X_test, y_train, y_test = train_test_split_by_title(df, text_col="emergency_title", label_col="emergency_type", test_size=0.2, random_state=42)
+    args = grid_args(__file__, "Multinomial NB TF-IDF grid")
     for cfg in configs:
-        run_config(cfg, X_train, X_test, y_train, y_test)
+        load_features(DATA_PATH, cfg)  # featurize once before the workers start
+    jobs = [(cfg["name"], {"cfg": cfg}) for cfg in configs]
+    results = run_grid(jobs, run_config, args.ledger, max_workers=args.workers,
+                       threads_per_job=args.threads or 1, rerun_failed=not args.no_retry_failed,
+                       data_paths=[DATA_PATH])
+    print_summary(results)
@@ -2,14 +2,14 @@
 import sys, os
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 import pandas as pd
-from sklearn.feature_extraction.text import TfidfVectorizer
 from sklearn.ensemble import RandomForestClassifier
 from xgboost import XGBClassifier
-from sklearn.pipeline import Pipeline, FeatureUnion
-from sklearn.metrics import classification_report, confusion_matrix, accuracy_score
+from sklearn.metrics import classification_report, confusion_matrix, accuracy_score, f1_score
+from sklearn.base import clone
 from imblearn.over_sampling import SMOTE
 from sklearn.preprocessing import LabelEncoder
-from utils.data_split import train_test_split_by_title
+from utils.feature_store import load_features
+from utils.grid_runner import run_grid, grid_args, print_summary
 import joblib
 import numpy as np
 import time
@@ -18,22 +18,6 @@ DATA_PATH = "C:/Capstone/Data/cleaned_data.csv"
 OUT_DIR = os.path.join(os.path.dirname(__file__), "..", "models")
 os.makedirs(OUT_DIR, exist_ok=True)
 
-# TF-IDF vectorizers factory
-def make_tfidf(cfg):
-    if cfg.get("char_ngrams"):
-        from sklearn.feature_extraction.text import TfidfVectorizer as TV
-        wu = FeatureUnion([
-            ("word", TV(stop_words="english", ngram_range=cfg["word_ngram"],
-                        max_features=cfg["max_features"], min_df=cfg["min_df"])),
-            ("char", TV(analyzer="char_wb", ngram_range=cfg["char_ngram"],
-                        max_features=cfg["char_max_features"], min_df=cfg["min_df"]))
-        ])
-        return wu
-    else:
-        from sklearn.feature_extraction.text import TfidfVectorizer as TV
-        return TV(stop_words="english", ngram_range=cfg["word_ngram"],
-                  max_features=cfg["max_features"], min_df=cfg["min_df"])
-
 # Experiment configs
 tfidf_configs = [
     {"name":"word1-3_df3", "word_ngram":(1,3), "min_df":3, "max_features":15000, "char_ngrams":False},
@@ -49,17 +33,12 @@ models = [
     ("XGBoost", XGBClassifier(use_label_encoder=False, eval_metric="mlogloss", random_state=42, verbosity=0))
 ]
 
-def run_experiment(tf_cfg, model_name, model_obj):
+def run_experiment(tf_cfg, model_name, n_threads=-1):
     print(f"\n=== EXP: {tf_cfg['name']} {model_name} ===")
-    df = pd.read_csv(DATA_PATH)
-    df = df.dropna(subset=["emergency_title","emergency_type"])
-    X_train, X_test, y_train, y_test = train_test_split_by_title(df,
-        text_col="emergency_title", label_col="emergency_type", test_size=0.2, random_state=42)
-
-    vect = make_tfidf(tf_cfg)
-    print("Fitting TF-IDF...")
-    X_train_t = vect.fit_transform(X_train)
-    X_test_t = vect.transform(X_test)
+    # split + fitted TF-IDF come from the shared feature cache
+    t0 = time.time()
+    X_train_t, X_test_t, y_train, y_test, vect = load_features(DATA_PATH, tf_cfg)
+    load_time = time.time() - t0
 
     # Encode labels if XGBoost
     if model_name == "XGBoost":
@@ -70,11 +49,13 @@ def run_experiment(tf_cfg, model_name, model_obj):
         y_train_enc, y_test_enc = y_train, y_test
 
     t0 = time.time()
-    model = model_obj
+    model = clone(dict(models)[model_name]).set_params(n_jobs=n_threads)
     model.fit(X_train_t, y_train_enc)
     train_time = time.time() - t0
 
+    t0 = time.time()
     y_pred = model.predict(X_test_t)
+    predict_time = time.time() - t0
     acc = accuracy_score(y_test_enc, y_pred)
     print(f"Acc: {acc:.4f} | Train time: {train_time:.1f}s")
     print("Classification report:")
@@ -84,14 +65,34 @@ def run_experiment(tf_cfg, model_name, model_obj):
 
     # Save model + vectorizer
     name = f"{model_name}_{tf_cfg['name']}"
+    model_path = os.path.join(OUT_DIR, f"{name}.pkl")
     joblib.dump({"model": model, "vect": vect, "label_encoder": le if model_name=="XGBoost" else None},
-                os.path.join(OUT_DIR, f"{name}.pkl"))
+                model_path)
     print("Saved:", name)
 
+    return {
+        "metrics": {
+            "accuracy": acc,
+            "macro_f1": f1_score(y_test_enc, y_pred, average="macro"),
+            "weighted_f1": f1_score(y_test_enc, y_pred, average="weighted"),
+        },
+        "timings": {"load_seconds": load_time, "train_seconds": train_time, "predict_seconds": predict_time},
+        "model_path": model_path,
+    }
+
 if __name__ == "__main__":
+    args = grid_args(__file__, "RandomForest/XGBoost TF-IDF ablation")
+
+    # featurize each config once up front; the workers then memory-map the cache
     for tf_cfg in tfidf_configs:
-        for model_name, model_obj in models:
-            try:
-                run_experiment(tf_cfg, model_name, model_obj)
-            except Exception as e:
-                print("Error in run:", e)
+        load_features(DATA_PATH, tf_cfg)
+
+    jobs = [
+        (f"{model_name}_{tf_cfg['name']}", {"tf_cfg": tf_cfg, "model_name": model_name})
+        for tf_cfg in tfidf_configs
+        for model_name, _ in models
+    ]
+    results = run_grid(jobs, run_experiment, args.ledger, max_workers=args.workers,
+                       threads_per_job=args.threads, rerun_failed=not args.no_retry_failed,
+                       data_paths=[DATA_PATH])
+    print_summary(results)
@@ -2,13 +2,13 @@
 import sys, os
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 import pandas as pd
-from sklearn.feature_extraction.text import TfidfVectorizer
 from sklearn.ensemble import RandomForestClassifier
 from xgboost import XGBClassifier
-from sklearn.pipeline import FeatureUnion
-from sklearn.metrics import classification_report, confusion_matrix, accuracy_score
+from sklearn.metrics import classification_report, confusion_matrix, accuracy_score, f1_score
+from sklearn.base import clone
 from imblearn.over_sampling import SMOTE
-from utils.data_split import train_test_split_by_title
+from utils.feature_store import load_features
+from utils.grid_runner import run_grid, grid_args, print_summary
 import joblib
 import numpy as np
 import time
@@ -18,28 +18,6 @@ DATA_PATH = "C:/Capstone/Data/cleaned_data.csv"
 OUT_DIR = os.path.join(os.path.dirname(__file__), "..", "models")
 os.makedirs(OUT_DIR, exist_ok=True)
 
-# TF-IDF vectorizers factory
-def make_tfidf(cfg):
-    if cfg.get("char_ngrams"):
-        from sklearn.feature_extraction.text import TfidfVectorizer as TV
-        wu = FeatureUnion([
-            ("word", TV(stop_words="english",
-                        ngram_range=cfg["word_ngram"],
-                        max_features=cfg["max_features"],
-                        min_df=cfg["min_df"])),
-            ("char", TV(analyzer="char_wb",
-                        ngram_range=cfg["char_ngram"],
-                        max_features=cfg["char_max_features"],
-                        min_df=cfg["min_df"]))
-        ])
-        return wu
-    else:
-        from sklearn.feature_extraction.text import TfidfVectorizer as TV
-        return TV(stop_words="english",
-                  ngram_range=cfg["word_ngram"],
-                  max_features=cfg["max_features"],
-                  min_df=cfg["min_df"])
-
 # Experiment configs
 tfidf_configs = [
     {"name": "A_word1-3", "word_ngram": (1, 3), "min_df": 5,
@@ -58,15 +36,14 @@ models = [
         random_state=42, verbosity=0))
 ]
 
-def run_experiment(tf_cfg, model_name, model_obj, use_smote=False):
+def run_experiment(tf_cfg, model_name, use_smote=False, n_threads=-1):
     print("\n=== EXP:", tf_cfg["name"], model_name, "SMOTE=", use_smote)
-    df = pd.read_csv(DATA_PATH)
-    df = df.dropna(subset=["emergency_title", "emergency_type"])
-    X_train, X_test, y_train, y_test = train_test_split_by_title(
-        df, text_col="emergency_title",
-        label_col="emergency_type",
-        test_size=0.2, random_state=42
-    )
+    timings = {}
+    # split + fitted TF-IDF come from the shared feature cache
+    t0 = time.time()
+    X_train_t, X_test_t, y_train, y_test, vect = load_features(DATA_PATH, tf_cfg)
+    timings["load_seconds"] = time.time() - t0
+    labels = sorted(np.unique(np.concatenate([y_train, y_test])))
 
     # Encode labels if model is XGBoost
     le = None
@@ -75,22 +52,22 @@ def run_experiment(tf_cfg, model_name, model_obj, use_smote=False):
         y_train = le.fit_transform(y_train)
         y_test = le.transform(y_test)
 
-    vect = make_tfidf(tf_cfg)
-    print("Fitting TF-IDF...")
-    X_train_t = vect.fit_transform(X_train)
-    X_test_t = vect.transform(X_test)
-
     if use_smote:
         print("Applying SMOTE on training vectors (may be slow)...")
+        t0 = time.time()
         sm = SMOTE(random_state=42)  # FIX: removed n_jobs
         X_train_t, y_train = sm.fit_resample(X_train_t, y_train)
+        timings["smote_seconds"] = time.time() - t0
 
     t0 = time.time()
-    model = model_obj
+    model = clone(dict(models)[model_name]).set_params(n_jobs=n_threads)
     model.fit(X_train_t, y_train)
     train_time = time.time() - t0
+    timings["train_seconds"] = train_time
 
+    t0 = time.time()
     y_pred = model.predict(X_test_t)
+    timings["predict_seconds"] = time.time() - t0
 
     # Decode labels if XGBoost
     if le is not None:
@@ -102,18 +79,42 @@ def run_experiment(tf_cfg, model_name, model_obj, use_smote=False):
     print("Classification report:")
     print(classification_report(y_test, y_pred, digits=4))
     print("Confusion matrix:")
-    print(confusion_matrix(y_test, y_pred, labels=sorted(df["emergency_type"].unique())))
+    print(confusion_matrix(y_test, y_pred, labels=labels))
 
     # save model + vectorizer
-    name = f"{model_name}_{tf_cfg['name']}{'_SMOTE' if use_smote else ''}"
-    joblib.dump({"model": model, "vect": vect}, os.path.join(OUT_DIR, f"{name}.pkl"))
+    name = experiment_name(tf_cfg, model_name, use_smote)
+    model_path = os.path.join(OUT_DIR, f"{name}.pkl")
+    joblib.dump({"model": model, "vect": vect}, model_path)
     print("Saved:", name)
 
+    return {
+        "metrics": {
+            "accuracy": acc,
+            "macro_f1": f1_score(y_test, y_pred, average="macro"),
+            "weighted_f1": f1_score(y_test, y_pred, average="weighted"),
+        },
+        "timings": timings,
+        "model_path": model_path,
+    }
+
+def experiment_name(tf_cfg, model_name, use_smote):
+    return f"{model_name}_{tf_cfg['name']}{'_SMOTE' if use_smote else ''}"
+
 if __name__ == "__main__":
+    args = grid_args(__file__, "RandomForest/XGBoost x TF-IDF x SMOTE experiment grid")
+
+    # featurize each config once up front; the workers then memory-map the cache
     for tf_cfg in tfidf_configs:
-        for model_name, model_obj in models:
-            for use_smote in [False, True]:
-                try:
-                    run_experiment(tf_cfg, model_name, model_obj, use_smote=use_smote)
-                except Exception as e:
-                    print("Error in run:", e)
+        load_features(DATA_PATH, tf_cfg)
+
+    jobs = [
+        (experiment_name(tf_cfg, model_name, use_smote),
+         {"tf_cfg": tf_cfg, "model_name": model_name, "use_smote": use_smote})
+        for tf_cfg in tfidf_configs
+        for model_name, _ in models
+        for use_smote in [False, True]
+    ]
+    results = run_grid(jobs, run_experiment, args.ledger, max_workers=args.workers,
+                       threads_per_job=args.threads, rerun_failed=not args.no_retry_failed,
+                       data_paths=[DATA_PATH])
+    print_summary(results)
@@ -1,39 +1,51 @@
+import os
+import sys
+import argparse
 import pandas as pd
 import joblib
 from sklearn.model_selection import train_test_split
-from sklearn.feature_extraction.text import TfidfVectorizer
 from xgboost import XGBClassifier
 from sklearn.preprocessing import LabelEncoder
 from sklearn.metrics import classification_report, confusion_matrix
 import numpy as np
 
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+from utils.vectorizers import make_vectorizer, add_vectorizer_arg, describe, slim, bundle_path
+from utils.dataset_loader import load_dataset, peak_rss_mb
+
+COLUMNS = ['emergency_title', 'emergency_type']
+DTYPES = {'emergency_title': 'string', 'emergency_type': 'category'}
+SF_PATH = 'C:/Capstone/Data/sf_montgomery_format.csv'
+
+args = add_vectorizer_arg(argparse.ArgumentParser(description="Multi-jurisdiction main classifier training")).parse_args()
+
 print("=== Multi-Jurisdiction Training ===\n")
 
-# Load datasets
+# Load datasets (only the two columns we train on, streamed in chunks)
 print("Loading datasets...")
-montgomery = pd.read_csv('C:/Capstone/Data/cleaned_data.csv')
-sf = pd.read_csv('C:/Capstone/Data/sf_montgomery_format.csv')
-us_accidents = pd.read_csv('C:/Capstone/Data/us_accidents_montgomery_format.csv')
+montgomery = load_dataset('C:/Capstone/Data/cleaned_data.csv', COLUMNS, DTYPES)
+us_accidents = load_dataset('C:/Capstone/Data/us_accidents_montgomery_format.csv', COLUMNS, DTYPES)
 
 print(f"Montgomery: {len(montgomery)} rows")
-print(f"SF: {len(sf)} rows")
 print(f"US Accidents: {len(us_accidents)} rows")
 
-# Sample SF to balance dataset size (SF is huge)
+# Sample SF to balance dataset size (SF is huge); sampled while streaming so
+# the full export is never in memory
 print("\nBalancing dataset sizes...")
-sf_sample = sf.sample(n=200000, random_state=42)
+sf_sample = load_dataset(SF_PATH, COLUMNS, DTYPES, sample=200000, random_state=42)
 print(f"SF sampled to: {len(sf_sample)} rows")
 
 # Combine datasets
 print("\nCombining datasets...")
 combined = pd.concat([
-    montgomery[['emergency_title', 'emergency_type']],
-    sf_sample[['emergency_title', 'emergency_type']],
-    us_accidents[['emergency_title', 'emergency_type']]
+    montgomery[COLUMNS],
+    sf_sample[COLUMNS],
+    us_accidents[COLUMNS]
 ], ignore_index=True)
 
-# Clean
-combined = combined.dropna(subset=['emergency_title', 'emergency_type'])
+# Clean (drop missing values before leaving the string/category dtypes, so they stay NA)
+combined = combined.dropna(subset=COLUMNS)
+combined = combined.astype({'emergency_title': object, 'emergency_type': object})
 combined = combined[combined['emergency_type'].isin(['EMS', 'Fire', 'Traffic'])]
 
 print(f"\n=== Combined Dataset ===")
@@ -56,17 +68,19 @@ print(f"Train: {len(X_train)} rows")
 print(f"Test: {len(X_test)} rows")
 
 # TF-IDF Vectorization (same config as your best model)
-print("\n=== TF-IDF Vectorization ===")
-vectorizer = TfidfVectorizer(
+print(f"\n=== TF-IDF Vectorization ({args.vectorizer}) ===")
+vectorizer = make_vectorizer(
+    args.vectorizer,
     ngram_range=(1, 3),
     min_df=5,
-    max_features=15000
+    max_features=15000,
+    strip_accents=None
 )
 
 X_train_vec = vectorizer.fit_transform(X_train)
 X_test_vec = vectorizer.transform(X_test)
 
-print(f"Vocabulary size: {len(vectorizer.vocabulary_)}")
+print(describe(vectorizer))
 
 # Label encoding
 le = LabelEncoder()
@@ -106,11 +120,11 @@ for i, true_label in enumerate(['EMS', 'Fire', 'Traffic']):
 # Save model
 model_bundle = {
     'model': model,
-    'vect': vectorizer,
+    'vect': slim(vectorizer),
     'label_encoder': le
 }
 
-output_path = 'models/XGBoost_Combined_MultiJurisdiction.pkl'
+output_path = bundle_path('models/XGBoost_Combined_MultiJurisdiction.pkl', args.vectorizer)
 joblib.dump(model_bundle, output_path)
 print(f"\n✅ Model saved to: {output_path}")
 
@@ -130,7 +144,7 @@ print(classification_report(y_mont_true, y_mont_pred, digits=4))
 
 # SF validation
 print("\n--- SF Validation ---")
-sf_test = sf.sample(n=10000, random_state=42)
+sf_test = load_dataset(SF_PATH, COLUMNS, DTYPES, sample=10000, random_state=123)
 X_sf = vectorizer.transform(sf_test['emergency_title'])
 y_sf_true = sf_test['emergency_type']
 y_sf_pred_enc = model.predict(X_sf)
@@ -148,4 +162,5 @@ print(classification_report(y_us_true, y_us_pred, digits=4))
 
 print("\n" + "="*60)
 print("🎉 Multi-jurisdiction training complete!")
+print(f"Peak RSS: {peak_rss_mb():.0f} MB")
 print("="*60)
\ No newline at end of file
@@ -1,18 +1,29 @@
+import os
+import sys
+import argparse
 import pandas as pd
 import joblib
 from sklearn.model_selection import train_test_split
-from sklearn.feature_extraction.text import TfidfVectorizer
 from xgboost import XGBClassifier
 from sklearn.preprocessing import LabelEncoder
 from sklearn.metrics import classification_report, accuracy_score
 
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+from utils.vectorizers import make_vectorizer, add_vectorizer_arg, describe, slim, bundle_path
+from utils.dataset_loader import load_dataset, peak_rss_mb
+
+args = add_vectorizer_arg(argparse.ArgumentParser(description="Retrain the main classifier")).parse_args()
+
 print("="*70)
 print("RETRAINING MAIN CLASSIFIER WITH NATURAL LANGUAGE")
 print("="*70)
 
 # Load combined dataset
 print("\nLoading combined dataset...")
-df = pd.read_csv('C:/Capstone/Data/montgomery_with_natural_language.csv')
+df = load_dataset('C:/Capstone/Data/montgomery_with_natural_language.csv',
+                  ['emergency_title', 'emergency_type'],
+                  {'emergency_title': 'string', 'emergency_type': 'category'})
+df = df.astype({'emergency_title': object, 'emergency_type': object})
 print(f"Total records: {len(df):,}")
 
 # Clean data
@@ -40,10 +51,11 @@ print(f"Test: {len(X_test):,} records")
 
 # TF-IDF Vectorization (same config as before)
 print("\n" + "="*70)
-print("TF-IDF VECTORIZATION")
+print(f"TF-IDF VECTORIZATION ({args.vectorizer})")
 print("="*70)
 
-vectorizer = TfidfVectorizer(
+vectorizer = make_vectorizer(
+    args.vectorizer,
     ngram_range=(1, 3),
     min_df=5,
     max_features=15000,
@@ -54,7 +66,7 @@ vectorizer = TfidfVectorizer(
 X_train_vec = vectorizer.fit_transform(X_train)
 X_test_vec = vectorizer.transform(X_test)
 
-print(f"Vocabulary size: {len(vectorizer.vocabulary_):,}")
+print(describe(vectorizer))
 
 # Label encoding
 le = LabelEncoder()
@@ -101,14 +113,14 @@ print("="*70)
 
 model_bundle = {
     'model': model,
-    'vect': vectorizer,
+    'vect': slim(vectorizer),
     'label_encoder': le
 }
 
 # Backup old model first
 import shutil
-old_model = 'models/XGBoost_Combined_MultiJurisdiction.pkl'
-backup_model = 'models/XGBoost_Combined_MultiJurisdiction_OLD.pkl'
+old_model = bundle_path('models/XGBoost_Combined_MultiJurisdiction.pkl', args.vectorizer)
+backup_model = old_model.replace('.pkl', '_OLD.pkl')
 
 try:
     shutil.copy(old_model, backup_model)
@@ -122,4 +134,5 @@ print(f"✅ Saved new model to: {old_model}")
 
 print("\n" + "="*70)
 print("MAIN CLASSIFIER RETRAINING COMPLETE")
+print(f"Peak RSS: {peak_rss_mb():.0f} MB")
 print("="*70)
\ No newline at end of file
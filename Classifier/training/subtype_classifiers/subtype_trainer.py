@@ -0,0 +1,188 @@
+# subtype_trainer.py
+"""
+Data-driven trainer for the EMS / Fire / Traffic subtype classifiers.
+
+The three models are trained concurrently, one process each, with the
+machine's cores split between them in proportion to their training set size.
+The whole run takes about as long as the largest model instead of the sum of
+all three. Each bundle ({'model', 'vect', 'label_encoder'}, same as before) is
+written to a temp file and renamed into Classifier/models/, so the API never
+loads a half-written model.
+
+Usage:
+    python subtype_trainer.py --data C:/Capstone/Data/cleaned_data.csv
+    python subtype_trainer.py --data ... --types EMS Fire --min-samples 200 --backup
+    python subtype_trainer.py --data ... --vectorizer hashing   # writes *_Subtype_Hashing.pkl
+"""
+import os
+import sys
+import shutil
+import argparse
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+import pandas as pd
+import joblib
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+from utils.vectorizers import make_vectorizer, add_vectorizer_arg, describe, slim, bundle_path
+
+MODELS_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))), 'models')
+BACKUP_DIR = os.path.join(MODELS_DIR, 'backups')
+
+# one entry per subtype model; min_samples drops rare subtypes before training
+SUBTYPE_SPECS = [
+    {'type': 'EMS', 'min_samples': 100},
+    {'type': 'Fire', 'min_samples': 100},
+    {'type': 'Traffic', 'min_samples': 100},
+]
+
+TFIDF_PARAMS = dict(min_df=5, max_features=15000, ngram_range=(1, 3), strip_accents='unicode', lowercase=True)
+
+
+def model_path(emergency_type, kind='tfidf'):
+    return bundle_path(os.path.join(MODELS_DIR, f'XGBoost_{emergency_type}_Subtype.pkl'), kind)
+
+
+def prepare(df, spec):
+    """Rows of one emergency type, minus subtypes with fewer than min_samples calls."""
+    type_df = df[df['emergency_type'] == spec['type']]
+    counts = type_df['emergency_subtype'].value_counts()
+    valid = counts[counts >= spec['min_samples']].index
+    kept = type_df[type_df['emergency_subtype'].isin(valid)]
+    print(f"{spec['type']}: {len(kept):,} of {len(type_df):,} calls, "
+          f"{kept['emergency_subtype'].nunique()} classes (≥{spec['min_samples']} samples)")
+    return kept['emergency_title'].to_numpy(), kept['emergency_subtype'].to_numpy()
+
+
+def split_cores(sizes, cores=None):
+    """Share `cores` between jobs proportionally to their size, at least one each."""
+    cores = cores or os.cpu_count() or 1
+    total = sum(sizes.values()) or 1
+    shares = {name: max(1, int(cores * size / total)) for name, size in sizes.items()}
+    # hand out any cores lost to rounding, biggest jobs first
+    for name in sorted(sizes, key=sizes.get, reverse=True):
+        if sum(shares.values()) >= cores:
+            break
+        shares[name] += 1
+    return shares
+
+
+def save_bundle_atomic(bundle, path, backup=False):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    if backup and os.path.exists(path):
+        os.makedirs(BACKUP_DIR, exist_ok=True)
+        name = os.path.splitext(os.path.basename(path))[0]
+        shutil.copy2(path, os.path.join(BACKUP_DIR, f'{name}_OLD.pkl'))
+    tmp_path = f'{path}.{os.getpid()}.tmp'
+    joblib.dump(bundle, tmp_path)
+    os.replace(tmp_path, path)
+
+
+def train_one(emergency_type, titles, subtypes, n_jobs, backup=False, kind='tfidf'):
+    """Worker: fit TF-IDF + XGBoost for one emergency type and save its bundle."""
+    from sklearn.model_selection import train_test_split
+    from sklearn.preprocessing import LabelEncoder
+    from sklearn.metrics import classification_report, accuracy_score
+    from xgboost import XGBClassifier
+
+    started = time.time()
+    X_train, X_test, y_train, y_test = train_test_split(
+        titles, subtypes, test_size=0.2, random_state=42, stratify=subtypes
+    )
+
+    vectorizer = make_vectorizer(kind, **TFIDF_PARAMS)
+    X_train_vec = vectorizer.fit_transform(X_train)
+    X_test_vec = vectorizer.transform(X_test)
+
+    le = LabelEncoder()
+    y_train_enc = le.fit_transform(y_train)
+
+    model = XGBClassifier(
+        use_label_encoder=False,
+        eval_metric='mlogloss',
+        random_state=42,
+        n_jobs=n_jobs
+    )
+    model.fit(X_train_vec, y_train_enc)
+
+    y_pred = le.inverse_transform(model.predict(X_test_vec))
+    path = model_path(emergency_type, kind)
+    save_bundle_atomic({'model': model, 'vect': slim(vectorizer), 'label_encoder': le}, path, backup=backup)
+
+    return {
+        'type': emergency_type,
+        'accuracy': accuracy_score(y_test, y_pred),
+        'report': classification_report(y_test, y_pred, digits=4, zero_division=0),
+        'vectorizer': describe(vectorizer),
+        'classes': len(le.classes_),
+        'n_jobs': n_jobs,
+        'seconds': time.time() - started,
+        'path': path,
+    }
+
+
+def train_subtypes(data_path, specs=SUBTYPE_SPECS, cores=None, backup=False, reports=True, kind='tfidf'):
+    print("=" * 70)
+    print("SUBTYPE CLASSIFIER TRAINING")
+    print("=" * 70)
+    print(f"\nLoading {data_path}...")
+    df = pd.read_csv(data_path, usecols=['emergency_title', 'emergency_type', 'emergency_subtype'])
+    df = df.dropna(subset=['emergency_title', 'emergency_type', 'emergency_subtype'])
+    print(f"Total records: {len(df):,}\n")
+
+    data = {spec['type']: prepare(df, spec) for spec in specs}
+    del df
+    shares = split_cores({t: len(titles) for t, (titles, _) in data.items()}, cores)
+    print(f"\nCore budget: {', '.join(f'{t}={n}' for t, n in shares.items())}")
+
+    started = time.time()
+    results = []
+    with ProcessPoolExecutor(max_workers=len(data)) as pool:
+        futures = {
+            pool.submit(train_one, t, titles, subtypes, shares[t], backup, kind): t
+            for t, (titles, subtypes) in data.items()
+        }
+        for future in as_completed(futures):
+            result = future.result()
+            results.append(result)
+            print(f"✅ {result['type']}: accuracy {result['accuracy']:.4f}, "
+                  f"{result['classes']} classes, {result['seconds']:.1f}s on {result['n_jobs']} cores "
+                  f"-> {result['path']}")
+
+    if reports:
+        for result in sorted(results, key=lambda r: r['type']):
+            print("\n" + "-" * 70)
+            print(f"{result['type'].upper()} SUBTYPE CLASSIFIER RESULTS")
+            print("-" * 70)
+            print(f"Accuracy: {result['accuracy']:.4f}  |  {result['vectorizer']}")
+            print(result['report'])
+
+    slowest = max(r['seconds'] for r in results)
+    print("=" * 70)
+    print(f"TRAINING COMPLETE in {time.time() - started:.1f}s (largest model {slowest:.1f}s, "
+          f"sequential total {sum(r['seconds'] for r in results):.1f}s)")
+    print("=" * 70)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Train the subtype classifiers in parallel")
+    parser.add_argument('--data', required=True, help="CSV with emergency_title/type/subtype columns")
+    parser.add_argument('--types', nargs='+', default=[s['type'] for s in SUBTYPE_SPECS])
+    parser.add_argument('--min-samples', type=int, default=None, help="override every type's rare-subtype cutoff")
+    parser.add_argument('--cores', type=int, default=None, help="total core budget (default: all)")
+    parser.add_argument('--backup', action='store_true', help="copy existing bundles to models/backups first")
+    add_vectorizer_arg(parser)
+    args = parser.parse_args()
+
+    specs = [dict(s) for s in SUBTYPE_SPECS if s['type'] in args.types]
+    specs += [{'type': t, 'min_samples': 100} for t in args.types if t not in {s['type'] for s in specs}]
+    if args.min_samples is not None:
+        for spec in specs:
+            spec['min_samples'] = args.min_samples
+
+    train_subtypes(args.data, specs, cores=args.cores, backup=args.backup, kind=args.vectorizer)
+
+
+if __name__ == '__main__':
+    main()
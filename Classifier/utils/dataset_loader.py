@@ -0,0 +1,150 @@
+# utils/dataset_loader.py
+"""
+Out-of-core loading for the large training CSVs (SF export, US Accidents).
+
+load_dataset() reads only the requested columns with explicit dtypes, in
+chunks, and samples while streaming. Only the sample (plus one chunk) is in
+memory at a time, not the whole file. Sampling works by giving every row a
+seeded uniform random key and keeping the smallest keys:
+  - sample=n                  uniform sample of n rows (reservoir-style)
+  - frac=f                    uniform sample of round(f * rows) rows
+  - stratify=col + frac/sample  round(f * group size) rows per group, like
+                              groupby(col).sample(frac=f); with sample=n the
+                              fraction is n / total rows
+frac and stratified samples first count the rows (per group) in a pass that
+reads only the stratify/dropna columns, so every target is exact and the
+streaming pass can keep just the smallest keys per group.
+Unsampled loads collect the chunks and concatenate them once at the end.
+The result is cached as Parquet next to the other caches. The key is the
+source file's size/mtime plus the arguments, so a re-run skips the CSV.
+
+Usage:
+    sf = load_dataset(SF_PATH, ['emergency_title', 'emergency_type'], sample=200000)
+"""
+import os
+import sys
+import json
+import hashlib
+import numpy as np
+import pandas as pd
+
+CACHE_DIR = os.getenv(
+    "DATASET_CACHE_DIR",
+    os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data_cache"),
+)
+CHUNKSIZE = 250_000
+
+
+def peak_rss_mb():
+    """Peak resident memory of this process in MB (None if it can't be measured)."""
+    if sys.platform == "win32":
+        try:
+            import psutil
+            return psutil.Process().memory_info().peak_wset / 1024 ** 2
+        except ImportError:
+            return None
+    import resource
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in bytes on macOS and in KB on Linux
+    return peak / 1024 ** 2 if sys.platform == "darwin" else peak / 1024
+
+
+def _cache_path(path, params):
+    stat = os.stat(path)
+    key = hashlib.sha256(json.dumps(
+        {"path": os.path.abspath(path), "size": stat.st_size, "mtime": stat.st_mtime_ns, **params},
+        sort_keys=True, default=str,
+    ).encode("utf-8")).hexdigest()[:16]
+    name = os.path.splitext(os.path.basename(path))[0]
+    return os.path.join(CACHE_DIR, f"{name}_{key}.parquet")
+
+
+def _keep_smallest(df, n):
+    if len(df) <= n:
+        return df
+    return df.nsmallest(n, "_key")
+
+
+def _keep_per_group(df, by, targets):
+    """The `targets[group]` smallest keys of every group."""
+    df = df.sort_values("_key")
+    rank = df.groupby(by, observed=True).cumcount()
+    limit = df[by].astype(object).map(targets).fillna(0).astype(int)
+    return df[rank.values < limit.values]
+
+
+def _count_rows(path, columns, dtypes, dropna, chunksize, by=None):
+    """Rows left after dropna, plus per-group counts of `by`; reads only the columns it needs."""
+    usecols = list(dict.fromkeys(([by] if by else []) + list(dropna or []))) or columns[:1]
+    dtypes = {c: t for c, t in (dtypes or {}).items() if c in usecols} or None
+    rows = 0
+    counts = pd.Series(dtype="int64")
+    for chunk in pd.read_csv(path, usecols=usecols, dtype=dtypes, chunksize=chunksize):
+        if dropna:
+            chunk = chunk.dropna(subset=dropna)
+        rows += len(chunk)
+        if by:
+            counts = counts.add(chunk[by].astype(object).value_counts(), fill_value=0)
+    return rows, counts
+
+
+def _stream(path, columns, dtypes, dropna, chunksize, random_state):
+    rng = np.random.default_rng(random_state)
+    reader = pd.read_csv(path, usecols=columns, dtype=dtypes, chunksize=chunksize)
+    for chunk in reader:
+        if dropna:
+            chunk = chunk.dropna(subset=dropna)
+        chunk["_key"] = rng.random(len(chunk))
+        yield chunk
+
+
+def load_dataset(path, columns, dtypes=None, sample=None, frac=None, stratify=None,
+                 dropna=None, random_state=42, chunksize=CHUNKSIZE, cache=True):
+    """Columns of a CSV, optionally sampled while streaming; see module docstring."""
+    if sample is not None and frac is not None:
+        raise ValueError("pass either sample or frac, not both")
+    columns = list(columns)
+    if stratify and stratify not in columns:
+        columns.append(stratify)
+
+    params = {"columns": columns, "dtypes": dtypes, "sample": sample, "frac": frac,
+              "stratify": stratify, "dropna": dropna, "random_state": random_state}
+    cache_path = _cache_path(path, params) if cache else None
+    if cache_path and os.path.exists(cache_path):
+        print(f"Loading cached {os.path.basename(path)} sample: {cache_path}")
+        return pd.read_parquet(cache_path)
+
+    targets = None
+    if frac is not None or (stratify and sample is not None):
+        total, counts = _count_rows(path, columns, dtypes, dropna, chunksize, by=stratify)
+        share = frac if frac is not None else sample / max(total, 1)
+        if stratify:
+            targets = (counts * share).round().astype(int)
+        else:
+            sample = int(round(total * share))
+
+    kept = None
+    parts = []
+    rows = 0
+    for chunk in _stream(path, columns, dtypes, dropna, chunksize, random_state):
+        rows += len(chunk)
+        if targets is not None:
+            kept = _keep_per_group(chunk if kept is None else pd.concat([kept, chunk]), stratify, targets)
+        elif sample is not None:
+            kept = _keep_smallest(chunk if kept is None else pd.concat([kept, chunk]), sample)
+        else:
+            parts.append(chunk)
+    if parts:
+        kept = pd.concat(parts)
+    if kept is None:
+        kept = pd.DataFrame(columns=columns + ["_key"])
+
+    result = kept.drop(columns="_key").reset_index(drop=True)
+    print(f"Streamed {rows:,} rows from {os.path.basename(path)}, kept {len(result):,}")
+
+    if cache_path:
+        os.makedirs(CACHE_DIR, exist_ok=True)
+        tmp_path = f"{cache_path}.{os.getpid()}.tmp"
+        result.to_parquet(tmp_path, index=False)
+        os.replace(tmp_path, cache_path)
+    return result
@@ -0,0 +1,199 @@
+# utils/feature_store.py
+"""
+On-disk cache of train/test splits and fitted TF-IDF feature matrices for the
+experiment grids.
+
+Every grid script used to re-read cleaned_data.csv, re-split it and re-fit the
+same TF-IDF for each model (and SMOTE) combination. Here the split is keyed
+on the data file hash plus the split settings. The features are keyed on that
+plus the TF-IDF config (its name is ignored, so e.g. "A_word1-3" and
+"word1-3_df5" share one entry). Each featurization is paid once across all
+scripts.
+
+Layout (one directory per entry, written atomically):
+    feature_cache/split_<key>/   X_train.npy X_test.npy y_train.npy y_test.npy
+    feature_cache/tfidf_<key>/   X_train.{data,indices,indptr}.npy, X_test.*,
+                                 shape.npy, vect.pkl, config.json
+
+The CSR parts are plain .npy so they load with mmap_mode='r'. Matrices are
+backed by the page cache and never copied into each process.
+"""
+import os
+import json
+import shutil
+import hashlib
+import tempfile
+import numpy as np
+import pandas as pd
+import scipy.sparse as sp
+import joblib
+from sklearn.feature_extraction.text import TfidfVectorizer
+from sklearn.pipeline import FeatureUnion
+
+from utils.data_split import train_test_split_by_title
+
+CACHE_DIR = os.getenv(
+    "FEATURE_CACHE_DIR",
+    os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "feature_cache"),
+)
+
+# config keys that change the fitted features ("name" is only a label)
+TFIDF_KEYS = ["word_ngram", "min_df", "max_features", "char_ngrams", "char_ngram", "char_max_features"]
+
+
+# -------------------------
+# Keys
+# -------------------------
+def file_hash(path):
+    """sha256 of a data file, remembered per (size, mtime) so big CSVs are hashed once."""
+    stat = os.stat(path)
+    index_path = os.path.join(CACHE_DIR, "file_hashes.json")
+    stamp = f"{os.path.abspath(path)}|{stat.st_size}|{stat.st_mtime_ns}"
+    try:
+        with open(index_path, "r", encoding="utf-8") as f:
+            index = json.load(f)
+    except (OSError, ValueError):
+        index = {}
+    if stamp in index:
+        return index[stamp]
+
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    index[stamp] = digest.hexdigest()
+
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    tmp_path = index_path + f".{os.getpid()}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(index, f)
+    os.replace(tmp_path, index_path)
+    return index[stamp]
+
+
+def _key(parts):
+    return hashlib.sha256(json.dumps(parts, sort_keys=True).encode("utf-8")).hexdigest()[:16]
+
+
+def normalize_tfidf_cfg(cfg):
+    """Canonical config; dt/nb style {"ngram_range": ...} becomes {"word_ngram": ...}."""
+    cfg = dict(cfg)
+    if "word_ngram" not in cfg and "ngram_range" in cfg:
+        cfg["word_ngram"] = cfg["ngram_range"]
+    out = {"char_ngrams": bool(cfg.get("char_ngrams"))}
+    for k in TFIDF_KEYS:
+        if k in cfg and k != "char_ngrams":
+            out[k] = list(cfg[k]) if isinstance(cfg[k], tuple) else cfg[k]
+    if not out["char_ngrams"]:
+        out.pop("char_ngram", None)
+        out.pop("char_max_features", None)
+    return out
+
+
+def make_tfidf(cfg):
+    """The vectorizer every grid script uses: word n-grams, optionally unioned with char_wb n-grams."""
+    cfg = normalize_tfidf_cfg(cfg)
+    word = TfidfVectorizer(stop_words="english",
+                           ngram_range=tuple(cfg["word_ngram"]),
+                           max_features=cfg["max_features"],
+                           min_df=cfg["min_df"])
+    if not cfg["char_ngrams"]:
+        return word
+    return FeatureUnion([
+        ("word", word),
+        ("char", TfidfVectorizer(analyzer="char_wb",
+                                 ngram_range=tuple(cfg["char_ngram"]),
+                                 max_features=cfg["char_max_features"],
+                                 min_df=cfg["min_df"])),
+    ])
+
+
+# -------------------------
+# Storage helpers
+# -------------------------
+def _publish(tmp_dir, final_dir):
+    """Move a finished entry into place; if another process won the race keep theirs."""
+    try:
+        os.replace(tmp_dir, final_dir)
+    except OSError:
+        if not os.path.isdir(final_dir):
+            raise
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+
+
+def _new_entry_dir():
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    return tempfile.mkdtemp(prefix=".tmp_", dir=CACHE_DIR)
+
+
+def _save_csr(directory, name, X):
+    X = sp.csr_matrix(X)
+    X.sort_indices()
+    np.save(os.path.join(directory, f"{name}.data.npy"), X.data)
+    np.save(os.path.join(directory, f"{name}.indices.npy"), X.indices)
+    np.save(os.path.join(directory, f"{name}.indptr.npy"), X.indptr)
+    np.save(os.path.join(directory, f"{name}.shape.npy"), np.array(X.shape, dtype=np.int64))
+
+
+def _load_csr(directory, name, mmap=True):
+    mode = "r" if mmap else None
+    load = lambda part: np.load(os.path.join(directory, f"{name}.{part}.npy"), mmap_mode=mode)
+    shape = tuple(int(n) for n in np.load(os.path.join(directory, f"{name}.shape.npy")))
+    return sp.csr_matrix((load("data"), load("indices"), load("indptr")), shape=shape, copy=False)
+
+
+# -------------------------
+# Public API
+# -------------------------
+def load_split(data_path, text_col="emergency_title", label_col="emergency_type",
+               test_size=0.2, random_state=42):
+    """Cached train_test_split_by_title over the dropna'd CSV. Returns numpy arrays."""
+    key = _key({"data": file_hash(data_path), "text": text_col, "label": label_col,
+                "test_size": test_size, "random_state": random_state})
+    entry = os.path.join(CACHE_DIR, f"split_{key}")
+    parts = ["X_train", "X_test", "y_train", "y_test"]
+
+    if not os.path.isdir(entry):
+        df = pd.read_csv(data_path)
+        df = df.dropna(subset=[text_col, label_col])
+        split = train_test_split_by_title(df, text_col=text_col, label_col=label_col,
+                                          test_size=test_size, random_state=random_state)
+        tmp_dir = _new_entry_dir()
+        for name, values in zip(parts, split):
+            np.save(os.path.join(tmp_dir, f"{name}.npy"), np.asarray(values, dtype=str))
+        _publish(tmp_dir, entry)
+    else:
+        print(f"Using cached split {key}")
+
+    return tuple(np.load(os.path.join(entry, f"{name}.npy"), mmap_mode="r") for name in parts)
+
+
+def load_features(data_path, tfidf_cfg, text_col="emergency_title", label_col="emergency_type",
+                  test_size=0.2, random_state=42, mmap=True):
+    """
+    Fitted TF-IDF features for a split.
+    Returns (X_train_t, X_test_t, y_train, y_test, vect); the first fit is cached.
+    """
+    cfg = normalize_tfidf_cfg(tfidf_cfg)
+    key = _key({"data": file_hash(data_path), "text": text_col, "label": label_col,
+                "test_size": test_size, "random_state": random_state, "tfidf": cfg})
+    entry = os.path.join(CACHE_DIR, f"tfidf_{key}")
+
+    X_train, X_test, y_train, y_test = load_split(data_path, text_col, label_col, test_size, random_state)
+
+    if not os.path.isdir(entry):
+        print(f"Fitting TF-IDF {cfg} (cached as {key})...")
+        vect = make_tfidf(cfg)
+        tmp_dir = _new_entry_dir()
+        _save_csr(tmp_dir, "X_train", vect.fit_transform(np.asarray(X_train)))
+        _save_csr(tmp_dir, "X_test", vect.transform(np.asarray(X_test)))
+        joblib.dump(vect, os.path.join(tmp_dir, "vect.pkl"))
+        with open(os.path.join(tmp_dir, "config.json"), "w", encoding="utf-8") as f:
+            json.dump({"data_path": os.path.abspath(data_path), "tfidf": cfg}, f, indent=2)
+        _publish(tmp_dir, entry)
+    else:
+        print(f"Using cached TF-IDF features {key}")
+
+    vect = joblib.load(os.path.join(entry, "vect.pkl"))
+    return (_load_csr(entry, "X_train", mmap), _load_csr(entry, "X_test", mmap),
+            y_train, y_test, vect)
@@ -0,0 +1,199 @@
+# utils/grid_runner.py
+"""
+Parallel, resumable runner for the experiment grids.
+
+Each grid script turns its configs into (key, kwargs) jobs and hands them
+to run_grid() together with a module-level worker function. Jobs run in a
+process pool where each process is limited to `threads_per_job` threads.
+The worker receives that number as `n_threads` and should pass it to the
+model's n_jobs. This way RandomForest/XGBoost never oversubscribe the cores
+between them.
+
+Every finished job is appended to a JSONL ledger as soon as it completes:
+{"key", "status", "fingerprint", "config", "metrics", "timings", ...}.
+The fingerprint hashes the job's kwargs together with the path, size and
+mtime of the grid's data files. Re-running the script skips a key only when
+it is recorded as "ok" with the same fingerprint, so a crash near the end of
+a grid only costs the jobs that were still running, while an edited config
+or a regenerated dataset is trained again instead of reporting stale metrics.
+"""
+import os
+import json
+import hashlib
+import time
+import argparse
+import traceback
+from datetime import datetime
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+LEDGER_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "experiment_results")
+THREAD_ENV_VARS = ["OMP_NUM_THREADS", "OPENBLAS_NUM_THREADS", "MKL_NUM_THREADS"]
+
+
+def ledger_path(script_file):
+    """experiment_results/<script name>.jsonl"""
+    name = os.path.splitext(os.path.basename(script_file))[0]
+    return os.path.join(LEDGER_DIR, f"{name}.jsonl")
+
+
+def read_ledger(path):
+    """Latest ledger entry per key (later lines win)."""
+    entries = {}
+    if not os.path.exists(path):
+        return entries
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                entry = json.loads(line)
+            except ValueError:
+                continue  # torn last line from a crash
+            entries[entry["key"]] = entry
+    return entries
+
+
+def append_ledger(path, entry):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "a", encoding="utf-8") as f:
+        f.write(json.dumps(entry, default=str) + "\n")
+        f.flush()
+        os.fsync(f.fileno())
+
+
+def job_fingerprint(kwargs, data_paths=()):
+    """Stable hash of a job's kwargs plus the identity (path, size, mtime) of its data files."""
+    data = []
+    for path in data_paths:
+        try:
+            stat = os.stat(path)
+            data.append([os.path.abspath(path), stat.st_size, stat.st_mtime_ns])
+        except OSError:
+            data.append([os.path.abspath(path), None, None])
+    payload = json.dumps({"kwargs": kwargs, "data": data}, sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()[:16]
+
+
+def _limit_threads(n_threads):
+    """Pool initializer: cap BLAS/OpenMP pools in the worker process."""
+    for var in THREAD_ENV_VARS:
+        os.environ[var] = str(n_threads)
+    try:
+        from threadpoolctl import threadpool_limits
+        threadpool_limits(n_threads)
+    except ImportError:
+        pass
+
+
+def _run_job(worker, key, kwargs, n_threads, fingerprint=None):
+    started = time.time()
+    try:
+        result = worker(n_threads=n_threads, **kwargs) or {}
+        status, error = "ok", None
+    except Exception as e:
+        result = {}
+        status, error = "error", f"{e}\n{traceback.format_exc()}"
+    entry = {
+        "key": key,
+        "status": status,
+        "fingerprint": fingerprint,
+        "config": kwargs,
+        "metrics": result.get("metrics", {}),
+        "timings": {**result.get("timings", {}), "job_seconds": time.time() - started},
+        "model_path": result.get("model_path"),
+        "error": error,
+        "threads": n_threads,
+        "pid": os.getpid(),
+        "finished_at": datetime.now().isoformat(timespec="seconds"),
+    }
+    return entry
+
+
+def plan_workers(n_jobs, max_workers=None, threads_per_job=None):
+    """Split the machine's cores between concurrent jobs."""
+    cores = os.cpu_count() or 1
+    if max_workers is None:
+        per_job = threads_per_job or max(1, min(4, cores))
+        max_workers = max(1, cores // per_job)
+    max_workers = max(1, min(max_workers, n_jobs or 1))
+    if threads_per_job is None:
+        threads_per_job = max(1, cores // max_workers)
+    return max_workers, threads_per_job
+
+
+def run_grid(jobs, worker, ledger, max_workers=None, threads_per_job=None, rerun_failed=True,
+             data_paths=()):
+    """
+    Run `worker(n_threads=..., **kwargs)` for every (key, kwargs) in `jobs`.
+
+    `worker` must be a module-level function returning
+    {"metrics": {...}, "timings": {...}, "model_path": str}. `data_paths` are
+    the files the workers read; a ledger entry only counts as finished while
+    they and the job's kwargs are unchanged. Returns the ledger entries of this
+    grid (skipped + newly run), keyed by job key.
+    """
+    done = read_ledger(ledger)
+    fingerprints = {key: job_fingerprint(kwargs, data_paths) for key, kwargs in jobs}
+
+    def finished(key):
+        entry = done.get(key)
+        if entry is None or entry.get("fingerprint") != fingerprints[key]:
+            return False
+        return entry["status"] == "ok" or not rerun_failed
+
+    pending = [(key, kwargs) for key, kwargs in jobs if not finished(key)]
+    skipped = len(jobs) - len(pending)
+    if skipped:
+        print(f"Skipping {skipped} finished job(s) recorded in {ledger}")
+    stale = sum(1 for key, _ in pending if key in done and done[key].get("fingerprint") != fingerprints[key])
+    if stale:
+        print(f"Re-running {stale} job(s) whose config or data changed since they were recorded")
+    if not pending:
+        return {key: done[key] for key, _ in jobs if key in done}
+
+    max_workers, threads_per_job = plan_workers(len(pending), max_workers, threads_per_job)
+    print(f"Running {len(pending)} job(s) on {max_workers} process(es) x {threads_per_job} thread(s)")
+
+    with ProcessPoolExecutor(max_workers=max_workers, initializer=_limit_threads,
+                             initargs=(threads_per_job,)) as pool:
+        futures = {pool.submit(_run_job, worker, key, kwargs, threads_per_job, fingerprints[key]): key
+                   for key, kwargs in pending}
+        for future in as_completed(futures):
+            entry = future.result()
+            append_ledger(ledger, entry)
+            done[entry["key"]] = entry
+            if entry["status"] == "ok":
+                acc = entry["metrics"].get("accuracy")
+                acc_text = f" acc={acc:.4f}" if acc is not None else ""
+                print(f"✅ {entry['key']}{acc_text} ({entry['timings']['job_seconds']:.1f}s)")
+            else:
+                print(f"❌ {entry['key']} failed: {entry['error'].splitlines()[0]}")
+
+    return {key: done[key] for key, _ in jobs
+            if key in done and done[key].get("fingerprint") == fingerprints[key]}
+
+
+def add_grid_args(parser):
+    parser.add_argument("--workers", type=int, default=None, help="concurrent jobs (default: cores / threads)")
+    parser.add_argument("--threads", type=int, default=None, help="threads per job (default: cores / workers)")
+    parser.add_argument("--ledger", default=None, help="results ledger path (default: experiment_results/<script>.jsonl)")
+    parser.add_argument("--no-retry-failed", action="store_true", help="also skip jobs that failed before")
+    return parser
+
+
+def grid_args(script_file, description):
+    args = add_grid_args(argparse.ArgumentParser(description=description)).parse_args()
+    args.ledger = args.ledger or ledger_path(script_file)
+    return args
+
+
+def print_summary(entries):
+    print("\n" + "=" * 60)
+    print("GRID SUMMARY")
+    print("=" * 60)
+    ranked = sorted(entries.values(), key=lambda e: e["metrics"].get("accuracy", -1), reverse=True)
+    for e in ranked:
+        acc = e["metrics"].get("accuracy")
+        acc_text = f"{acc:.4f}" if acc is not None else "  -   "
+        print(f"{e['key']:<45} {e['status']:<6} acc={acc_text}  {e['timings'].get('job_seconds', 0):7.1f}s")
@@ -0,0 +1,30 @@
+# utils/text_mapping.py
+"""
+Helpers for mapping low-cardinality text columns (SF CallType has a few dozen
+distinct values over millions of rows).
+
+map_distinct() runs a vectorized mapper over the distinct values only, then
+broadcasts the result to every row through the categorical codes. The
+per-row Python work goes from O(rows) to O(distinct values).
+"""
+import re
+import numpy as np
+import pandas as pd
+
+
+def keyword_pattern(keywords):
+    """One precompiled alternation matching any of `keywords` as a substring."""
+    return re.compile("|".join(re.escape(kw) for kw in keywords))
+
+
+def map_distinct(series, mapper):
+    """
+    Apply `mapper` (Series of distinct values -> Series of results, same order) once
+    per distinct value and broadcast back to `series`. Missing values are passed
+    through the mapper too, so NaN handling matches a row-by-row apply.
+    """
+    cat = series.astype("category")
+    distinct = pd.Series(list(cat.cat.categories) + [np.nan], dtype=object)
+    mapped = np.asarray(mapper(distinct), dtype=object)
+    # code -1 (missing) indexes the trailing NaN entry
+    return pd.Series(mapped[cat.cat.codes.to_numpy()], index=series.index)
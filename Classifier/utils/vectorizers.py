@@ -0,0 +1,71 @@
+# utils/vectorizers.py
+"""
+Text vectorizer choices shared by the trainers, validation scripts and the
+production service.
+
+"tfidf"    TfidfVectorizer with a fitted vocabulary (the original setup)
+"hashing"  HashingVectorizer + TfidfTransformer. There is no vocabulary to
+           store or look up: the bundle only carries the idf vector, and
+           featurization is stateless apart from that.
+
+Both are plain sklearn objects, so the bundles unpickle without this module.
+"""
+import os
+from sklearn.feature_extraction.text import TfidfVectorizer, HashingVectorizer, TfidfTransformer
+from sklearn.pipeline import Pipeline
+
+VECTORIZER_KINDS = ("tfidf", "hashing")
+HASH_FEATURES = 2 ** 18  # ~260k buckets keeps collisions rare for 1-3 grams of call titles
+
+
+def make_vectorizer(kind="tfidf", ngram_range=(1, 3), min_df=5, max_features=15000,
+                    strip_accents="unicode", lowercase=True, n_features=HASH_FEATURES):
+    """Unfitted vectorizer; min_df/max_features only apply to the vocabulary-based kind."""
+    if kind == "tfidf":
+        return TfidfVectorizer(ngram_range=ngram_range, min_df=min_df, max_features=max_features,
+                               strip_accents=strip_accents, lowercase=lowercase)
+    if kind == "hashing":
+        return Pipeline([
+            ("hash", HashingVectorizer(ngram_range=ngram_range, strip_accents=strip_accents,
+                                       lowercase=lowercase, n_features=n_features,
+                                       alternate_sign=False, norm=None)),
+            ("tfidf", TfidfTransformer()),
+        ])
+    raise ValueError(f"unknown vectorizer kind {kind!r}, expected one of {VECTORIZER_KINDS}")
+
+
+def vectorizer_kind(vect):
+    if isinstance(vect, Pipeline) and isinstance(vect.steps[0][1], HashingVectorizer):
+        return "hashing"
+    return "tfidf"
+
+
+def slim(vect):
+    """
+    Drop TfidfVectorizer.stop_words_ before pickling. It holds every n-gram cut by
+    min_df/max_features, is only there for introspection, and dominates bundle size.
+    """
+    if hasattr(vect, "stop_words_"):
+        vect.stop_words_ = None
+    return vect
+
+
+def describe(vect):
+    if vectorizer_kind(vect) == "hashing":
+        return f"Hashing vectorizer: {vect.named_steps['hash'].n_features:,} buckets"
+    return f"Vocabulary size: {len(vect.vocabulary_):,}"
+
+
+def bundle_path(path, kind):
+    """models/X.pkl -> models/X_Hashing.pkl for hashing bundles, unchanged for tfidf."""
+    if kind == "tfidf":
+        return path
+    root, ext = os.path.splitext(path)
+    return f"{root}_{kind.capitalize()}{ext}"
+
+
+def add_vectorizer_arg(parser):
+    parser.add_argument("--vectorizer", choices=VECTORIZER_KINDS,
+                        default=os.getenv("CLASSIFIER_VECTORIZER", "tfidf"),
+                        help="tfidf (fitted vocabulary) or hashing (HashingVectorizer + idf)")
+    return parser
@@ -3,19 +3,25 @@ import numpy as np
 import matplotlib.pyplot as plt
 import seaborn as sns
 from sklearn.model_selection import cross_val_score, StratifiedKFold
-from sklearn.feature_extraction.text import TfidfVectorizer
 from xgboost import XGBClassifier
 from sklearn.preprocessing import LabelEncoder
 from sklearn.metrics import confusion_matrix, classification_report
 from sklearn.model_selection import train_test_split
 import os
+import sys
+import argparse
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+from utils.vectorizers import make_vectorizer, add_vectorizer_arg
+
+VECTORIZER = add_vectorizer_arg(argparse.ArgumentParser(description="Subtype cross-validation")).parse_args().vectorizer
 
 # Create output directory
 os.makedirs('validation_results', exist_ok=True)
 
 print("="*70)
 print("SUBTYPE CLASSIFIER VALIDATION")
-print("5-Fold Cross-Validation + Confusion Matrices")
+print(f"5-Fold Cross-Validation + Confusion Matrices ({VECTORIZER} vectorizer)")
 print("="*70)
 
 # Load Montgomery data
@@ -46,7 +52,7 @@ X_ems = ems_df['emergency_title']
 y_ems = ems_df['emergency_subtype']
 
 # Vectorize
-vectorizer_ems = TfidfVectorizer(min_df=5, max_features=15000, ngram_range=(1, 3))
+vectorizer_ems = make_vectorizer(VECTORIZER, min_df=5, max_features=15000, ngram_range=(1, 3), strip_accents=None)
 X_ems_vec = vectorizer_ems.fit_transform(X_ems)
 
 # Encode labels
@@ -127,7 +133,7 @@ X_fire = fire_df['emergency_title']
 y_fire = fire_df['emergency_subtype']
 
 # Vectorize
-vectorizer_fire = TfidfVectorizer(min_df=5, max_features=15000, ngram_range=(1, 3))
+vectorizer_fire = make_vectorizer(VECTORIZER, min_df=5, max_features=15000, ngram_range=(1, 3), strip_accents=None)
 X_fire_vec = vectorizer_fire.fit_transform(X_fire)
 
 # Encode labels
@@ -201,7 +207,7 @@ X_traffic = traffic_df['emergency_title']
 y_traffic = traffic_df['emergency_subtype']
 
 # Vectorize
-vectorizer_traffic = TfidfVectorizer(min_df=5, max_features=15000, ngram_range=(1, 3))
+vectorizer_traffic = make_vectorizer(VECTORIZER, min_df=5, max_features=15000, ngram_range=(1, 3), strip_accents=None)
 X_traffic_vec = vectorizer_traffic.fit_transform(X_traffic)
 
 # Encode labels
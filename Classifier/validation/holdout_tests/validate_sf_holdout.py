@@ -1,11 +1,14 @@
+import sys
 import pandas as pd
 import joblib
 from sklearn.metrics import classification_report, confusion_matrix
 
 print("=== SF Held-Out Validation ===\n")
 
-# Load combined model
-model_bundle = joblib.load('models/XGBoost_Combined_MultiJurisdiction.pkl')
+# Load combined model (pass a bundle path to compare, e.g. the *_Hashing.pkl variant)
+model_path = sys.argv[1] if len(sys.argv) > 1 else 'models/XGBoost_Combined_MultiJurisdiction.pkl'
+print(f"Model: {model_path}")
+model_bundle = joblib.load(model_path)
 model = model_bundle['model']
 vect = model_bundle['vect']
 le = model_bundle['label_encoder']
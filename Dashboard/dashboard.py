@@ -1,21 +1,47 @@
 import os
+import hashlib
+import threading
+from time import perf_counter
 from pathlib import Path
 from dotenv import load_dotenv
 import dash
-from dash import html, dcc, Input, Output, State, ctx
+from dash import html, dcc, Input, Output, State, ctx, no_update
 import dash_bootstrap_components as dbc
 import plotly.express as px
 import plotly.graph_objects as go
 import pandas as pd
 from mysql.connector import pooling
 from datetime import datetime
+from flask import jsonify
+from plotly.io.json import to_json_plotly
+from cache import TTLCache, normalize_filters
+from metadata import DatasetMetadata
+from snapshots import SnapshotStore
+
+STARTUP_STARTED = perf_counter()
+STARTUP_BUDGET = float(os.getenv('DASHBOARD_STARTUP_BUDGET', 2.0))  # seconds
 
 # load env from API subfolder
 env_path = Path(__file__).parent.parent / 'crisislens-API' / '.env'
 load_dotenv(env_path)
 
+class LazyPool:
+    """Creates the MySQL pool on first use so importing the dashboard never touches the DB"""
+
+    def __init__(self, **config):
+        self.config = config
+        self._pool = None
+        self._lock = threading.Lock()
+
+    def get_connection(self):
+        if self._pool is None:
+            with self._lock:
+                if self._pool is None:
+                    self._pool = pooling.MySQLConnectionPool(**self.config)
+        return self._pool.get_connection()
+
 # setup db pool
-pool = pooling.MySQLConnectionPool(
+pool = LazyPool(
     pool_name="main",
     pool_size=5,
     host=os.getenv('DB_HOST'),
@@ -24,26 +50,52 @@ pool = pooling.MySQLConnectionPool(
     database=os.getenv('DB_NAME')
 )
 
-def get_date_bounds():
-    """Get min/max dates from emergency_data for dynamic date picker defaults"""
-    conn = pool.get_connection()
-    try:
-        df = pd.read_sql("SELECT MIN(DATE(timestamp)) as start, MAX(DATE(timestamp)) as end FROM emergency_data", conn)
-        return df.at[0, 'start'], df.at[0, 'end']
-    finally:
-        if conn.is_connected():
-            conn.close()
+# filter-keyed caches: aggregate query results and the finished figure/KPI outputs
+CACHE_TTL = int(os.getenv('DASHBOARD_CACHE_TTL', 300))
+data_cache = TTLCache(maxsize=32, ttl=CACHE_TTL)
+figure_cache = TTLCache(maxsize=128, ttl=CACHE_TTL)
 
-min_date, max_date = get_date_bounds() 
+# precomputed default view + most requested filter combos, refreshed in the background
+snapshots = SnapshotStore(
+    os.getenv('DASHBOARD_SNAPSHOT_PATH', str(Path(__file__).parent / 'snapshots.json')),
+    top_n=int(os.getenv('DASHBOARD_SNAPSHOT_TOP_N', 10)),
+    interval=int(os.getenv('DASHBOARD_SNAPSHOT_INTERVAL', 600))
+)
 
-def get_calls(start=None, end=None, types=None, town=None, zip_code=None):
-    """Grab emergency calls with filters, with dynamic date handling"""
-    q = """
-        SELECT timestamp, emergency_type, caller_age, caller_gender,
-               latitude, longitude, emergency_title, township, zipcode
-        FROM emergency_data
-        WHERE 1=1
-    """
+def clear_result_caches():
+    """New data landed in emergency_data, so cached results are stale"""
+    data_cache.clear()
+    figure_cache.clear()
+    snapshots.request_refresh()
+
+# date bounds + dropdown options, shared by the layout and the filter clamp
+metadata = DatasetMetadata(
+    pool,
+    refresh_interval=int(os.getenv('DASHBOARD_METADATA_REFRESH', 300)),
+    on_change=clear_result_caches
+)
+
+def filter_key(start=None, end=None, types=None, town=None, zip_code=None):
+    """Cache key for a filter set; a date range spanning the whole dataset equals no range"""
+    data = metadata.peek()
+    if data and start and end and data['min_date'] is not None:
+        if str(start)[:10] <= str(data['min_date']) and str(end)[:10] >= str(data['max_date']):
+            start = end = None
+    return normalize_filters(start, end, types, town, zip_code)
+
+AGE_BINS = 25
+
+# map rendering: individual points below the threshold, density bins above it
+MAP_POINT_LIMIT = int(os.getenv('DASHBOARD_MAP_POINTS', 5000))
+MAP_DETAIL_ZOOM = 13            # zoomed in this far, always draw points
+MAP_CELLS_PER_TILE = 16         # density grid resolution per 256px map tile
+MAP_MAX_BYTES = int(os.getenv('DASHBOARD_MAP_MAX_BYTES', 2_000_000))
+MAP_DEFAULT_ZOOM = 9
+MAP_COLORS = {'EMS': '#22c55e', 'Fire': '#ef4444', 'Traffic': '#3b82f6'}
+
+def build_filters(start=None, end=None, types=None, town=None, zip_code=None):
+    """Build the shared WHERE clause + params for every dashboard query"""
+    where = " WHERE 1=1"
     params = []
 
     # Handle date filters with clamping to actual dataset bounds
@@ -52,81 +104,219 @@ def get_calls(start=None, end=None, types=None, town=None, zip_code=None):
         start_date = pd.to_datetime(start).date() if isinstance(start, str) else start
         end_date = pd.to_datetime(end).date() if isinstance(end, str) else end
 
-        # Clamp to available min/max dates in dataset
-        conn = pool.get_connection()
-        try:
-            bounds = pd.read_sql(
-                "SELECT MIN(DATE(timestamp)) as start, MAX(DATE(timestamp)) as end FROM emergency_data",
-                conn
-            )
-            min_ts = bounds.at[0, 'start']
-            max_ts = bounds.at[0, 'end']
-            start_date = max(start_date, min_ts)
-            end_date = min(end_date, max_ts)
-        finally:
-            if conn.is_connected():
-                conn.close()
+        # Clamp to available min/max dates in dataset (cached, no extra query)
+        start_date, end_date = metadata.clamp(start_date, end_date)
 
-        q += " AND DATE(timestamp) BETWEEN %s AND %s"
-        params.extend([start_date, end_date])
+        # half-open range on the raw column so MySQL can use an index on timestamp
+        where += " AND timestamp >= %s AND timestamp < %s"
+        params.extend([start_date, end_date + pd.Timedelta(days=1)])
 
     # Emergency type filter
     if types and len(types) > 0:
         placeholders = ','.join(['%s'] * len(types))
-        q += f" AND emergency_type IN ({placeholders})"
+        where += f" AND emergency_type IN ({placeholders})"
         params.extend(types)
 
     # Township filter
     if town:
-        q += " AND township = %s"
+        where += " AND township = %s"
         params.append(town)
 
     # Zipcode filter
     if zip_code:
-        q += " AND zipcode = %s"
+        where += " AND zipcode = %s"
         params.append(zip_code)
 
-    # Execute query
-    conn = pool.get_connection()
+    return where, params
+
+def get_aggregates(start=None, end=None, types=None, town=None, zip_code=None):
+    """Cached aggregates for a filter set; concurrent callers share one query"""
+    cache_key = filter_key(start, end, types, town, zip_code)
+    return data_cache.get_or_set(
+        cache_key, lambda: query_aggregates(start, end, types, town, zip_code)
+    )
+
+def query_aggregates(start=None, end=None, types=None, town=None, zip_code=None):
+    """
+    Ask MySQL for exactly what the dashboard draws: daily counts, type/gender/hour
+    counts, a 25-bin age histogram and KPIs. Map data comes from get_map_data.
+    Returns None on db error.
+    """
+    conn = None
     try:
-        df = pd.read_sql(q, conn, params=params)
-        if not df.empty and 'timestamp' in df.columns:
-            df['timestamp'] = pd.to_datetime(df['timestamp'])
-        return df
+        where, params = build_filters(start, end, types, town, zip_code)
+        conn = pool.get_connection()
+        summary = pd.read_sql(
+            f"""SELECT COUNT(*) AS total, AVG(caller_age) AS avg_age,
+                       MIN(caller_age) AS min_age, MAX(caller_age) AS max_age
+                FROM emergency_data{where}""",
+            conn, params=params
+        ).iloc[0]
+        total = int(summary['total'])
+        agg = {'total': total}
+        if total == 0:
+            return agg
+
+        agg['avg_age'] = None if pd.isna(summary['avg_age']) else float(summary['avg_age'])
+
+        agg['daily'] = pd.read_sql(
+            f"SELECT DATE(timestamp) AS day, COUNT(*) AS count FROM emergency_data{where} GROUP BY day ORDER BY day",
+            conn, params=params
+        )
+        agg['types'] = pd.read_sql(
+            f"""SELECT emergency_type, COUNT(*) AS count FROM emergency_data{where}
+                GROUP BY emergency_type ORDER BY count DESC, emergency_type""",
+            conn, params=params
+        )
+        agg['genders'] = pd.read_sql(
+            f"""SELECT caller_gender, COUNT(*) AS count FROM emergency_data{where}
+                AND caller_gender IS NOT NULL GROUP BY caller_gender ORDER BY count DESC""",
+            conn, params=params
+        )
+        agg['hours'] = pd.read_sql(
+            f"""SELECT HOUR(timestamp) AS hour, COUNT(*) AS count FROM emergency_data{where}
+                GROUP BY hour ORDER BY count DESC, hour""",
+            conn, params=params
+        )
+
+        # fixed-width age bins computed server side
+        if pd.isna(summary['min_age']):
+            agg['age_bins'] = pd.DataFrame(columns=['bin_start', 'count'])
+            agg['age_width'] = 1
+        else:
+            min_age, max_age = int(summary['min_age']), int(summary['max_age'])
+            width = max(1, -(-(max_age - min_age + 1) // AGE_BINS))
+            agg['age_bins'] = pd.read_sql(
+                f"""SELECT %s + FLOOR((caller_age - %s) / %s) * %s AS bin_start, COUNT(*) AS count
+                    FROM emergency_data{where} AND caller_age IS NOT NULL
+                    GROUP BY bin_start ORDER BY bin_start""",
+                conn, params=[min_age, min_age, width, width] + params
+            )
+            agg['age_width'] = width
+
+        return agg
     except Exception as e:
         print(f"db error: {e}")
-        return pd.DataFrame()
+        return None
     finally:
-        if conn.is_connected():
+        if conn is not None and conn.is_connected():
             conn.close()
 
 
-def get_townships():
-    """get unique townships for dropdown"""
-    conn = pool.get_connection()
-    try:
-        query = "SELECT DISTINCT township FROM emergency_data WHERE township IS NOT NULL ORDER BY township"
-        df = pd.read_sql(query, conn)
-        return [{'label': t, 'value': t} for t in df['township'].tolist()]
-    except:
-        return []
-    finally:
-        if conn.is_connected():
-            conn.close()
+def map_cell_size(zoom):
+    """Density grid cell edge in degrees for a mapbox zoom level"""
+    return 360 / (2 ** zoom) / MAP_CELLS_PER_TILE
 
-def get_zipcodes():
-    """get unique zipcodes for dropdown"""
-    conn = pool.get_connection()
+def get_map_data(total, zoom, start=None, end=None, types=None, town=None, zip_code=None, sample_limit=MAP_POINT_LIMIT):
+    """
+    Points mode: a random sample of at most `sample_limit` calls.
+    Density mode: per-cell counts on a zoom-dependent grid plus up to k calls
+    stratified-sampled from each cell for hover detail.
+    """
+    mode = 'points' if total <= MAP_POINT_LIMIT or zoom >= MAP_DETAIL_ZOOM else 'density'
+    cache_key = filter_key(start, end, types, town, zip_code) + (mode, zoom, sample_limit)
+    cached = data_cache.get(cache_key)
+    if cached is not None:
+        return cached
+
+    conn = None
     try:
-        query = "SELECT DISTINCT zipcode FROM emergency_data WHERE zipcode IS NOT NULL ORDER BY zipcode"
-        df = pd.read_sql(query, conn)
-        return [{'label': str(z), 'value': str(z)} for z in df['zipcode'].tolist()]
-    except:
-        return []
+        where, params = build_filters(start, end, types, town, zip_code)
+        where += " AND latitude IS NOT NULL AND longitude IS NOT NULL"
+        conn = pool.get_connection()
+        map_data = {'mode': mode}
+        if mode == 'points':
+            fraction = min(1.0, sample_limit * 1.2 / max(total, 1))
+            map_data['points'] = pd.read_sql(
+                f"""SELECT latitude, longitude, emergency_title, township, zipcode, emergency_type
+                    FROM emergency_data{where} AND RAND() < %s LIMIT %s""",
+                conn, params=params + [fraction, sample_limit]
+            )
+        else:
+            cell = map_cell_size(zoom)
+            bins = pd.read_sql(
+                f"""SELECT FLOOR(latitude / %s) AS cell_lat, FLOOR(longitude / %s) AS cell_lon, COUNT(*) AS count
+                    FROM emergency_data{where} GROUP BY cell_lat, cell_lon""",
+                conn, params=[cell, cell] + params
+            )
+            bins['latitude'] = (bins['cell_lat'] + 0.5) * cell
+            bins['longitude'] = (bins['cell_lon'] + 0.5) * cell
+            map_data['bins'] = bins
+
+            per_cell = max(1, sample_limit // max(len(bins), 1))
+            map_data['points'] = pd.read_sql(
+                f"""SELECT latitude, longitude, emergency_title, township, zipcode, emergency_type
+                    FROM (
+                        SELECT latitude, longitude, emergency_title, township, zipcode, emergency_type,
+                               ROW_NUMBER() OVER (
+                                   PARTITION BY FLOOR(latitude / %s), FLOOR(longitude / %s)
+                                   ORDER BY RAND()
+                               ) AS rn
+                        FROM emergency_data{where}
+                    ) sampled
+                    WHERE rn <= %s LIMIT %s""",
+                conn, params=[cell, cell] + params + [per_cell, sample_limit]
+            )
+
+        data_cache.set(cache_key, map_data)
+        return map_data
+    except Exception as e:
+        print(f"db error: {e}")
+        return None
     finally:
-        if conn.is_connected():
+        if conn is not None and conn.is_connected():
             conn.close()
 
+def build_map_figure(map_data, zoom, uirevision):
+    """Scatter for points mode; density heat layer + sampled points otherwise"""
+    points = map_data['points']
+    map_fig = px.scatter_mapbox(
+        points, 
+        lat='latitude', 
+        lon='longitude',
+        hover_name='emergency_title',
+        hover_data={
+            'township': True,
+            'zipcode': True,
+            'emergency_type': True,
+            'latitude': False,
+            'longitude': False
+        },
+        color='emergency_type',
+        color_discrete_map=MAP_COLORS,
+        zoom=zoom, 
+        height=550
+    )
+    if map_data['mode'] == 'density':
+        bins = map_data['bins']
+        map_fig.add_trace(go.Densitymapbox(
+            lat=bins['latitude'],
+            lon=bins['longitude'],
+            z=bins['count'],
+            radius=20,
+            colorscale=[[0, 'rgba(34, 197, 94, 0)'], [0.4, '#15803d'], [1, '#86efac']],
+            showscale=False,
+            hovertemplate='Calls in area: %{z:,}<extra></extra>',
+            name='Density'
+        ))
+        # keep the heat layer underneath the sampled points
+        map_fig.data = (map_fig.data[-1],) + map_fig.data[:-1]
+        map_fig.update_traces(marker={'size': 5, 'opacity': 0.6}, selector={'type': 'scattermapbox'})
+
+    map_fig.update_layout(
+        mapbox_style="carto-darkmatter",
+        paper_bgcolor='rgba(0,0,0,0)',
+        margin={"r":0, "t":0, "l":0, "b":0},
+        uirevision=uirevision,
+        legend=dict(
+            font=dict(size=11, color='#e0e0e0'), 
+            bgcolor='rgba(18, 18, 18, 0.8)',
+            bordercolor='rgba(34, 197, 94, 0.2)',
+            borderwidth=1
+        )
+    )
+    return map_fig
+
 # dash setup with modern dark theme
 app = dash.Dash(__name__, external_stylesheets=[dbc.themes.CYBORG])
 app.title = "CrisisLens"
@@ -439,21 +629,6 @@ app.index_string = '''
 </html>
 '''
 
-# Preload dropdown options
-township_options = get_townships()
-zipcode_options = get_zipcodes()
-def get_emergency_types():
-    """Get unique emergency types for dropdown"""
-    conn = pool.get_connection()
-    try:
-        df = pd.read_sql("SELECT DISTINCT emergency_type FROM emergency_data WHERE emergency_type IS NOT NULL ORDER BY emergency_type", conn)
-        return [{'label': t, 'value': t} for t in df['emergency_type'].tolist()]
-    finally:
-        if conn.is_connected():
-            conn.close()
-
-type_options = get_emergency_types()
-
 # Enhanced layout
 app.layout = dbc.Container([
     # Header
@@ -475,8 +650,8 @@ app.layout = dbc.Container([
                         html.Label("Date Range"),
                         dcc.DatePickerRange(
                             id='date-range',
-                            start_date=min_date,
-                            end_date=max_date,
+                            start_date=None,
+                            end_date=None,
                             display_format='YYYY-MM-DD',
                             style={'width': '100%'}
                         ),
@@ -485,7 +660,7 @@ app.layout = dbc.Container([
                         html.Label("Emergency Type"),
                         dcc.Dropdown(
                             id='call-types',
-                            options=type_options,
+                            options=[],
                             multi=True, # Allow multiple selections
                             placeholder="All types",
                             style={
@@ -500,7 +675,7 @@ app.layout = dbc.Container([
                         html.Label("Township"),
                         dcc.Dropdown(
                             id='township',
-                            options=township_options,
+                            options=[],
                             placeholder="All townships",
                             style={
                                 'backgroundColor': '#1e1e1e',  # dark background
@@ -513,7 +688,7 @@ app.layout = dbc.Container([
                         html.Label("Zipcode"),
                         dcc.Dropdown(   
                             id='zipcode',
-                            options=zipcode_options,
+                            options=[],
                             placeholder="All zipcodes",
                             style={
                                 'backgroundColor': '#1e1e1e',  # dark background
@@ -629,10 +804,23 @@ app.layout = dbc.Container([
                     type="default",
                     color="#22c55e"
                 )
-            ], className="chart-container", id='map-container')
+            ], className="chart-container", id='map-container'),
+            dcc.Store(id='map-zoom', data=MAP_DEFAULT_ZOOM)
         ], md=4),
     ], className="g-3"),
     
+    # Dropdown options + date defaults arrive from the metadata cache once loaded
+    dcc.Interval(id='metadata-poll', interval=1000, n_intervals=0),
+
+    # Shared dataset handle: the normalized filter key, never the data itself.
+    # Each figure keeps a digest so unchanged figures return no_update.
+    dcc.Store(id='filter-key'),
+    dcc.Store(id='timeline-digest'),
+    dcc.Store(id='pie-digest'),
+    dcc.Store(id='age-digest'),
+    dcc.Store(id='gender-digest'),
+    dcc.Store(id='kpis-digest'),
+
     # Modal
     dbc.Modal([
         dbc.ModalHeader(dbc.ModalTitle(id='modal-title')),
@@ -641,74 +829,62 @@ app.layout = dbc.Container([
     
 ], fluid=True, style={'maxWidth': '1900px', 'padding': '24px'})
 
+# Define theme colors
+GREEN = '#22c55e'
+GREEN_DARK = '#15803d'
+GREEN_LIGHT = '#86efac'
+
+def key_from_store(data):
+    """Filter key as held in the filter-key dcc.Store (JSON lists) back to tuple form"""
+    start, end, types, town, zip_code = data
+    return (start, end, tuple(types), town, zip_code)
+
+def filters_from_key(key):
+    start, end, types, town, zip_code = key
+    return start, end, list(types) or None, town, zip_code
+
 @app.callback(
-    [Output('timeline-chart', 'figure'),
-     Output('type-pie', 'figure'),
-     Output('age-bars', 'figure'),
-     Output('gender-chart', 'figure'),
-     Output('map-view', 'figure'),
-     Output('total-calls', 'children'),
-     Output('top-type', 'children'),
-     Output('avg-age', 'children'),
-     Output('peak-hour', 'children')],
+    Output('filter-key', 'data'),
     [Input('date-range', 'start_date'),
      Input('date-range', 'end_date'),
      Input('call-types', 'value'),
      Input('township', 'value'),
-     Input('zipcode', 'value')]
+     Input('zipcode', 'value')],
+    [State('filter-key', 'data')]
 )
-def update_dashboard(start, end, types, town, zip_code):
-    # Fetch filtered data
-    df = get_calls(start, end, types, town, zip_code)
-    
-    # Define theme colors
-    GREEN = '#22c55e'
-    GREEN_DARK = '#15803d'
-    GREEN_LIGHT = '#86efac'
-    
-    # Handle empty data
-    if df.empty:
-        empty = go.Figure()
-        empty.update_layout(
-            template='plotly_dark',
-            paper_bgcolor='rgba(0,0,0,0)',
-            plot_bgcolor='rgba(0,0,0,0)',
-            xaxis={'visible': False},
-            yaxis={'visible': False},
-            annotations=[{
-                'text': 'No data available for selected filters',
-                'xref': 'paper', 'yref': 'paper',
-                'showarrow': False,
-                'font': {'size': 18, 'color': '#6b7280'}
-            }]
-        )
-        return [empty]*5 + ["0", "—", "—", "—"]
-    
+def update_filter_key(start, end, types, town, zip_code, current):
+    """
+    Single entry point for filter changes. Every figure hangs off this cache key,
+    so equivalent filter sets (e.g. full date range vs none) don't refire anything.
+    """
+    key = filter_key(start, end, types, town, zip_code)
+    snapshots.record_use(key)
+    if current is not None and key_from_store(current) == key:
+        return no_update
+    return list(key)
+
+def build_timeline(agg):
     # Smart time aggregation based on date range
-    if not df.empty and 'timestamp' in df.columns:
-        start_dt = df['timestamp'].min()
-        end_dt = df['timestamp'].max()
-        days_span = (end_dt - start_dt).days
-    else:
-        days_span = 365  # fallback
+    daily = agg['daily'].copy()
+    daily['day'] = pd.to_datetime(daily['day'])
+    days_span = (daily['day'].max() - daily['day'].min()).days
 
-    # Determine aggregation level
+    # Determine aggregation level (daily counts are rolled up, never raw rows)
     if days_span > 730:  # More than 2 years - aggregate by year
-        df['period'] = df['timestamp'].dt.to_period('Y').astype(str)
+        daily['period'] = daily['day'].dt.to_period('Y').astype(str)
         time_label = 'Yearly Volume'
         hover_format = '<b>%{x}</b><br>Calls: %{y:,}<extra></extra>'
     elif days_span > 90:  # More than 3 months - aggregate by month
-        df['period'] = df['timestamp'].dt.to_period('M').dt.to_timestamp()
+        daily['period'] = daily['day'].dt.to_period('M').dt.to_timestamp()
         time_label = 'Monthly Volume'
         hover_format = '<b>%{x|%B %Y}</b><br>Calls: %{y:,}<extra></extra>'
     else:  # Daily aggregation
-        df['period'] = df['timestamp'].dt.date
+        daily['period'] = daily['day'].dt.date
         time_label = 'Daily Volume'
         hover_format = '<b>%{x}</b><br>Calls: %{y:,}<extra></extra>'
     
     # Aggregate timeline data
-    timeline_data = df.groupby('period').size().reset_index()
-    timeline_data.columns = ['period', 'count']
+    timeline_data = daily.groupby('period')['count'].sum().reset_index()
     
     # Timeline chart
     timeline = go.Figure()
@@ -732,9 +908,11 @@ def update_dashboard(start, end, types, town, zip_code):
         hovermode='x unified',
         hoverlabel=dict(bgcolor='rgba(18, 18, 18, 0.9)', font_color=GREEN)
     )
-    
+    return timeline
+
+def build_type_pie(agg):
     # Type breakdown pie
-    type_counts = df['emergency_type'].value_counts()
+    type_counts = agg['types'].set_index('emergency_type')['count']
     colors_pie = [GREEN, GREEN_DARK, GREEN_LIGHT, '#166534']
     
     type_pie = go.Figure(data=[go.Pie(
@@ -754,18 +932,24 @@ def update_dashboard(start, end, types, town, zip_code):
         showlegend=True,
         legend=dict(font=dict(size=11, color='#e0e0e0'), bgcolor='rgba(0,0,0,0)')
     )
-    
+    return type_pie
+
+def build_age_hist(agg):
     # Age distribution
+    age_bins = agg['age_bins']
+    age_width = agg['age_width']
     age_hist = go.Figure()
-    age_hist.add_trace(go.Histogram(
-        x=df['caller_age'],
-        nbinsx=25,
+    age_hist.add_trace(go.Bar(
+        x=age_bins['bin_start'].astype(float) + age_width / 2,
+        y=age_bins['count'],
+        width=age_width,
+        customdata=[f"{int(b)}-{int(b) + age_width - 1}" for b in age_bins['bin_start']],
         marker=dict(
             color=GREEN, 
             line=dict(color='#0a0a0a', width=1),
             opacity=0.8
         ),
-        hovertemplate='Age: %{x}<br>Count: %{y:,}<extra></extra>'
+        hovertemplate='Age: %{customdata}<br>Count: %{y:,}<extra></extra>'
     ))
     age_hist.update_layout(
         template='plotly_dark',
@@ -777,9 +961,11 @@ def update_dashboard(start, end, types, town, zip_code):
         yaxis={'title': {'text': 'Count', 'font': {'color': '#9ca3af'}}, 'showgrid': True, 'gridcolor': 'rgba(34, 197, 94, 0.1)', 'color': '#6b7280'},
         bargap=0.05
     )
-    
+    return age_hist
+
+def build_gender_donut(agg):
     # Gender donut
-    gender_data = df['caller_gender'].value_counts()
+    gender_data = agg['genders'].set_index('caller_gender')['count']
     gender_colors = [GREEN, GREEN_DARK, GREEN_LIGHT]
     
     gender_donut = go.Figure(data=[go.Pie(
@@ -799,62 +985,226 @@ def update_dashboard(start, end, types, town, zip_code):
         showlegend=True,
         legend=dict(font=dict(size=11, color='#e0e0e0'), bgcolor='rgba(0,0,0,0)')
     )
-    
-    # Map visualization
-    map_fig = px.scatter_mapbox(
-        df, 
-        lat='latitude', 
-        lon='longitude',
-        hover_name='emergency_title',
-        hover_data={
-            'township': True,
-            'zipcode': True,
-            'emergency_type': True,
-            'latitude': False,
-            'longitude': False
-        },
-        color='emergency_type',
-        color_discrete_map={
-            'EMS': GREEN, 
-            'Fire': '#ef4444', 
-            'Traffic': '#3b82f6'
-        },
-        zoom=9, 
-        height=550
-    )
-    map_fig.update_layout(
-        mapbox_style="carto-darkmatter",
-        paper_bgcolor='rgba(0,0,0,0)',
-        margin={"r":0, "t":0, "l":0, "b":0},
-        legend=dict(
-            font=dict(size=11, color='#e0e0e0'), 
-            bgcolor='rgba(18, 18, 18, 0.8)',
-            bordercolor='rgba(34, 197, 94, 0.2)',
-            borderwidth=1
-        )
-    )
-    
+    return gender_donut
+
+def build_kpis(agg):
     # Calculate KPIs
-    total = len(df)
-    top_type = df['emergency_type'].mode()[0] if len(df) > 0 and not df['emergency_type'].empty else "—"
-    avg_age = int(df['caller_age'].mean()) if not df['caller_age'].isna().all() else "—"
+    total = agg['total']
+    top_type = agg['types'].at[0, 'emergency_type'] if len(agg['types']) > 0 else "—"
+    avg_age = int(agg['avg_age']) if agg['avg_age'] is not None else "—"
     
-    if len(df) > 0 and 'timestamp' in df.columns:
-        hour_mode = df['timestamp'].dt.hour.mode()
-        if len(hour_mode) > 0:
-            peak = hour_mode[0]
-            peak_hour = f"{peak:02d}:00"
-        else:
-            peak_hour = "—"
+    if len(agg['hours']) > 0:
+        peak = int(agg['hours'].at[0, 'hour'])
+        peak_hour = f"{peak:02d}:00"
     else:
         peak_hour = "—"
-    
+    return [f"{total:,}", top_type, str(avg_age), peak_hour]
+
+FIGURE_BUILDERS = {
+    'timeline': build_timeline,
+    'pie': build_type_pie,
+    'age': build_age_hist,
+    'gender': build_gender_donut,
+    'kpis': build_kpis,
+}
+
+def figure_for(name, key):
+    """One dashboard element for a filter key: figure cache, then snapshot, then render"""
+    cached = figure_cache.get((key, name))
+    if cached is not None:
+        return cached
+
+    # Default view / popular filters: paint from the background snapshot
+    snapshot = snapshots.get(key)
+    if snapshot is not None and name in snapshot['dashboard']:
+        return snapshot['dashboard'][name]
+
+    return render_figure(name, key)
+
+def render_figure(name, key, agg=None):
+    if agg is None:
+        agg = get_aggregates(*filters_from_key(key))
+    if not agg or agg['total'] == 0:
+        output = ["0", "—", "—", "—"] if name == 'kpis' else empty_figure()
+    else:
+        output = FIGURE_BUILDERS[name](agg)
+
+    # Cache the figure JSON rather than Figure objects so hits skip re-serialising
+    if isinstance(output, go.Figure):
+        output = output.to_plotly_json()
+    if agg:
+        figure_cache.set((key, name), output)
+    return output
+
+def changed_output(name, key_data, current_digest):
+    """(output, digest) for an element, or no_update for both if it would render identically"""
+    if key_data is None:
+        return no_update, no_update
+    output = figure_for(name, key_from_store(key_data))
+    digest = hashlib.md5(to_json_plotly(output).encode('utf-8')).hexdigest()
+    if digest == current_digest:
+        return no_update, no_update
+    return output, digest
+
+@app.callback(
+    [Output('timeline-chart', 'figure'),
+     Output('timeline-digest', 'data')],
+    [Input('filter-key', 'data')],
+    [State('timeline-digest', 'data')]
+)
+def update_timeline(key_data, digest):
+    return changed_output('timeline', key_data, digest)
+
+@app.callback(
+    [Output('type-pie', 'figure'),
+     Output('pie-digest', 'data')],
+    [Input('filter-key', 'data')],
+    [State('pie-digest', 'data')]
+)
+def update_type_pie(key_data, digest):
+    return changed_output('pie', key_data, digest)
+
+@app.callback(
+    [Output('age-bars', 'figure'),
+     Output('age-digest', 'data')],
+    [Input('filter-key', 'data')],
+    [State('age-digest', 'data')]
+)
+def update_age_hist(key_data, digest):
+    return changed_output('age', key_data, digest)
+
+@app.callback(
+    [Output('gender-chart', 'figure'),
+     Output('gender-digest', 'data')],
+    [Input('filter-key', 'data')],
+    [State('gender-digest', 'data')]
+)
+def update_gender_donut(key_data, digest):
+    return changed_output('gender', key_data, digest)
+
+@app.callback(
+    [Output('total-calls', 'children'),
+     Output('top-type', 'children'),
+     Output('avg-age', 'children'),
+     Output('peak-hour', 'children'),
+     Output('kpis-digest', 'data')],
+    [Input('filter-key', 'data')],
+    [State('kpis-digest', 'data')]
+)
+def update_kpis(key_data, digest):
+    kpis, digest = changed_output('kpis', key_data, digest)
+    if kpis is no_update:
+        return [no_update] * 5
+    return (*kpis, digest)
+
+def empty_figure():
+    empty = go.Figure()
+    empty.update_layout(
+        template='plotly_dark',
+        paper_bgcolor='rgba(0,0,0,0)',
+        plot_bgcolor='rgba(0,0,0,0)',
+        xaxis={'visible': False},
+        yaxis={'visible': False},
+        annotations=[{
+            'text': 'No data available for selected filters',
+            'xref': 'paper', 'yref': 'paper',
+            'showarrow': False,
+            'font': {'size': 18, 'color': '#6b7280'}
+        }]
+    )
+    return empty
+
+@app.callback(
+    [Output('map-view', 'figure'),
+     Output('map-zoom', 'data')],
+    [Input('filter-key', 'data'),
+     Input('map-view', 'relayoutData')],
+    [State('map-zoom', 'data')]
+)
+def update_map(key_data, relayout, current_zoom):
+    """Map is rendered separately so zooming only re-renders when the zoom level changes"""
+    if key_data is None:
+        return no_update, no_update
+    zoom = current_zoom or MAP_DEFAULT_ZOOM
+    if relayout and 'mapbox.zoom' in relayout:
+        zoom = int(round(relayout['mapbox.zoom']))
+    if ctx.triggered_id == 'map-view' and zoom == current_zoom:
+        return no_update, no_update
+
+    return map_figure_for(key_from_store(key_data), zoom), zoom
+
+def map_figure_for(key, zoom):
+    """Map figure JSON for a filter key + zoom: figure cache, then snapshot, then render"""
+    cached = figure_cache.get((key, 'map', zoom))
+    if cached is not None:
+        return cached
+
+    if zoom == MAP_DEFAULT_ZOOM:
+        snapshot = snapshots.get(key)
+        if snapshot is not None:
+            return snapshot['map']
+
+    map_fig = render_map(zoom, *filters_from_key(key))
+    if map_fig is None:
+        # DB didn't answer: show an empty map but don't cache the failure
+        return empty_figure().to_plotly_json()
+    map_fig = map_fig.to_plotly_json()
+    figure_cache.set((key, 'map', zoom), map_fig)
+    return map_fig
+
+def render_map(zoom, start, end, types, town, zip_code):
+    """Map figure for a filter set, or None if the aggregates or map data couldn't be loaded"""
+    agg = get_aggregates(start, end, types, town, zip_code)
+    if not agg:
+        return None
+    if agg['total'] == 0:
+        return empty_figure()
+
+    filters = (start, end, types, town, zip_code)
+    uirevision = str(filter_key(*filters))
+
+    # enforce a hard cap on the serialized figure by shrinking the sample
+    sample_limit = MAP_POINT_LIMIT
+    while True:
+        map_data = get_map_data(agg['total'], zoom, *filters, sample_limit=sample_limit)
+        if map_data is None:
+            return None
+        map_fig = build_map_figure(map_data, zoom, uirevision)
+        if len(map_fig.to_json()) <= MAP_MAX_BYTES or sample_limit <= 100:
+            return map_fig
+        sample_limit //= 2
+
+@app.callback(
+    [Output('call-types', 'options'),
+     Output('township', 'options'),
+     Output('zipcode', 'options'),
+     Output('date-range', 'start_date'),
+     Output('date-range', 'end_date'),
+     Output('date-range', 'min_date_allowed'),
+     Output('date-range', 'max_date_allowed'),
+     Output('metadata-poll', 'disabled')],
+    [Input('metadata-poll', 'n_intervals')]
+)
+def load_filter_options(n):
+    """Fill the filter controls without blocking page load on DISTINCT scans"""
+    data = metadata.peek()
+    if data is None:
+        return [no_update] * 7 + [False]
     return (
-        timeline, type_pie, age_hist, gender_donut, map_fig,
-        f"{total:,}", top_type, str(avg_age), peak_hour
+        data['types'], data['townships'], data['zipcodes'],
+        data['min_date'], data['max_date'], data['min_date'], data['max_date'],
+        True
     )
 
 # Expandable charts modal
+MODAL_CHARTS = {
+    'timeline-container': ('Call Volume Over Time', 'timeline'),
+    'pie-container': ('Emergency Type Distribution', 'pie'),
+    'age-container': ('Caller Age Distribution', 'age'),
+    'gender-container': ('Gender Distribution', 'gender'),
+    'map-container': ('Geographic Distribution', 'map'),
+}
+
 @app.callback(
     [Output('chart-modal', 'is_open'),
      Output('modal-title', 'children'),
@@ -865,30 +1215,55 @@ def update_dashboard(start, end, types, town, zip_code):
      Input('gender-container', 'n_clicks'),
      Input('map-container', 'n_clicks')],
     [State('chart-modal', 'is_open'),
-     State('timeline-chart', 'figure'),
-     State('type-pie', 'figure'),
-     State('age-bars', 'figure'),
-     State('gender-chart', 'figure'),
-     State('map-view', 'figure')],
+     State('filter-key', 'data'),
+     State('map-zoom', 'data')],
     prevent_initial_call=True
 )
-def toggle_modal(n1, n2, n3, n4, n5, is_open, timeline_fig, pie_fig, age_fig, gender_fig, map_fig):
-    if not ctx.triggered_id:
+def toggle_modal(n1, n2, n3, n4, n5, is_open, key_data, zoom):
+    """Figures are looked up by filter key from the cache instead of round-tripping through State"""
+    if not ctx.triggered_id or key_data is None:
         return is_open, "", ""
     
-    chart_map = {
-        'timeline-container': ('Call Volume Over Time', dcc.Graph(figure=timeline_fig, style={'height': '70vh'}, config={'displayModeBar': True})),
-        'pie-container': ('Emergency Type Distribution', dcc.Graph(figure=pie_fig, style={'height': '70vh'}, config={'displayModeBar': True})),
-        'age-container': ('Caller Age Distribution', dcc.Graph(figure=age_fig, style={'height': '70vh'}, config={'displayModeBar': True})),
-        'gender-container': ('Gender Distribution', dcc.Graph(figure=gender_fig, style={'height': '70vh'}, config={'displayModeBar': True})),
-        'map-container': ('Geographic Distribution', dcc.Graph(figure=map_fig, style={'height': '70vh'}, config={'displayModeBar': True})),
-    }
-    
-    if ctx.triggered_id in chart_map:
-        title, body = chart_map[ctx.triggered_id]
+    if ctx.triggered_id in MODAL_CHARTS:
+        title, name = MODAL_CHARTS[ctx.triggered_id]
+        key = key_from_store(key_data)
+        if name == 'map':
+            figure = map_figure_for(key, zoom or MAP_DEFAULT_ZOOM)
+        else:
+            figure = figure_for(name, key)
+        body = dcc.Graph(figure=figure, style={'height': '70vh'}, config={'displayModeBar': True})
         return not is_open, title, body
     
     return is_open, "", ""
 
+@app.server.route('/ready')
+def readiness():
+    """Ready once dataset metadata is loaded (and so the DB has answered at least once)"""
+    ready = metadata.peek() is not None
+    body = {'ready': ready, 'startup_seconds': round(STARTUP_SECONDS, 3)}
+    return jsonify(body), (200 if ready else 503)
+
+def refresh_snapshot(key):
+    """
+    Rebuild one snapshot; used by the background job. Raises when the DB doesn't
+    answer, so the job keeps the previous snapshot instead of storing placeholders.
+    """
+    agg = get_aggregates(*filters_from_key(key))
+    if not agg:
+        raise RuntimeError("aggregates unavailable")
+    outputs = {name: render_figure(name, key, agg) for name in FIGURE_BUILDERS}
+    map_fig = render_map(MAP_DEFAULT_ZOOM, *filters_from_key(key))
+    if map_fig is None:
+        raise RuntimeError("map data unavailable")
+    return outputs, map_fig
+
+metadata.load_in_background()
+snapshots.start(refresh_snapshot, default_key=filter_key(), ready=lambda: metadata.peek() is not None)
+
+STARTUP_SECONDS = perf_counter() - STARTUP_STARTED
+print(f"dashboard startup took {STARTUP_SECONDS:.2f}s")
+if STARTUP_SECONDS > STARTUP_BUDGET:
+    print(f"warning: startup exceeded budget of {STARTUP_BUDGET:.1f}s")
+
 if __name__ == '__main__':
     app.run(debug=True, port=8050)
\ No newline at end of file
@@ -0,0 +1,119 @@
+import threading
+from time import monotonic, sleep
+import pandas as pd
+
+
+class DatasetMetadata:
+    """
+    Dataset-wide facts the dashboard needs on every page and filter change:
+    date bounds plus township, zipcode and emergency type dropdown options.
+
+    Loaded once, then re-validated at most every `refresh_interval` seconds with
+    a cheap version probe (MAX(id) + table update time). The DISTINCT scans only
+    re-run when that version changes.
+    """
+
+    def __init__(self, pool, refresh_interval=300, on_change=None):
+        self.pool = pool
+        self.refresh_interval = refresh_interval
+        self.on_change = on_change
+        self._data = None
+        self._version = None
+        self._checked_at = 0
+        self._lock = threading.Lock()
+
+    def get(self):
+        with self._lock:
+            if self._data is None:
+                self._reload()
+            elif monotonic() - self._checked_at > self.refresh_interval:
+                self._revalidate()
+            return self._data
+
+    def peek(self):
+        """Loaded metadata, or None if not loaded yet. Never touches the database."""
+        return self._data
+
+    def load_in_background(self, retry_interval=5):
+        """Load in a daemon thread, retrying while the database is unreachable"""
+        def worker():
+            while self._data is None:
+                try:
+                    self.get()
+                except Exception as e:
+                    print(f"metadata load failed, retrying in {retry_interval}s: {e}")
+                    sleep(retry_interval)
+
+        thread = threading.Thread(target=worker, name="metadata-loader", daemon=True)
+        thread.start()
+        return thread
+
+    def date_bounds(self):
+        data = self.get()
+        return data['min_date'], data['max_date']
+
+    def clamp(self, start_date, end_date):
+        """Clamp a requested date range to the dataset bounds"""
+        min_date, max_date = self.date_bounds()
+        if min_date is not None:
+            start_date = max(start_date, min_date)
+        if max_date is not None:
+            end_date = min(end_date, max_date)
+        return start_date, end_date
+
+    def _query(self, sql):
+        conn = self.pool.get_connection()
+        try:
+            return pd.read_sql(sql, conn)
+        finally:
+            if conn.is_connected():
+                conn.close()
+
+    def _fetch_version(self):
+        df = self._query("""
+            SELECT (SELECT MAX(id) FROM emergency_data) AS max_id, UPDATE_TIME AS updated
+            FROM information_schema.tables
+            WHERE table_schema = DATABASE() AND table_name = 'emergency_data'
+        """)
+        if df.empty:
+            return None
+        return (df.at[0, 'max_id'], str(df.at[0, 'updated']))
+
+    def _revalidate(self):
+        try:
+            version = self._fetch_version()
+        except Exception as e:
+            print(f"metadata version check failed: {e}")
+            self._checked_at = monotonic()
+            return
+        if version != self._version:
+            self._reload()
+            if self.on_change:
+                self.on_change()
+        else:
+            self._checked_at = monotonic()
+
+    def _reload(self):
+        version = self._fetch_version()
+        bounds = self._query(
+            "SELECT MIN(DATE(timestamp)) as start, MAX(DATE(timestamp)) as end FROM emergency_data"
+        )
+        townships = self._query(
+            "SELECT DISTINCT township FROM emergency_data WHERE township IS NOT NULL ORDER BY township"
+        )
+        zipcodes = self._query(
+            "SELECT DISTINCT zipcode FROM emergency_data WHERE zipcode IS NOT NULL ORDER BY zipcode"
+        )
+        types = self._query(
+            "SELECT DISTINCT emergency_type FROM emergency_data WHERE emergency_type IS NOT NULL ORDER BY emergency_type"
+        )
+
+        self._data = {
+            'min_date': bounds.at[0, 'start'],
+            'max_date': bounds.at[0, 'end'],
+            'townships': [{'label': t, 'value': t} for t in townships['township'].tolist()],
+            'zipcodes': [{'label': str(z), 'value': str(z)} for z in zipcodes['zipcode'].tolist()],
+            'types': [{'label': t, 'value': t} for t in types['emergency_type'].tolist()],
+        }
+        self._version = version
+        self._checked_at = monotonic()
@@ -0,0 +1,117 @@
+import os
+import json
+import threading
+from collections import Counter
+from time import time
+from plotly.io.json import to_json_plotly
+
+# bump when the stored layout changes so old files are ignored
+SNAPSHOT_FORMAT = 2
+
+
+class SnapshotStore:
+    """
+    Precomputed dashboard outputs (serialized Plotly JSON) for the default view
+    and the most requested filter combinations.
+
+    Usage is counted per filter key. A background thread rebuilds the default
+    view plus the `top_n` most used keys every `interval` seconds and persists
+    them to `path`, so a restarted dashboard still paints the first view from a
+    snapshot.
+    """
+
+    def __init__(self, path, top_n=10, interval=600):
+        self.path = path
+        self.top_n = top_n
+        self.interval = interval
+        self.usage = Counter()
+        self._snapshots = {}
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._load()
+
+    @staticmethod
+    def _encode_key(key):
+        return json.dumps(key)
+
+    @staticmethod
+    def _decode_key(encoded):
+        start, end, types, town, zip_code = json.loads(encoded)
+        return (start, end, tuple(types), town, zip_code)
+
+    def record_use(self, key):
+        with self._lock:
+            self.usage[self._encode_key(key)] += 1
+
+    def get(self, key):
+        """Snapshot dict ({'dashboard': {name: output}, 'map': {...}, 'built_at': ts}) or None"""
+        return self._snapshots.get(self._encode_key(key))
+
+    def keys_to_refresh(self, default_key):
+        with self._lock:
+            popular = [self._decode_key(k) for k, _ in self.usage.most_common(self.top_n)]
+        keys = [default_key] + [k for k in popular if k != default_key]
+        return keys[:self.top_n + 1]
+
+    def set(self, key, dashboard_outputs, map_figure):
+        # round-trip through Plotly's encoder so numpy arrays/dates become plain JSON
+        snapshot = json.loads(to_json_plotly({
+            'dashboard': dict(dashboard_outputs),
+            'map': map_figure,
+            'built_at': time(),
+        }))
+        with self._lock:
+            self._snapshots[self._encode_key(key)] = snapshot
+
+    def _load(self):
+        if not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                stored = json.load(f)
+            if stored.get('format') != SNAPSHOT_FORMAT:
+                return
+            self._snapshots = stored.get('snapshots', {})
+            self.usage.update(stored.get('usage', {}))
+        except (OSError, ValueError) as e:
+            print(f"could not read snapshots ({e}); starting empty")
+
+    def save(self):
+        with self._lock:
+            stored = {'format': SNAPSHOT_FORMAT, 'snapshots': self._snapshots, 'usage': dict(self.usage)}
+        tmp_path = self.path + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(stored, f)
+        os.replace(tmp_path, self.path)
+
+    def request_refresh(self):
+        """Wake the background job early, e.g. after new data lands"""
+        self._wake.set()
+
+    def start(self, refresh_one, default_key, ready=lambda: True):
+        """
+        Run the refresh loop in a daemon thread. `refresh_one(key)` must return
+        ({name: output}, map_figure) for a filter key.
+        """
+        def worker():
+            while True:
+                if ready():
+                    for key in self.keys_to_refresh(default_key):
+                        try:
+                            outputs, map_figure = refresh_one(key)
+                            self.set(key, outputs, map_figure)
+                        except Exception as e:
+                            print(f"snapshot refresh failed for {key}: {e}")
+                    try:
+                        self.save()
+                    except OSError as e:
+                        print(f"could not save snapshots: {e}")
+                    wait = self.interval
+                else:
+                    wait = 5
+                self._wake.wait(wait)
+                self._wake.clear()
+
+        thread = threading.Thread(target=worker, name="snapshot-refresh", daemon=True)
+        thread.start()
+        return thread
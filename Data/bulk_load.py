@@ -0,0 +1,365 @@
+"""
+Bulk-load a CSV or Parquet file into any CrisisLens table (emergency_data,
+raw_calls, enriched_calls, ...).
+
+The file is streamed in chunks. Each chunk goes in with LOAD DATA LOCAL
+INFILE (default) or a multi-row INSERT. Each chunk commits in the same
+transaction as its checkpoint row in bulk_load_checkpoints, so after a crash
+or Ctrl+C a re-run resumes at the first row that did not commit. A file that
+already finished loading is skipped. The checkpoint is keyed on the file's
+path, size and mtime, so a modified file starts over.
+
+File columns are matched to table columns by name. COLUMN_ALIASES covers the
+names that differ between cleaned_data.csv and the call tables
+(caller_gender -> gender, township -> district, ...). File columns with no
+match are ignored, and table columns with no match keep their defaults.
+
+With --defer-indexes, the table's non-unique secondary indexes are dropped
+before the first chunk and rebuilt in a single ALTER TABLE at the end. The
+dropped definitions are stored in the checkpoint, so an interrupted load
+still rebuilds them when it resumes.
+
+--restart loads the file again from row 0 on top of whatever is already in
+the table, so rows from the earlier run are inserted twice. Add --truncate
+to empty the table first. Either way, indexes dropped by an interrupted
+--defer-indexes run are still rebuilt.
+
+Usage:
+    python bulk_load.py cleaned_data.parquet emergency_data --defer-indexes
+    python bulk_load.py bulk_raw_calls.csv raw_calls --method insert --chunksize 5000
+    python bulk_load.py cleaned_data.csv emergency_data --restart --truncate
+"""
+import os
+import sys
+import csv
+import json
+import hashlib
+import argparse
+import tempfile
+from time import perf_counter
+import pandas as pd
+import mysql.connector
+from dotenv import load_dotenv
+
+API_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'crisislens-API')
+load_dotenv(os.path.join(API_DIR, '.env'))
+sys.path.append(API_DIR)
+from db_config import DB_CONFIG
+
+CHUNKSIZE = 50_000
+CHECKPOINT_TABLE = 'bulk_load_checkpoints'
+
+# table column -> file columns that can fill it, tried in order after the exact name
+COLUMN_ALIASES = {
+    'gender': ['caller_gender'],
+    'age': ['caller_age'],
+    'district': ['township'],
+    'township': ['district'],
+    'caller_gender': ['gender'],
+    'caller_age': ['age'],
+}
+
+
+def connect():
+    return mysql.connector.connect(**DB_CONFIG, allow_local_infile=True)
+
+
+def quote(identifier):
+    return '`' + identifier.replace('`', '``') + '`'
+
+
+def source_key(path):
+    stat = os.stat(path)
+    return hashlib.sha256(
+        f"{os.path.abspath(path)}|{stat.st_size}|{stat.st_mtime_ns}".encode('utf-8')
+    ).hexdigest()
+
+
+# -------------------------------
+# Schema helpers
+# -------------------------------
+def table_columns(cursor, table):
+    """Insertable columns of `table` in definition order (auto-increment ids excluded)."""
+    cursor.execute("""
+        SELECT column_name, extra
+        FROM information_schema.columns
+        WHERE table_schema = DATABASE() AND table_name = %s
+        ORDER BY ordinal_position
+    """, (table,))
+    rows = cursor.fetchall()
+    if not rows:
+        raise ValueError(f"table {table!r} does not exist in {DB_CONFIG['database']!r}")
+    return [name for name, extra in rows if 'auto_increment' not in (extra or '').lower()]
+
+
+def match_columns(file_columns, db_columns):
+    """[(file column, table column)] for every table column the file can fill."""
+    available = set(file_columns)
+    pairs = []
+    for column in db_columns:
+        for candidate in [column] + COLUMN_ALIASES.get(column, []):
+            if candidate in available:
+                pairs.append((candidate, column))
+                available.discard(candidate)
+                break
+    return pairs
+
+
+def secondary_indexes(cursor, table):
+    """ADD INDEX clauses for the non-unique, non-primary indexes of `table`."""
+    cursor.execute("""
+        SELECT index_name, column_name, sub_part, index_type
+        FROM information_schema.statistics
+        WHERE table_schema = DATABASE() AND table_name = %s
+          AND non_unique = 1 AND index_name <> 'PRIMARY'
+        ORDER BY index_name, seq_in_index
+    """, (table,))
+    indexes = {}
+    for name, column, sub_part, index_type in cursor.fetchall():
+        part = quote(column) + (f"({sub_part})" if sub_part else "")
+        indexes.setdefault(name, (index_type, []))[1].append(part)
+
+    clauses = {}
+    for name, (index_type, parts) in indexes.items():
+        kind = {'FULLTEXT': 'FULLTEXT INDEX', 'SPATIAL': 'SPATIAL INDEX'}.get(index_type, 'INDEX')
+        clauses[name] = f"ADD {kind} {quote(name)} ({', '.join(parts)})"
+    return clauses
+
+
+# -------------------------------
+# Checkpoints
+# -------------------------------
+def ensure_checkpoint_table(cursor):
+    cursor.execute(f"""
+        CREATE TABLE IF NOT EXISTS {CHECKPOINT_TABLE} (
+            source_key CHAR(64) NOT NULL,
+            table_name VARCHAR(64) NOT NULL,
+            source_path VARCHAR(1024) NOT NULL,
+            rows_loaded BIGINT NOT NULL DEFAULT 0,
+            completed TINYINT(1) NOT NULL DEFAULT 0,
+            deferred_indexes TEXT NULL,
+            updated_at DATETIME NOT NULL,
+            PRIMARY KEY (source_key, table_name)
+        )
+    """)
+
+
+def read_checkpoint(cursor, key, table):
+    cursor.execute(f"""
+        SELECT rows_loaded, completed, deferred_indexes
+        FROM {CHECKPOINT_TABLE}
+        WHERE source_key = %s AND table_name = %s
+    """, (key, table))
+    row = cursor.fetchone()
+    if row is None:
+        return {'rows_loaded': 0, 'completed': False, 'deferred_indexes': {}}
+    return {
+        'rows_loaded': int(row[0]),
+        'completed': bool(row[1]),
+        'deferred_indexes': json.loads(row[2]) if row[2] else {},
+    }
+
+
+def write_checkpoint(cursor, key, table, path, rows_loaded, completed=False, deferred_indexes=None):
+    cursor.execute(f"""
+        INSERT INTO {CHECKPOINT_TABLE}
+            (source_key, table_name, source_path, rows_loaded, completed, deferred_indexes, updated_at)
+        VALUES (%s, %s, %s, %s, %s, %s, NOW())
+        ON DUPLICATE KEY UPDATE
+            rows_loaded = VALUES(rows_loaded),
+            completed = VALUES(completed),
+            deferred_indexes = VALUES(deferred_indexes),
+            updated_at = NOW()
+    """, (key, table, os.path.abspath(path), rows_loaded, int(completed),
+          json.dumps(deferred_indexes) if deferred_indexes else None))
+
+
+# -------------------------------
+# Reading the source file
+# -------------------------------
+def file_columns(path):
+    if path.lower().endswith('.parquet'):
+        import pyarrow.parquet as pq
+        return pq.ParquetFile(path).schema_arrow.names
+    return list(pd.read_csv(path, nrows=0).columns)
+
+
+def iter_chunks(path, columns, chunksize, offset=0):
+    """DataFrames of at most `chunksize` rows, starting `offset` rows into the file."""
+    if path.lower().endswith('.parquet'):
+        import pyarrow.parquet as pq
+        skipped = 0
+        for batch in pq.ParquetFile(path).iter_batches(batch_size=chunksize, columns=columns):
+            if skipped + batch.num_rows <= offset:
+                skipped += batch.num_rows
+                continue
+            batch = batch.slice(max(offset - skipped, 0))
+            skipped = offset
+            yield batch.to_pandas()
+    else:
+        skiprows = range(1, offset + 1) if offset else None
+        for chunk in pd.read_csv(path, usecols=columns, chunksize=chunksize, skiprows=skiprows, dtype=object):
+            # usecols keeps file order; LOAD DATA needs the column-list order
+            yield chunk[columns]
+
+
+def to_rows(df):
+    """Row tuples with NaN/NaT as None and datetimes as MySQL strings."""
+    columns = []
+    for name in df.columns:
+        series = df[name]
+        if pd.api.types.is_datetime64_any_dtype(series):
+            series = series.dt.strftime('%Y-%m-%d %H:%M:%S')
+        values = series.astype(object).tolist()
+        for i in series.isna().to_numpy().nonzero()[0]:
+            values[i] = None
+        columns.append(values)
+    return list(zip(*columns))
+
+
+# -------------------------------
+# Loading one chunk
+# -------------------------------
+def insert_chunk(cursor, table, pairs, df):
+    placeholders = ', '.join(['%s'] * len(pairs))
+    # mysql.connector rewrites executemany() of an INSERT into one multi-row statement
+    cursor.executemany(
+        f"INSERT INTO {quote(table)} ({', '.join(quote(c) for _, c in pairs)}) VALUES ({placeholders})",
+        to_rows(df),
+    )
+
+
+def load_data_chunk(cursor, table, pairs, df):
+    fd, tmp_path = tempfile.mkstemp(suffix='.csv')
+    os.close(fd)
+    try:
+        frame = df.copy()
+        for name in frame.columns:
+            if pd.api.types.is_datetime64_any_dtype(frame[name]):
+                frame[name] = frame[name].dt.strftime('%Y-%m-%d %H:%M:%S')
+        # unquoted NULL is read as SQL NULL; quotes inside fields are doubled
+        frame.to_csv(tmp_path, index=False, header=False, na_rep='NULL',
+                     quoting=csv.QUOTE_MINIMAL, lineterminator='\n', encoding='utf-8')
+        cursor.execute(f"""
+            LOAD DATA LOCAL INFILE %s
+            INTO TABLE {quote(table)}
+            CHARACTER SET utf8mb4
+            FIELDS TERMINATED BY ',' OPTIONALLY ENCLOSED BY '"' ESCAPED BY ''
+            LINES TERMINATED BY '\\n'
+            ({', '.join(quote(c) for _, c in pairs)})
+        """, (tmp_path.replace('\\', '/'),))
+    finally:
+        os.remove(tmp_path)
+
+
+LOADERS = {'load-data': load_data_chunk, 'insert': insert_chunk}
+
+
+def bulk_load(path, table, method='load-data', chunksize=CHUNKSIZE, defer_indexes=False, restart=False,
+              truncate=False):
+    """
+    Load `path` into `table`, resuming from the last committed chunk; returns run stats.
+    `restart` starts again at row 0 without removing rows already loaded unless `truncate`
+    is also set.
+    """
+    load_chunk = LOADERS[method]
+    key = source_key(path)
+    conn = connect()
+    try:
+        cursor = conn.cursor()
+        ensure_checkpoint_table(cursor)
+        db_columns = table_columns(cursor, table)
+        pairs = match_columns(file_columns(path), db_columns)
+        if not pairs:
+            raise ValueError(f"{os.path.basename(path)} has no columns matching {table}")
+        print(f"Columns: {', '.join(f if f == c else f'{f}->{c}' for f, c in pairs)}")
+
+        if restart:
+            # keep the deferred index definitions: an interrupted run may have dropped them
+            previous = read_checkpoint(cursor, key, table)
+            if truncate:
+                print(f"Truncating {table}")
+                cursor.execute(f"TRUNCATE TABLE {quote(table)}")
+            write_checkpoint(cursor, key, table, path, 0, deferred_indexes=previous['deferred_indexes'])
+            conn.commit()
+        checkpoint = read_checkpoint(cursor, key, table)
+        if checkpoint['completed']:
+            print(f"{os.path.basename(path)} is already loaded into {table} "
+                  f"({checkpoint['rows_loaded']:,} rows); pass --restart --truncate to load it again")
+            return {'rows': 0, 'rows_total': checkpoint['rows_loaded'], 'seconds': 0.0, 'rows_per_s': 0.0}
+
+        offset = checkpoint['rows_loaded']
+        deferred = checkpoint['deferred_indexes']
+        if offset:
+            print(f"Resuming at row {offset:,}")
+        if defer_indexes and not deferred:
+            deferred = secondary_indexes(cursor, table)
+            if deferred:
+                # record the definitions first so a crash after the DROP can still rebuild them
+                write_checkpoint(cursor, key, table, path, offset, deferred_indexes=deferred)
+                conn.commit()
+                print(f"Deferring indexes: {', '.join(deferred)}")
+                cursor.execute(f"ALTER TABLE {quote(table)} "
+                               + ', '.join(f"DROP INDEX {quote(name)}" for name in deferred))
+
+        loaded = 0
+        started = perf_counter()
+        for chunk in iter_chunks(path, [f for f, _ in pairs], chunksize, offset):
+            load_chunk(cursor, table, pairs, chunk)
+            loaded += len(chunk)
+            write_checkpoint(cursor, key, table, path, offset + loaded, deferred_indexes=deferred)
+            conn.commit()
+            elapsed = perf_counter() - started
+            print(f"  {offset + loaded:>12,} rows  ({loaded / elapsed:,.0f} rows/s)")
+        load_seconds = perf_counter() - started
+
+        # an earlier run may have crashed before its DROP INDEX, so only add what is missing
+        missing = {name: clause for name, clause in deferred.items()
+                   if name not in secondary_indexes(cursor, table)}
+        if missing:
+            print(f"Rebuilding {len(missing)} indexes...")
+            index_started = perf_counter()
+            cursor.execute(f"ALTER TABLE {quote(table)} " + ', '.join(missing.values()))
+            print(f"  indexes rebuilt in {perf_counter() - index_started:.1f}s")
+        write_checkpoint(cursor, key, table, path, offset + loaded, completed=True)
+        conn.commit()
+
+        seconds = perf_counter() - started
+        return {
+            'rows': loaded,
+            'rows_total': offset + loaded,
+            'seconds': seconds,
+            'load_seconds': load_seconds,
+            'rows_per_s': loaded / seconds if seconds else 0.0,
+        }
+    finally:
+        conn.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Bulk-load a CSV/Parquet file into a CrisisLens table")
+    parser.add_argument('path', help="CSV or .parquet file")
+    parser.add_argument('table', help="target table, e.g. emergency_data or raw_calls")
+    parser.add_argument('--method', choices=sorted(LOADERS), default='load-data')
+    parser.add_argument('--chunksize', type=int, default=CHUNKSIZE)
+    parser.add_argument('--defer-indexes', action='store_true',
+                        help="drop secondary indexes during the load and rebuild them at the end")
+    parser.add_argument('--restart', action='store_true',
+                        help="ignore the checkpoint and load from row 0; rows already in the table stay, "
+                             "so they are duplicated unless --truncate is given")
+    parser.add_argument('--truncate', action='store_true',
+                        help="with --restart, empty the table before loading")
+    args = parser.parse_args()
+    if args.truncate and not args.restart:
+        parser.error("--truncate only applies together with --restart")
+
+    print(f"Loading {args.path} into {args.table} ({args.method}, chunks of {args.chunksize:,})...")
+    stats = bulk_load(args.path, args.table, method=args.method, chunksize=args.chunksize,
+                      defer_indexes=args.defer_indexes, restart=args.restart, truncate=args.truncate)
+    if stats['rows']:
+        print(f"\n✅ Loaded {stats['rows']:,} rows in {stats['seconds']:.1f}s "
+              f"({stats['rows_per_s']:,.0f} rows/s, {stats['rows_total']:,} total)")
+
+
+if __name__ == '__main__':
+    main()
@@ -1,28 +1,41 @@
+"""
+Clean the Montgomery 911 export into cleaned_data.csv / cleaned_data.parquet.
+
+The full CSV is processed in chunks, so memory stays at one chunk however
+big the file is. Each chunk is renamed, has its title split into type and
+subtype, gets the simulated caller columns from a seeded NumPy generator and
+has its timestamp parsed in one pass. It is then appended to both outputs.
+Outputs are written to temp files and renamed at the end, so a failed run
+never leaves a half-written cleaned_data.csv behind.
+
+Usage:
+    python pepare_data.py
+    python pepare_data.py --input 911.csv --nrows 150000 --seed 7 --no-parquet
+"""
+import os
+import argparse
+from time import perf_counter
+import numpy as np
 import pandas as pd
-import random
 
-# Load the dataset (only first 150k rows for now)
-df = pd.read_csv('C:/Users/97150/OneDrive/Desktop/archive/Data/911.csv', nrows=150000)
-
-# Show basic info
-print(df.head())
-print(f"Loaded {len(df)} rows")
-
-# Display column names
-print("Columns:", df.columns)
-
-# Check for missing values
-print("\nMissing values:\n", df.isnull().sum())
-
-# Get data types
-print("\nData types:\n", df.dtypes)
-
-# Check unique values in 'title' (emergency types)
-print("\nUnique emergency titles:\n", df['title'].unique())
+INPUT_PATH = 'C:/Users/97150/OneDrive/Desktop/archive/Data/911.csv'
+CHUNKSIZE = 100_000
+
+# explicit dtypes keep every chunk (and the Parquet schema) identical
+DTYPES = {
+    'lat': 'float64',
+    'lng': 'float64',
+    'desc': 'object',
+    'zip': 'float64',
+    'title': 'object',
+    'timeStamp': 'object',
+    'twp': 'object',
+    'addr': 'object',
+    'e': 'int64',
+}
 
 # Renaming columns for clarity
-
-df.rename(columns={
+RENAME_COLUMNS = {
     'lat': 'latitude',
     'lng': 'longitude',
     'desc': 'description',
@@ -32,37 +45,129 @@ df.rename(columns={
     'twp': 'township',
     'addr': 'address',
     'e': 'priority_flag'
-}, inplace=True)
-
-# Split the emergency title into main category and subcategory
-df[['emergency_type', 'emergency_subtype']] = df['emergency_title'].str.split(pat=':', n=1, expand=True)
-
-
-# Removing whitespaces
-df['emergency_type'] = df['emergency_type'].str.strip()
-df['emergency_subtype'] = df['emergency_subtype'].str.strip()
-
-
-# Add simulated columns to your existing DataFrame
-df['caller_gender'] = [random.choice(['Male', 'Female']) for _ in range(len(df))]
-df['caller_age'] = [random.randint(18, 65) for _ in range(len(df))]
-df['response_time'] = [random.randint(5, 30) for _ in range(len(df))]
-
-# Confirm the new columns were added
-print(df[['caller_gender', 'caller_age', 'response_time']].head())
-
-# Clean timestamp: remove '@' and convert to datetime
-df['timestamp'] = df['timestamp'].str.replace(';', '', regex=False).str.replace('@', '', regex=False).str.strip()
-df['timestamp'] = pd.to_datetime(df['timestamp'], format='%Y-%m-%d %H:%M:%S', errors='coerce')
-
-print(df['timestamp'].head(10))
-
-# Drop rows where conversion failed (invalid format)
-df = df.dropna(subset=['timestamp'])
-
-# Convert back to string format MySQL accepts
-df['timestamp'] = df['timestamp'].dt.strftime('%Y-%m-%d %H:%M:%S')
-
-
-df.to_csv('cleaned_data.csv', index=False)
-print("Data saved to cleaned_data.csv")
+}
+
+GENDERS = np.array(['Male', 'Female'], dtype=object)
+CALLER_AGE = (18, 65)       # inclusive
+RESPONSE_TIME = (5, 30)     # minutes, inclusive
+
+
+def clean_chunk(df, rng):
+    """Clean one chunk of the raw export; rows with unparseable timestamps are dropped."""
+    df = df.rename(columns=RENAME_COLUMNS)
+
+    # Split the emergency title into main category and subcategory, removing whitespace
+    parts = df['emergency_title'].str.split(pat=':', n=1, expand=True).reindex(columns=[0, 1])
+    df['emergency_type'] = parts[0].str.strip()
+    df['emergency_subtype'] = parts[1].str.strip()
+
+    # Simulated caller columns, drawn for the whole chunk at once
+    n = len(df)
+    df['caller_gender'] = rng.choice(GENDERS, size=n)
+    df['caller_age'] = rng.integers(CALLER_AGE[0], CALLER_AGE[1] + 1, size=n)
+    df['response_time'] = rng.integers(RESPONSE_TIME[0], RESPONSE_TIME[1] + 1, size=n)
+
+    # Clean timestamp: strip ';' / '@' and parse in one pass, dropping rows that fail
+    timestamp = pd.to_datetime(
+        df['timestamp'].str.replace(r'[;@]', '', regex=True).str.strip(),
+        format='%Y-%m-%d %H:%M:%S', errors='coerce',
+    )
+    keep = timestamp.notna().to_numpy()
+    df = df[keep].copy()
+
+    # Convert back to string format MySQL accepts
+    df['timestamp'] = timestamp[keep].dt.strftime('%Y-%m-%d %H:%M:%S')
+    return df
+
+
+class ParquetAppender:
+    """Appends DataFrame chunks to one Parquet file, using the first chunk's schema."""
+
+    def __init__(self, path):
+        self.path = path
+        self.writer = None
+
+    def write(self, df):
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        if self.writer is None:
+            table = pa.Table.from_pandas(df, preserve_index=False)
+            self.writer = pq.ParquetWriter(self.path, table.schema)
+        else:
+            table = pa.Table.from_pandas(df, schema=self.writer.schema, preserve_index=False)
+        self.writer.write_table(table)
+
+    def close(self):
+        if self.writer is not None:
+            self.writer.close()
+
+
+def prepare_data(input_path=INPUT_PATH, csv_path='cleaned_data.csv', parquet_path='cleaned_data.parquet',
+                 chunksize=CHUNKSIZE, seed=42, nrows=None):
+    """Stream `input_path` through clean_chunk into CSV and/or Parquet; returns run stats."""
+    rng = np.random.default_rng(seed)
+    outputs = [p for p in (csv_path, parquet_path) if p]
+    tmp = {p: f'{p}.{os.getpid()}.tmp' for p in outputs}
+    parquet = ParquetAppender(tmp[parquet_path]) if parquet_path else None
+
+    rows_in = rows_out = 0
+    started = perf_counter()
+    try:
+        reader = pd.read_csv(input_path, dtype=DTYPES, chunksize=chunksize, nrows=nrows)
+        for chunk in reader:
+            rows_in += len(chunk)
+            cleaned = clean_chunk(chunk, rng)
+            if csv_path:
+                cleaned.to_csv(tmp[csv_path], mode='w' if rows_out == 0 else 'a',
+                               header=rows_out == 0, index=False)
+            if parquet:
+                parquet.write(cleaned)
+            rows_out += len(cleaned)
+            elapsed = perf_counter() - started
+            print(f"  {rows_in:>10,} rows read, {rows_out:>10,} kept  ({rows_in / elapsed:,.0f} rows/s)")
+    except BaseException:
+        if parquet:
+            parquet.close()
+        for path in tmp.values():
+            if os.path.exists(path):
+                os.remove(path)
+        raise
+
+    if parquet:
+        parquet.close()
+    for path in outputs:
+        if os.path.exists(tmp[path]):
+            os.replace(tmp[path], path)
+
+    seconds = perf_counter() - started
+    return {
+        'rows_in': rows_in,
+        'rows_out': rows_out,
+        'seconds': seconds,
+        'rows_per_s': rows_in / seconds if seconds else 0.0,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Clean the 911 export in chunks")
+    parser.add_argument('--input', default=INPUT_PATH)
+    parser.add_argument('--csv', default='cleaned_data.csv')
+    parser.add_argument('--parquet', default='cleaned_data.parquet')
+    parser.add_argument('--no-parquet', action='store_true', help="write the CSV only")
+    parser.add_argument('--chunksize', type=int, default=CHUNKSIZE)
+    parser.add_argument('--seed', type=int, default=42, help="seed for the simulated caller columns")
+    parser.add_argument('--nrows', type=int, default=None, help="only read the first N rows (default: all)")
+    args = parser.parse_args()
+
+    print(f"Cleaning {args.input} in chunks of {args.chunksize:,}...")
+    stats = prepare_data(args.input, args.csv, None if args.no_parquet else args.parquet,
+                         chunksize=args.chunksize, seed=args.seed, nrows=args.nrows)
+
+    print(f"\nCleaned {stats['rows_in']:,} rows ({stats['rows_in'] - stats['rows_out']:,} dropped for bad "
+          f"timestamps) in {stats['seconds']:.1f}s: {stats['rows_per_s']:,.0f} rows/s")
+    print(f"Data saved to {args.csv}" + ("" if args.no_parquet else f" and {args.parquet}"))
+
+
+if __name__ == '__main__':
+    main()
@@ -1,33 +1,22 @@
-from dotenv import load_dotenv
-import os
-import mysql.connector
-
-load_dotenv(dotenv_path=os.path.join("..", "crisislens-api", ".env"))
-print(os.getenv("DB_HOST"))
-
-conn = mysql.connector.connect(
-    host=os.getenv("DB_HOST"),
-    user=os.getenv("DB_USER"),
-    password=os.getenv("DB_PASSWORD"),
-    database=os.getenv("DB_NAME"),
-    allow_local_infile=True  
-)
+# Data_batch.py
+"""
+Load bulk_raw_calls.csv into raw_calls.
 
-cursor = conn.cursor()
+Kept so existing run scripts still work; the loading itself (chunking,
+checkpointed restarts, index handling) lives in Data/bulk_load.py, which
+also handles other tables and Parquet input.
 
-query = """
-LOAD DATA LOCAL INFILE "C:/Program Files/MySQL/MySQL Server 8.0/data/bulk_raw_calls.csv"
-INTO TABLE raw_calls
-FIELDS TERMINATED BY ',' 
-ENCLOSED BY '"'
-LINES TERMINATED BY '\n'
-IGNORE 1 ROWS
-(timestamp, description, latitude, longitude, township, gender, age);
+Usage:
+    python Data_batch.py                       # BULK_RAW_CALLS_CSV or bulk_raw_calls.csv
+    python Data_batch.py path/to/bulk_raw_calls.csv
 """
+import os
+import sys
 
-cursor.execute(query)
-conn.commit()
-cursor.close()
-conn.close()
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), 'Data'))
+from bulk_load import bulk_load
 
-print("✅ Data loaded successfully.")
+if __name__ == '__main__':
+    path = sys.argv[1] if len(sys.argv) > 1 else os.getenv('BULK_RAW_CALLS_CSV', 'bulk_raw_calls.csv')
+    stats = bulk_load(path, 'raw_calls')
+    print(f"✅ Data loaded successfully: {stats['rows']:,} rows ({stats['rows_per_s']:,.0f} rows/s).")
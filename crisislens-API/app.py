@@ -1,6 +1,8 @@
-from flask import Flask, jsonify, request
+from flask import Flask, jsonify, request, Response
 from flask_cors import CORS
-from db_config import get_connection
+from db_config import get_connection as _get_connection
+import mysql.connector
+from mysql.connector import errorcode
 from datetime import datetime
 import os
 from dotenv import load_dotenv
@@ -14,6 +16,9 @@ from rq import Queue
 import sys
 
 from clustering import analyze_emergency_clusters
+from latency_metrics import mark, record_stages, render_prometheus, API_STAGES
+import request_profiling
+from request_profiling import profiled_connections, section, render_route_summaries
 import pandas as pd
 
 # Add project root to Python path (so we can import Classifier scripts)
@@ -35,8 +40,12 @@ CORS(app, resources={       # Allow frontend access
     }
 }) 
 
+# Per-request SQL/section timing (Server-Timing header + per-route percentiles)
+request_profiling.init_app(app)
+get_connection = profiled_connections(_get_connection)
+
 # Redis connection + queue for enrichment jobs
-redis_conn = Redis(host="localhost", port=6379, db=0)
+redis_conn = Redis.from_url(os.getenv("REDIS_URL", "redis://localhost:6379/0"))
 q = Queue("crisislens", connection=redis_conn)
 # ------------------------- Home -------------------------
 @app.route('/')
@@ -171,12 +180,13 @@ def get_calls():
                 cursor.execute(query, params)
                 results = cursor.fetchall()
 
-        return jsonify({
-            "page": page, 
-            "limit": limit, 
-            "count": len(results), 
-            "results": results
-        })
+        with section('serialization'):
+            return jsonify({
+                "page": page, 
+                "limit": limit, 
+                "count": len(results), 
+                "results": results
+            })
     except Exception as e:
         print(f"❌ Error in /calls: {str(e)}")
         return jsonify({"error": str(e)}), 500
@@ -250,6 +260,7 @@ def get_latest_calls():
 
 @app.route('/calls', methods=['POST'])
 def ingest_call():
+    trace = mark({}, 'received')
     data = request.json
 
     print("📥 Received data:", data)
@@ -294,14 +305,23 @@ def ingest_call():
                 raw_id = cursor.lastrowid
                 conn.commit()
 
+                mark(trace, 'raw_inserted')
+
                 print(f"✅ Inserted into raw_calls with ID: {raw_id}")  # ← ADD THIS
                 print(f"   caller_name: {data.get('caller_name')}")      # ← ADD THIS
                 print(f"   caller_number: {data.get('caller_number')}")  # ← ADD THIS
 
-        # Enqueue classification job in background
-        job = q.enqueue(process_emergency_call, raw_id)
+        # Enqueue classification job in background (trace travels with the job)
+        mark(trace, 'enqueue_requested')
+        job = q.enqueue(process_emergency_call, raw_id, trace)
+        mark(trace, 'enqueued')
         print(f"✅ Call {raw_id} enqueued for processing. Job ID: {job.id}")
 
+        try:
+            record_stages(redis_conn, trace, API_STAGES)
+        except Exception as e:
+            print(f"⚠️  Could not record ingest latency: {e}")
+
         return jsonify({"message": "Call successfully ingested (enrichment pending)", "raw_id": raw_id}), 201
     except Exception as e:
         print(f" Database error: {str(e)}")  # Added for debugging
@@ -352,6 +372,38 @@ def get_township_counts():
     return jsonify(results)
 
 # ------------------------- Forecast Endpoints -------------------------
+# Latest published forecast run, re-checked at most once per LATEST_RUN_TTL
+latest_run_cache = {"run": None, "timestamp": 0}
+LATEST_RUN_TTL = 60  # seconds
+
+def get_latest_forecast_run(cursor):
+    """
+    Return the newest row from forecast_runs, cached in-process.
+    Until forecast_service has created forecast_runs, fall back to the newest
+    generated_at in forecasted_calls (run_id is None then).
+    """
+    if (latest_run_cache["run"] and
+            (time() - latest_run_cache["timestamp"]) < LATEST_RUN_TTL):
+        return latest_run_cache["run"]
+
+    try:
+        cursor.execute("""
+            SELECT run_id, generated_at, series_count
+            FROM forecast_runs
+            ORDER BY run_id DESC
+            LIMIT 1
+        """)
+        run = cursor.fetchone()
+    except mysql.connector.Error as e:
+        if e.errno != errorcode.ER_NO_SUCH_TABLE:
+            raise
+        cursor.execute("SELECT MAX(generated_at) AS generated_at FROM forecasted_calls")
+        last = cursor.fetchone()['generated_at']
+        run = {"run_id": None, "generated_at": last, "series_count": None} if last else None
+    latest_run_cache["run"] = run
+    latest_run_cache["timestamp"] = time()
+    return latest_run_cache["run"]
+
 @app.route('/forecast', methods=['GET'])
 def get_forecast():
     start_date = request.args.get('start_date')  # YYYY-MM-DD
@@ -360,31 +412,37 @@ def get_forecast():
     latest = request.args.get('latest', '').lower() == 'true'
 
     query = """
-            SELECT forecast_date, township as district, emergency_type, emergency_subtype,
-               predicted_calls, lower_bound, upper_bound, model_used, source, generated_at
-        FROM forecasted_calls WHERE 1=1
+            SELECT fc.forecast_date, fc.township as district, fc.emergency_type, fc.emergency_subtype,
+               fc.predicted_calls, fc.lower_bound, fc.upper_bound, fc.model_used, fc.source, fc.generated_at
+        FROM forecasted_calls fc
     """
     params = []
 
     with get_connection() as conn:
         with conn.cursor(dictionary=True) as cursor:
             if latest:
-                cursor.execute("SELECT MAX(generated_at) AS last_run FROM forecasted_calls")
-                last = cursor.fetchone()['last_run']
-                if last:
-                    query += " AND generated_at = %s"
-                    params.append(last)
-                else:
+                run = get_latest_forecast_run(cursor)
+                if not run:
                     return jsonify([])
-
+                if run['run_id'] is not None:
+                    # Uses idx_forecasted_calls_run_date (generated_at, forecast_date)
+                    query += """
+        JOIN forecast_runs fr ON fr.generated_at = fc.generated_at AND fr.run_id = %s
+                    """
+                    params.append(run['run_id'])
+
+            query += " WHERE 1=1"
+            if latest and run['run_id'] is None:
+                query += " AND fc.generated_at = %s"
+                params.append(run['generated_at'])
             if start_date:
-                query += " AND forecast_date >= %s"
+                query += " AND fc.forecast_date >= %s"
                 params.append(start_date)
             if end_date:
-                query += " AND forecast_date <= %s"
+                query += " AND fc.forecast_date <= %s"
                 params.append(end_date)
 
-            query += " ORDER BY forecast_date ASC"
+            query += " ORDER BY fc.forecast_date ASC"
             if limit:
                 query += " LIMIT %s"
                 params.append(limit)
@@ -452,27 +510,30 @@ def get_clusters():
                 cursor.execute(query)
                 results = cursor.fetchall()
         
-        df = pd.DataFrame(results)
+        with section('pandas'):
+            df = pd.DataFrame(results)
         
         if df.empty:
             return jsonify({"error": "No data available for clustering"}), 404
         
         # Apply time filter if specified
-        if time_range == 'day':
-            df = df.copy()  # Prevent SettingWithCopyWarning
-            df['hour'] = pd.to_datetime(df['timestamp']).dt.hour
-            df = df[(df['hour'] >= 6) & (df['hour'] < 18)].copy()
-        elif time_range == 'night':
-            df = df.copy()
-            df['hour'] = pd.to_datetime(df['timestamp']).dt.hour
-            df = df[(df['hour'] < 6) | (df['hour'] >= 18)].copy()
+        with section('pandas'):
+            if time_range == 'day':
+                df = df.copy()  # Prevent SettingWithCopyWarning
+                df['hour'] = pd.to_datetime(df['timestamp']).dt.hour
+                df = df[(df['hour'] >= 6) & (df['hour'] < 18)].copy()
+            elif time_range == 'night':
+                df = df.copy()
+                df['hour'] = pd.to_datetime(df['timestamp']).dt.hour
+                df = df[(df['hour'] < 6) | (df['hour'] >= 18)].copy()
 
         # Check if we still have data after filtering
         if df.empty:
             return jsonify({"error": "No data available for selected time range"}), 404
         
         # Run clustering analysis
-        results = analyze_emergency_clusters(df)
+        with section('clustering'):
+            results = analyze_emergency_clusters(df)
         
         # Apply severity filter if specified
         if min_severity:
@@ -486,7 +547,8 @@ def get_clusters():
         cluster_cache["params"] = cache_key
         cluster_cache["timestamp"] = time()
         
-        return jsonify(results), 200
+        with section('serialization'):
+            return jsonify(results), 200
         
     except Exception as e:
         return jsonify({"error": str(e)}), 500
@@ -527,6 +589,19 @@ def get_heatmap_data():
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
+# ------------------------- Metrics Endpoint -------------------------
+@app.route('/metrics', methods=['GET'])
+def metrics():
+    """Prometheus text format: per-stage ingest -> enrichment latency histograms."""
+    try:
+        body = render_prometheus(redis_conn, extra_gauges={
+            'crisislens_queue_depth': ('Jobs waiting in the crisislens RQ queue.', q.count),
+        })
+        body += render_route_summaries()
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+    return Response(body, mimetype='text/plain; version=0.0.4')
+
 # ------------------------- Entry Point -------------------------
 if __name__ == '__main__':
     app.run(debug=True)
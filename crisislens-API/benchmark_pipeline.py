@@ -0,0 +1,324 @@
+"""
+End-to-end throughput benchmark for ingest_call -> RQ -> process_emergency_call -> enriched_calls.
+
+Runs against a scratch MySQL database and Redis db on the local server,
+never the live ones. The benchmark sets DB_NAME and REDIS_URL before the
+API and task modules are imported. raw_calls / enriched_calls are created
+in the scratch database with CREATE TABLE ... LIKE from --schema-from,
+and are truncated before every run.
+
+For each worker count in --workers:
+  1. POST --calls template-based calls to the real ingest_call handler
+     (Flask test client). This measures ingest calls/s and the API stages.
+  2. Start that many RQ SimpleWorkers in separate processes. Each imports
+     the classifier models first; the clock starts once all of them are
+     ready. They run in burst mode until the queue is empty.
+  3. Sustained throughput = calls / drain time. Per-stage latency comes from
+     the latency_metrics histograms (mean is exact, quantiles are
+     bucket-estimated). Classification agreement compares enriched_calls
+     with the type each call was generated from.
+Because the queue is pre-filled, queue_wait and end_to_end include the
+backlog; compare them between runs, not against live traffic.
+
+The JSON report can be passed back as --compare on a later run. Throughput
+drops and latency rises beyond --tolerance are then flagged and the script
+exits with status 1.
+
+Usage:
+    python benchmark_pipeline.py --workers 1 2 4 --calls 500 --report bench_main.json
+    python benchmark_pipeline.py --workers 1 2 4 --calls 500 --compare bench_main.json
+"""
+import os
+import sys
+import json
+import random
+import argparse
+import platform
+import subprocess
+import multiprocessing as mp
+from datetime import datetime, timezone
+from time import perf_counter
+from dotenv import dotenv_values
+
+API_DIR = os.path.dirname(os.path.abspath(__file__))
+ROOT_DIR = os.path.dirname(API_DIR)
+sys.path.append(API_DIR)
+sys.path.append(ROOT_DIR)
+sys.path.append(os.path.join(ROOT_DIR, 'Classifier', 'preprocessing'))
+
+BENCH_DATABASE = 'crisislens_bench'
+BENCH_REDIS_URL = 'redis://localhost:6379/15'
+QUEUE_NAME = 'crisislens'
+TABLES = ['raw_calls', 'enriched_calls']
+DISTRICTS = ['LOWER MERION', 'ABINGTON', 'NORRISTOWN', 'UPPER MERION', 'CHELTENHAM', 'POTTSTOWN']
+# (metric, higher is better) pairs checked by --compare, besides the per-stage latencies
+THROUGHPUT_METRICS = [('calls_per_s', True), ('ingest_calls_per_s', True), ('type_agreement', True)]
+
+
+# -------------------------------
+# Environment
+# -------------------------------
+def configure(database, redis_url):
+    """Point db_config / app / tasks at the scratch stores; must run before importing them."""
+    live_database = dotenv_values(os.path.join(API_DIR, '.env')).get('DB_NAME') or 'crisislens'
+    if database == live_database:
+        raise SystemExit(f"refusing to benchmark against the live database {database!r}")
+    os.environ['DB_NAME'] = database
+    os.environ['REDIS_URL'] = redis_url
+
+
+def prepare_schema(schema_from):
+    from db_config import get_connection
+    with get_connection() as conn:
+        cursor = conn.cursor()
+        for table in TABLES:
+            cursor.execute(f"CREATE TABLE IF NOT EXISTS `{table}` LIKE `{schema_from}`.`{table}`")
+        cursor.close()
+
+
+def reset(redis_conn):
+    from db_config import get_connection
+    from rq import Queue
+    from latency_metrics import KEY_PREFIX
+
+    with get_connection() as conn:
+        cursor = conn.cursor()
+        for table in reversed(TABLES):
+            cursor.execute(f"TRUNCATE TABLE `{table}`")
+        cursor.close()
+    queue = Queue(QUEUE_NAME, connection=redis_conn)
+    queue.empty()
+    for registry in (queue.failed_job_registry, queue.finished_job_registry):
+        for job_id in registry.get_job_ids():
+            registry.remove(job_id, delete_job=True)
+    keys = list(redis_conn.scan_iter(f"{KEY_PREFIX}:*"))
+    if keys:
+        redis_conn.delete(*keys)
+
+
+def git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT_DIR,
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+# -------------------------------
+# Workload
+# -------------------------------
+def make_calls(n, seed):
+    """[(emergency type, POST /calls payload)], reproducible for a given seed."""
+    from generate_natural_language_augmentation import TEMPLATES_BY_TYPE
+
+    rng = random.Random(seed)
+    now = datetime.now(timezone.utc).strftime('%Y-%m-%dT%H:%M:%SZ')
+    calls = []
+    for i in range(n):
+        emergency_type = rng.choice(list(TEMPLATES_BY_TYPE))
+        templates = TEMPLATES_BY_TYPE[emergency_type]
+        description = rng.choice(templates[rng.choice(list(templates))])
+        calls.append((emergency_type, {
+            'timestamp': now,
+            'description': description,
+            'latitude': round(40.1 + rng.uniform(-0.1, 0.1), 6),
+            'longitude': round(-75.3 + rng.uniform(-0.1, 0.1), 6),
+            'district': rng.choice(DISTRICTS),
+            'gender': rng.choice(['Male', 'Female']),
+            'age': rng.randint(18, 85),
+            'caller_name': f'Benchmark {i}',
+            'caller_number': None,
+        }))
+    return calls
+
+
+def ingest(client, calls):
+    """POST every call through ingest_call; returns ({raw_id: type}, seconds, errors)."""
+    expected, errors = {}, 0
+    started = perf_counter()
+    for emergency_type, payload in calls:
+        response = client.post('/calls', json=payload)
+        if response.status_code == 201:
+            expected[response.get_json()['raw_id']] = emergency_type
+        else:
+            errors += 1
+    return expected, perf_counter() - started, errors
+
+
+def _worker_main(redis_url, ready, start):
+    # runs in a child process: load the models, report ready, then drain the queue
+    from redis import Redis
+    from rq import Queue, SimpleWorker
+    import Classifier.production.tasks  # noqa: F401  (loads the classifier bundles)
+
+    redis_conn = Redis.from_url(redis_url)
+    ready.put(os.getpid())
+    start.wait()
+    SimpleWorker([Queue(QUEUE_NAME, connection=redis_conn)], connection=redis_conn).work(
+        burst=True, logging_level='WARNING'
+    )
+
+
+def drain(n_workers, redis_url):
+    """Seconds for `n_workers` burst workers to empty the queue (model loading excluded)."""
+    ctx = mp.get_context('spawn')
+    ready, start = ctx.Queue(), ctx.Event()
+    workers = [ctx.Process(target=_worker_main, args=(redis_url, ready, start)) for _ in range(n_workers)]
+    for w in workers:
+        w.start()
+    for _ in workers:
+        ready.get(timeout=600)
+    started = perf_counter()
+    start.set()
+    for w in workers:
+        w.join()
+    return perf_counter() - started
+
+
+# -------------------------------
+# Measurements
+# -------------------------------
+def stage_latencies(redis_conn):
+    from latency_metrics import read_histograms, estimate_quantile
+
+    stages = {}
+    for stage, h in read_histograms(redis_conn).items():
+        if not h['count']:
+            continue
+        stages[stage] = {
+            'count': h['count'],
+            'mean_ms': h['sum'] / h['count'] * 1000,
+            **{f"p{int(q * 100)}_ms": estimate_quantile(h['buckets'], q) * 1000 for q in (0.5, 0.95, 0.99)},
+        }
+    return stages
+
+
+def enriched_agreement(expected):
+    from db_config import get_connection
+
+    with get_connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute("SELECT raw_call_id, emergency_type FROM enriched_calls")
+        rows = cursor.fetchall()
+        cursor.close()
+    matched = sum(1 for raw_id, emergency_type in rows if expected.get(raw_id) == emergency_type)
+    return len(rows), (matched / len(rows) if rows else None)
+
+
+def run_once(n_workers, calls, redis_conn, redis_url):
+    from app import app
+    from rq import Queue
+
+    reset(redis_conn)
+    expected, ingest_seconds, ingest_errors = ingest(app.test_client(), calls)
+    drain_seconds = drain(n_workers, redis_url)
+    enriched, agreement = enriched_agreement(expected)
+    failed = Queue(QUEUE_NAME, connection=redis_conn).failed_job_registry.count
+
+    return {
+        'workers': n_workers,
+        'calls': len(calls),
+        'ingest_errors': ingest_errors,
+        'ingest_calls_per_s': len(expected) / ingest_seconds if ingest_seconds else None,
+        'enriched': enriched,
+        'failed_jobs': failed,
+        'drain_s': drain_seconds,
+        'calls_per_s': enriched / drain_seconds if drain_seconds else None,
+        'type_agreement': agreement,
+        'stages': stage_latencies(redis_conn),
+    }
+
+
+# -------------------------------
+# Comparison
+# -------------------------------
+def compare(report, baseline, tolerance):
+    """Print per-metric changes against `baseline`; returns the list of regressions."""
+    regressions = []
+    previous = {r['workers']: r for r in baseline['results']}
+    print("\n" + "=" * 78)
+    print(f"COMPARISON vs {baseline.get('commit') or 'baseline'} ({baseline.get('created_at', '?')})")
+    print("=" * 78)
+    for result in report['results']:
+        before = previous.get(result['workers'])
+        if before is None:
+            continue
+        checks = [(m, result.get(m), before.get(m), higher) for m, higher in THROUGHPUT_METRICS]
+        for stage, now in result['stages'].items():
+            was = before.get('stages', {}).get(stage, {})
+            for key in ('mean_ms', 'p95_ms'):
+                checks.append((f"{stage}.{key}", now.get(key), was.get(key), False))
+
+        for name, now, was, higher_is_better in checks:
+            if now is None or was is None or was == 0:
+                continue
+            change = (now - was) / abs(was)
+            worse = -change if higher_is_better else change
+            flag = "  ⚠️ REGRESSION" if worse > tolerance else ""
+            if flag:
+                regressions.append((result['workers'], name, was, now))
+            print(f"  {result['workers']:>2} workers  {name:<32}{was:>12.3f} -> {now:>12.3f}  {change:>+8.1%}{flag}")
+    return regressions
+
+
+def print_result(result):
+    agreement = result['type_agreement']
+    print(f"\n{result['workers']} worker(s): {result['calls_per_s']:.1f} calls/s sustained "
+          f"({result['enriched']}/{result['calls']} enriched in {result['drain_s']:.1f}s, "
+          f"{result['failed_jobs']} failed), ingest {result['ingest_calls_per_s']:.1f} calls/s, "
+          f"type agreement {'-' if agreement is None else f'{agreement:.1%}'}")
+    for stage, s in result['stages'].items():
+        print(f"    {stage:<16} mean {s['mean_ms']:>9.1f}  p50 {s['p50_ms']:>9.1f}  "
+              f"p95 {s['p95_ms']:>9.1f}  p99 {s['p99_ms']:>9.1f} ms  (n={s['count']})")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark ingest -> enrichment throughput for 1..N workers")
+    parser.add_argument('--workers', type=int, nargs='+', default=[1, 2, 4])
+    parser.add_argument('--calls', type=int, default=500, help="calls per run")
+    parser.add_argument('--database', default=BENCH_DATABASE, help="scratch MySQL database")
+    parser.add_argument('--schema-from', default='crisislens', help="database to copy the table definitions from")
+    parser.add_argument('--redis-url', default=BENCH_REDIS_URL, help="scratch Redis (its own db number)")
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--report', default='pipeline_benchmark.json')
+    parser.add_argument('--compare', help="earlier report to compare against")
+    parser.add_argument('--tolerance', type=float, default=0.10, help="relative change counted as a regression")
+    args = parser.parse_args()
+
+    configure(args.database, args.redis_url)
+    from redis import Redis
+    redis_conn = Redis.from_url(args.redis_url)
+    prepare_schema(args.schema_from)
+
+    calls = make_calls(args.calls, args.seed)
+    report = {
+        'created_at': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+        'commit': git_commit(),
+        'host': platform.node(),
+        'python': platform.python_version(),
+        'cpu_count': os.cpu_count(),
+        'calls': args.calls,
+        'seed': args.seed,
+        'results': [],
+    }
+    for n_workers in args.workers:
+        result = run_once(n_workers, calls, redis_conn, args.redis_url)
+        report['results'].append(result)
+        print_result(result)
+
+    with open(args.report, 'w') as f:
+        json.dump(report, f, indent=2)
+    print(f"\n✅ Report written to {args.report}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        regressions = compare(report, baseline, args.tolerance)
+        if regressions:
+            print(f"\n{len(regressions)} metric(s) regressed by more than {args.tolerance:.0%}")
+            sys.exit(1)
+        print("\nNo regressions beyond tolerance")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,184 @@
+import os
+import logging
+import argparse
+from datetime import date
+import pandas as pd
+from sqlalchemy import text
+
+# -------------------------
+# Configuration
+# -------------------------
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+ARCHIVE_DIR = os.path.join(BASE_DIR, "forecasts", "archive")
+
+KEEP_LAST_RUNS = int(os.getenv("FORECAST_KEEP_LAST_RUNS", "14"))
+PARTITION_MONTHS_AHEAD = 3
+
+# -------------------------
+# Retention Policy
+# -------------------------
+def select_runs_to_keep(runs, keep_last=KEEP_LAST_RUNS):
+    """
+    Given forecast_runs rows (dicts with run_id and generated_at), return the
+    run_ids to keep: the newest `keep_last` runs plus the newest run of every
+    ISO week.
+    """
+    ordered = sorted(runs, key=lambda r: r["generated_at"], reverse=True)
+    keep = {r["run_id"] for r in ordered[:keep_last]}
+
+    seen_weeks = set()
+    for run in ordered:
+        week = tuple(run["generated_at"].isocalendar()[:2])
+        if week not in seen_weeks:
+            seen_weeks.add(week)
+            keep.add(run["run_id"])
+    return keep
+
+def fetch_runs(conn):
+    result = conn.execute(text("SELECT run_id, generated_at, series_count FROM forecast_runs"))
+    return [dict(row._mapping) for row in result]
+
+def archive_run(conn, run, archive_dir=ARCHIVE_DIR):
+    """Write one run's forecasted_calls rows to compressed Parquet. Safe to re-run."""
+    os.makedirs(archive_dir, exist_ok=True)
+    filename = f"run_{run['run_id']}_{run['generated_at']:%Y%m%d_%H%M%S}.parquet"
+    path = os.path.join(archive_dir, filename)
+    if os.path.exists(path):
+        return path
+
+    df = pd.read_sql(
+        text("SELECT * FROM forecasted_calls WHERE generated_at = :generated_at"),
+        conn,
+        params={"generated_at": run["generated_at"]}
+    )
+    tmp_path = path + ".tmp"
+    df.to_parquet(tmp_path, compression="zstd", index=False)
+    os.replace(tmp_path, path)
+    logging.info(f"Archived run {run['run_id']} ({len(df)} rows) to {path}")
+    return path
+
+def apply_retention(engine, keep_last=KEEP_LAST_RUNS, archive_dir=ARCHIVE_DIR, dry_run=False):
+    """Archive and delete every forecast run outside the retention policy."""
+    with engine.connect() as conn:
+        runs = fetch_runs(conn)
+    keep = select_runs_to_keep(runs, keep_last=keep_last)
+    expired = [r for r in runs if r["run_id"] not in keep]
+    logging.info(f"Retention: {len(runs)} runs, keeping {len(keep)}, pruning {len(expired)}")
+
+    if dry_run:
+        return expired
+
+    for run in sorted(expired, key=lambda r: r["generated_at"]):
+        with engine.begin() as conn:
+            archive_run(conn, run, archive_dir)
+            conn.execute(
+                text("DELETE FROM forecasted_calls WHERE generated_at = :generated_at"),
+                {"generated_at": run["generated_at"]}
+            )
+            conn.execute(text("DELETE FROM forecast_runs WHERE run_id = :run_id"), {"run_id": run["run_id"]})
+    return expired
+
+# -------------------------
+# Partitioning
+# -------------------------
+def month_start(d: date, offset: int = 0) -> date:
+    month_index = d.year * 12 + (d.month - 1) + offset
+    return date(month_index // 12, month_index % 12 + 1, 1)
+
+def partition_name(d: date) -> str:
+    return f"p{d:%Y%m}"
+
+def fetch_partitions(conn):
+    result = conn.execute(text("""
+        SELECT partition_name
+        FROM information_schema.partitions
+        WHERE table_schema = DATABASE()
+          AND table_name = 'forecasted_calls'
+          AND partition_name IS NOT NULL
+    """))
+    return {row[0] for row in result}
+
+def init_partitions(engine, months_ahead=PARTITION_MONTHS_AHEAD):
+    """
+    One-time migration: partition forecasted_calls by month of generated_at.
+    MySQL requires the partition column in every unique key, so the primary
+    key is widened to (id, generated_at) first.
+    """
+    with engine.begin() as conn:
+        if fetch_partitions(conn):
+            logging.info("forecasted_calls is already partitioned")
+            return
+
+        oldest = conn.execute(text("SELECT MIN(generated_at) FROM forecasted_calls")).scalar()
+        first_month = month_start(oldest.date() if oldest else date.today())
+        last_month = month_start(date.today(), months_ahead)
+
+        bounds = []
+        current = first_month
+        while current <= last_month:
+            upper = month_start(current, 1)
+            bounds.append(f"PARTITION {partition_name(current)} VALUES LESS THAN (TO_DAYS('{upper}'))")
+            current = upper
+        bounds.append("PARTITION p_future VALUES LESS THAN MAXVALUE")
+
+        logging.info(f"Partitioning forecasted_calls into {len(bounds)} monthly partitions")
+        conn.execute(text("ALTER TABLE forecasted_calls DROP PRIMARY KEY, ADD PRIMARY KEY (id, generated_at)"))
+        conn.execute(text(
+            "ALTER TABLE forecasted_calls PARTITION BY RANGE (TO_DAYS(generated_at)) (\n    "
+            + ",\n    ".join(bounds) + "\n)"
+        ))
+
+def extend_partitions(engine, months_ahead=PARTITION_MONTHS_AHEAD):
+    """Split p_future so monthly partitions always exist `months_ahead` months out."""
+    with engine.begin() as conn:
+        existing = fetch_partitions(conn)
+        if not existing:
+            logging.info("forecasted_calls is not partitioned; run with --init-partitions first")
+            return []
+
+        missing = []
+        for offset in range(months_ahead + 1):
+            current = month_start(date.today(), offset)
+            if partition_name(current) not in existing:
+                missing.append(current)
+
+        if not missing:
+            return []
+
+        new_parts = [
+            f"PARTITION {partition_name(m)} VALUES LESS THAN (TO_DAYS('{month_start(m, 1)}'))"
+            for m in missing
+        ]
+        new_parts.append("PARTITION p_future VALUES LESS THAN MAXVALUE")
+        conn.execute(text(
+            "ALTER TABLE forecasted_calls REORGANIZE PARTITION p_future INTO (\n    "
+            + ",\n    ".join(new_parts) + "\n)"
+        ))
+        logging.info(f"Added partitions: {[partition_name(m) for m in missing]}")
+        return missing
+
+# -------------------------
+# Maintenance Entry Point
+# -------------------------
+def run_maintenance(engine, keep_last=KEEP_LAST_RUNS, dry_run=False):
+    """Called by forecast_service after a run is published."""
+    expired = apply_retention(engine, keep_last=keep_last, dry_run=dry_run)
+    if not dry_run:
+        extend_partitions(engine)
+    return expired
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Prune, archive and partition forecasted_calls.")
+    parser.add_argument("--keep-last", type=int, default=KEEP_LAST_RUNS, help="Most recent runs to always keep")
+    parser.add_argument("--dry-run", action="store_true", help="Report runs that would be pruned")
+    parser.add_argument("--init-partitions", action="store_true", help="Partition forecasted_calls by month (one-time)")
+    return parser.parse_args()
+
+if __name__ == "__main__":
+    from forecast_service import engine
+
+    args = parse_args()
+    if args.init_partitions:
+        init_partitions(engine)
+    pruned = run_maintenance(engine, keep_last=args.keep_last, dry_run=args.dry_run)
+    logging.info(f"Pruned runs: {[r['run_id'] for r in pruned]}")
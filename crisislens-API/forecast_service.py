@@ -1,11 +1,18 @@
 import os
+import json
+import hashlib
 import logging
-from datetime import date
+import argparse
+from datetime import date, datetime
+from concurrent.futures import ProcessPoolExecutor, as_completed
 import pandas as pd
 from prophet import Prophet
 from sqlalchemy import create_engine, text
 from dotenv import load_dotenv
+import matplotlib
+matplotlib.use("Agg")  # headless backend so plots can render in worker processes
 import matplotlib.pyplot as plt
+from forecast_maintenance import run_maintenance
 
 # -------------------------
 # Configuration & Setup
@@ -13,6 +20,7 @@ import matplotlib.pyplot as plt
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 FORECAST_DIR = os.path.join(BASE_DIR, "forecasts")
 PLOT_DIR = os.path.join(FORECAST_DIR, "plots")
+SERIES_STATE_FILE = os.path.join(FORECAST_DIR, "series_state.json")
 
 os.makedirs(FORECAST_DIR, exist_ok=True)
 os.makedirs(PLOT_DIR, exist_ok=True)
@@ -72,15 +80,73 @@ def fetch_daily_calls_by_type(engine, emergency_type: str | None = None):
         df = pd.read_sql(text(query), conn, params=params)
     return df
 
-def store_forecast(forecast_df, emergency_type: str | None, model_used: str):
+def ensure_forecast_schema(engine):
+    """
+    Create the forecast_runs metadata table and the (generated_at, forecast_date)
+    index on forecasted_calls if they are missing. Existing runs are backfilled
+    into forecast_runs the first time the table is created.
+    """
+    with engine.begin() as conn:
+        conn.execute(text("""
+            CREATE TABLE IF NOT EXISTS forecast_runs (
+                run_id INT AUTO_INCREMENT PRIMARY KEY,
+                generated_at DATETIME NOT NULL,
+                series_count INT NOT NULL,
+                model_used VARCHAR(50),
+                UNIQUE KEY uq_forecast_runs_generated_at (generated_at)
+            )
+        """))
+
+        has_runs = conn.execute(text("SELECT 1 FROM forecast_runs LIMIT 1")).first()
+        if not has_runs:
+            conn.execute(text("""
+                INSERT INTO forecast_runs (generated_at, series_count, model_used)
+                SELECT generated_at, COUNT(DISTINCT COALESCE(emergency_type, 'Overall')), MAX(model_used)
+                FROM forecasted_calls
+                GROUP BY generated_at
+                ORDER BY generated_at
+            """))
+
+        has_index = conn.execute(text("""
+            SELECT 1 FROM information_schema.statistics
+            WHERE table_schema = DATABASE()
+              AND table_name = 'forecasted_calls'
+              AND index_name = 'idx_forecasted_calls_run_date'
+            LIMIT 1
+        """)).first()
+        if not has_index:
+            logging.info("Creating index idx_forecasted_calls_run_date on forecasted_calls")
+            conn.execute(text(
+                "CREATE INDEX idx_forecasted_calls_run_date ON forecasted_calls (generated_at, forecast_date)"
+            ))
+
+def publish_forecast_run(engine, generated_at, series_count: int, model_used: str):
+    """
+    Record a completed run in forecast_runs. Runs become visible to
+    GET /forecast?latest=true only once this row exists.
+    """
+    with engine.begin() as conn:
+        result = conn.execute(
+            text("""
+                INSERT INTO forecast_runs (generated_at, series_count, model_used)
+                VALUES (:generated_at, :series_count, :model_used)
+            """),
+            {"generated_at": generated_at, "series_count": series_count, "model_used": model_used}
+        )
+    logging.info(f"Published forecast run {result.lastrowid} ({series_count} series) at {generated_at}")
+    return result.lastrowid
+
+def store_forecast(forecast_df, emergency_type: str | None, model_used: str, generated_at=None):
     """Insert forecast results into forecasted_calls table."""
+    if generated_at is None:
+        generated_at = datetime.now().replace(microsecond=0)
     insert_query = """
         INSERT INTO forecasted_calls
             (forecast_date, district, emergency_type, emergency_subtype,
              predicted_calls, lower_bound, upper_bound, model_used, source, generated_at)
         VALUES
             (:forecast_date, :district, :emergency_type, :emergency_subtype,
-             :predicted_calls, :lower_bound, :upper_bound, :model_used, :source, NOW())
+             :predicted_calls, :lower_bound, :upper_bound, :model_used, :source, :generated_at)
     """
     inserted_dates = []
     with engine.begin() as conn:
@@ -96,12 +162,58 @@ def store_forecast(forecast_df, emergency_type: str | None, model_used: str):
                     "lower_bound": int(row["lower_bound"]),
                     "upper_bound": int(row["upper_bound"]),
                     "model_used": model_used,
-                    "source": "batch_forecast"
+                    "source": "batch_forecast",
+                    "generated_at": generated_at
                 }
             )
             inserted_dates.append(row["forecast_date"])
     return inserted_dates
 
+# -------------------------
+# Incremental Refresh State
+# -------------------------
+def series_key(emergency_type: str | None) -> str:
+    return emergency_type if emergency_type else "Overall"
+
+def history_fingerprint(history_df: pd.DataFrame, model: str, periods: int) -> dict:
+    """Summarise a series' input so unchanged histories can skip refitting."""
+    digest = hashlib.sha256(history_df[["ds", "y"]].to_csv(index=False).encode("utf-8")).hexdigest()
+    return {
+        "last_date": str(history_df["ds"].max()),
+        "rows": int(len(history_df)),
+        "hash": digest,
+        "model": model,
+        "periods": int(periods),
+    }
+
+def load_series_state(path=SERIES_STATE_FILE) -> dict:
+    """Load per-series fingerprints and cached forecasts from the last run."""
+    if not os.path.exists(path):
+        return {}
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError) as e:
+        logging.warning(f"Could not read series state ({e}); refitting all series.")
+        return {}
+
+def save_series_state(state: dict, path=SERIES_STATE_FILE):
+    """Write the state file atomically so a crashed run can't leave it half-written."""
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(state, f, indent=2)
+    os.replace(tmp_path, path)
+
+def forecast_to_records(forecast_df: pd.DataFrame) -> list:
+    records = forecast_df[["forecast_date", "predicted_calls", "lower_bound", "upper_bound"]].copy()
+    records["forecast_date"] = pd.to_datetime(records["forecast_date"]).dt.strftime("%Y-%m-%d")
+    return records.to_dict(orient="records")
+
+def forecast_from_records(records: list) -> pd.DataFrame:
+    forecast_df = pd.DataFrame.from_records(records)
+    forecast_df["forecast_date"] = pd.to_datetime(forecast_df["forecast_date"])
+    return forecast_df
+
 # -------------------------
 # Forecasting Functions
 # -------------------------
@@ -161,48 +273,118 @@ def plot_forecast(history_df, forecast_df, emergency_type: str | None):
     plt.savefig(filepath)
     plt.close()
     logging.info(f"Saved forecast plot: {filepath}")
+    return filepath
+
+def render_forecast_plots(plot_jobs, max_workers=None):
+    """
+    Render forecast plots in a separate process pool.
+    Runs after every forecast is stored, so a slow or failing render never
+    delays or breaks publishing.
+    """
+    if not plot_jobs:
+        return []
+
+    saved = []
+    with ProcessPoolExecutor(max_workers=max_workers) as pool:
+        futures = {
+            pool.submit(plot_forecast, hist, forecast_df, etype): series_key(etype)
+            for hist, forecast_df, etype in plot_jobs
+        }
+        for future in as_completed(futures):
+            try:
+                saved.append(future.result())
+            except Exception as e:
+                logging.error(f"Plot rendering failed for {futures[future]}: {e}")
+    return saved
 
 # -------------------------
 # Main Forecasting Orchestrator
 # -------------------------
-def generate_forecast(engine, model="prophet", periods=14, anchor=True):
+def forecast_series(hist, emergency_type, state, model, periods, full_refresh=False):
+    """
+    Return the raw (un-anchored) forecast for one series.
+    Series whose history fingerprint matches the last run reuse the cached
+    forecast instead of refitting Prophet.
+    """
+    key = series_key(emergency_type)
+    fingerprint = history_fingerprint(hist, model, periods)
+    cached = state.get(key)
+
+    if not full_refresh and cached and cached.get("fingerprint") == fingerprint:
+        logging.info(f"No new calls for {key} since last run; carrying forward cached forecast.")
+        return forecast_from_records(cached["forecast"]), False
+
+    logging.info(f"History changed for {key} ({fingerprint['rows']} days, last {fingerprint['last_date']}); refitting.")
+    forecast_df = prophet_forecast(hist, periods=periods)
+    state[key] = {"fingerprint": fingerprint, "forecast": forecast_to_records(forecast_df)}
+    return forecast_df, True
+
+def generate_forecast(engine, model="prophet", periods=14, anchor=True, full_refresh=False,
+                      plots=True, plot_workers=None):
     all_inserted_dates = []
+    plot_jobs = []
+    state = load_series_state()
+    refitted = 0
+    published = 0
+
+    # One timestamp per run so every series shares the same generated_at
+    ensure_forecast_schema(engine)
+    run_generated_at = datetime.now().replace(microsecond=0)
 
     types = fetch_emergency_types(engine)
     logging.info(f"Found emergency types: {types}")
 
-    for etype in types:
-        hist = fetch_daily_calls_by_type(engine, etype)
+    series = [(etype, fetch_daily_calls_by_type(engine, etype)) for etype in types]
+    series.append((None, fetch_daily_calls_by_type(engine, emergency_type=None)))
+
+    for etype, hist in series:
         if hist.empty:
-            logging.warning(f"No historical data for type: {etype}")
+            logging.warning(f"No historical data for type: {series_key(etype)}")
             continue
 
-        forecast_df = prophet_forecast(hist, periods=periods)
+        forecast_df, was_refit = forecast_series(hist, etype, state, model, periods, full_refresh)
+        refitted += int(was_refit)
         if anchor:
             forecast_df = anchor_forecast_to_today(forecast_df, last_hist_date=hist["ds"].max())
 
-        inserted_dates = store_forecast(forecast_df, emergency_type=etype, model_used=model.capitalize())
+        inserted_dates = store_forecast(forecast_df, emergency_type=etype, model_used=model.capitalize(),
+                                        generated_at=run_generated_at)
         all_inserted_dates.extend(inserted_dates)
+        published += 1
 
-        plot_forecast(hist, forecast_df, etype)
+        if plots:
+            plot_jobs.append((hist[["ds", "y"]], forecast_df, etype))
 
-    hist_overall = fetch_daily_calls_by_type(engine, emergency_type=None)
-    if not hist_overall.empty:
-        forecast_df_overall = prophet_forecast(hist_overall, periods=periods)
-        if anchor:
-            forecast_df_overall = anchor_forecast_to_today(forecast_df_overall, last_hist_date=hist_overall["ds"].max())
-
-        inserted_dates_overall = store_forecast(forecast_df_overall, emergency_type=None, model_used=model.capitalize())
-        all_inserted_dates.extend(inserted_dates_overall)
-
-        plot_forecast(hist_overall, forecast_df_overall, emergency_type=None)
+    save_series_state(state)
+    logging.info(f"Refitted {refitted} of {len(series)} series.")
+    if published:
+        publish_forecast_run(engine, run_generated_at, published, model.capitalize())
 
+    # Post-step: forecasts are already published at this point
+    render_forecast_plots(plot_jobs, max_workers=plot_workers)
     return all_inserted_dates
 
 # -------------------------
 # Entry Point
 # -------------------------
+def parse_args():
+    parser = argparse.ArgumentParser(description="Generate CrisisLens call volume forecasts.")
+    parser.add_argument("--periods", type=int, default=30, help="Days to forecast ahead")
+    parser.add_argument("--anchor", action="store_true", default=True, help="Shift forecasts to start from today")
+    parser.add_argument("--no-anchor", dest="anchor", action="store_false")
+    parser.add_argument("--full-refresh", action="store_true", help="Refit every series, ignoring cached fingerprints")
+    parser.add_argument("--no-plots", dest="plots", action="store_false", help="Skip rendering forecast plots")
+    parser.add_argument("--plot-workers", type=int, default=None, help="Processes used to render plots")
+    parser.add_argument("--skip-maintenance", action="store_true", help="Don't prune or archive old runs afterwards")
+    return parser.parse_args()
+
 if __name__ == "__main__":
+    args = parse_args()
     logging.info("Starting forecast generation...")
-    inserted = generate_forecast(engine, model="prophet", periods=30, anchor=True)
+    inserted = generate_forecast(engine, model="prophet", periods=args.periods,
+                                 anchor=args.anchor, full_refresh=args.full_refresh,
+                                 plots=args.plots, plot_workers=args.plot_workers)
     logging.info(f"Inserted forecast for dates: {inserted}")
+
+    if not args.skip_maintenance:
+        run_maintenance(engine)
@@ -0,0 +1,133 @@
+"""
+Ingest -> enrichment latency tracking shared by the API and the RQ worker.
+
+A call carries a `trace` dict of wall-clock marks (epoch seconds) from
+POST /calls through to the enriched_calls commit. Each process turns the marks
+it owns into per-stage durations and adds them to histograms stored in Redis,
+so the API's /metrics endpoint sees observations from every worker.
+"""
+import math
+from time import time
+
+KEY_PREFIX = "crisislens:latency"
+
+# Upper bounds in seconds; +Inf is implicit
+BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300)
+QUANTILES = (0.5, 0.95, 0.99)
+
+# (stage, from mark, to mark) in pipeline order
+API_STAGES = [
+    ("raw_insert", "received", "raw_inserted"),
+    ("enqueue", "raw_inserted", "enqueued"),
+]
+WORKER_STAGES = [
+    ("queue_wait", "enqueue_requested", "job_started"),
+    ("classification", "job_started", "classified"),
+    ("enriched_insert", "classified", "enriched_inserted"),
+    ("commit", "enriched_inserted", "committed"),
+    ("end_to_end", "received", "committed"),
+]
+STAGES = [stage for stage, _, _ in API_STAGES + WORKER_STAGES]
+
+
+def mark(trace, name):
+    """Record the current time under `name` and return the trace."""
+    trace[name] = time()
+    return trace
+
+
+def _bucket_index(seconds):
+    for i, upper in enumerate(BUCKETS):
+        if seconds <= upper:
+            return i
+    return len(BUCKETS)
+
+
+def observe(redis_conn, stage, seconds, pipe=None):
+    """Add one observation to a stage histogram."""
+    key = f"{KEY_PREFIX}:{stage}"
+    p = pipe if pipe is not None else redis_conn.pipeline()
+    p.hincrby(key, f"b{_bucket_index(seconds)}", 1)
+    p.hincrbyfloat(key, "sum", seconds)
+    p.hincrby(key, "count", 1)
+    if pipe is None:
+        p.execute()
+
+
+def record_stages(redis_conn, trace, stages):
+    """Observe every stage in `stages` whose marks are both present in the trace."""
+    pipe = redis_conn.pipeline()
+    for stage, start, end in stages:
+        if start in trace and end in trace:
+            observe(redis_conn, stage, max(0.0, trace[end] - trace[start]), pipe=pipe)
+    pipe.execute()
+
+
+def read_histograms(redis_conn):
+    """{stage: {"buckets": [per-bucket counts], "sum": float, "count": int}}"""
+    pipe = redis_conn.pipeline()
+    for stage in STAGES:
+        pipe.hgetall(f"{KEY_PREFIX}:{stage}")
+    histograms = {}
+    for stage, raw in zip(STAGES, pipe.execute()):
+        raw = {k.decode() if isinstance(k, bytes) else k: v for k, v in raw.items()}
+        histograms[stage] = {
+            "buckets": [int(raw.get(f"b{i}", 0)) for i in range(len(BUCKETS) + 1)],
+            "sum": float(raw.get("sum", 0)),
+            "count": int(raw.get("count", 0)),
+        }
+    return histograms
+
+
+def estimate_quantile(buckets, q):
+    """Linear interpolation within the bucket holding the q-th observation."""
+    total = sum(buckets)
+    if total == 0:
+        return float("nan")
+    rank = q * total
+    cumulative = 0
+    for i, count in enumerate(buckets):
+        if cumulative + count >= rank and count > 0:
+            lower = BUCKETS[i - 1] if i > 0 else 0.0
+            upper = BUCKETS[i] if i < len(BUCKETS) else BUCKETS[-1]
+            return lower + (upper - lower) * (rank - cumulative) / count
+        cumulative += count
+    return BUCKETS[-1]
+
+
+def _fmt(value):
+    if math.isnan(value):
+        return "NaN"
+    if math.isinf(value):
+        return "+Inf"
+    return repr(float(value))
+
+
+def render_prometheus(redis_conn, extra_gauges=None):
+    """Prometheus text exposition of the stage histograms + estimated p50/p95/p99."""
+    histograms = read_histograms(redis_conn)
+    lines = [
+        "# HELP crisislens_ingest_stage_seconds Time spent in each ingest -> enrichment stage.",
+        "# TYPE crisislens_ingest_stage_seconds histogram",
+    ]
+    for stage, h in histograms.items():
+        cumulative = 0
+        for upper, count in zip(list(BUCKETS) + [math.inf], h["buckets"]):
+            cumulative += count
+            lines.append(f'crisislens_ingest_stage_seconds_bucket{{stage="{stage}",le="{_fmt(upper)}"}} {cumulative}')
+        lines.append(f'crisislens_ingest_stage_seconds_sum{{stage="{stage}"}} {_fmt(h["sum"])}')
+        lines.append(f'crisislens_ingest_stage_seconds_count{{stage="{stage}"}} {h["count"]}')
+
+    lines += [
+        "# HELP crisislens_ingest_stage_seconds_estimate Bucket-interpolated quantiles of stage latency.",
+        "# TYPE crisislens_ingest_stage_seconds_estimate gauge",
+    ]
+    for stage, h in histograms.items():
+        for q in QUANTILES:
+            value = estimate_quantile(h["buckets"], q)
+            lines.append(f'crisislens_ingest_stage_seconds_estimate{{stage="{stage}",quantile="{q}"}} {_fmt(value)}')
+
+    for name, (help_text, value) in (extra_gauges or {}).items():
+        lines += [f"# HELP {name} {help_text}", f"# TYPE {name} gauge", f"{name} {_fmt(value)}"]
+
+    return "\n".join(lines) + "\n"
@@ -0,0 +1,352 @@
+"""
+Load generator for the ingest -> enrichment pipeline.
+
+Sends realistic calls to POST /calls at a target rate, so every call goes
+through the API, raw_calls, the RQ queue and a worker, just like real
+traffic. Call descriptions come from the natural-language augmentation
+templates. Townships and coordinates come from emergency_data, via the
+helpers in simulate_calls.py.
+
+The schedule is open-loop: calls are due at the profile's rate whether or
+not earlier ones have finished. A slow API shows up as growing ingest
+latency and as late starts (schedule lag), not as a lower offered rate.
+Each sample interval prints and records:
+  - sent / ok / errors and achieved rate
+  - ingest latency (POST round trip) p50 / p95 / max
+  - RQ queue depth (crisislens_queue_depth from GET /metrics)
+  - enriched count, still-pending count and enrichment lag. Lag is the age
+    of the oldest call the loader sent that has no enriched_calls row yet,
+    polled from MySQL.
+
+Profiles (--profile):
+  steady  constant --rate
+  burst   --rate, multiplied by --burst-factor for --burst-length seconds every --burst-every
+  ramp    linear from --rate / 10 to --rate over --duration
+  spike   --rate, with a single --burst-factor spike in the middle of the run
+
+Usage:
+    python load_generator.py --rate 5 --duration 60
+    python load_generator.py --rate 20 --concurrency 16 --profile burst --burst-factor 5 --report load.json
+"""
+import os
+import sys
+import json
+import random
+import argparse
+import threading
+from datetime import datetime, timezone
+from time import perf_counter, sleep, time
+from concurrent.futures import ThreadPoolExecutor
+import requests
+
+sys.path.append(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'Classifier', 'preprocessing'))
+from generate_natural_language_augmentation import TEMPLATES_BY_TYPE
+from simulate_calls import fetch_township_coords, random_call
+from db_config import get_connection
+from request_profiling import percentile
+
+API_URL = os.getenv('CRISISLENS_API_URL', 'http://127.0.0.1:5000')
+# share of calls per emergency type (roughly the Montgomery mix)
+TYPE_WEIGHTS = {'EMS': 0.5, 'Fire': 0.15, 'Traffic': 0.35}
+
+
+# -------------------------------
+# Rate profiles
+# -------------------------------
+def rate_at(t, args):
+    """Target calls/s at `t` seconds into the run."""
+    if args.profile == 'burst':
+        in_burst = (t % args.burst_every) < args.burst_length
+        return args.rate * (args.burst_factor if in_burst else 1)
+    if args.profile == 'ramp':
+        low = args.rate / 10
+        return low + (args.rate - low) * min(t / args.duration, 1.0)
+    if args.profile == 'spike':
+        start = (args.duration - args.burst_length) / 2
+        return args.rate * (args.burst_factor if start <= t < start + args.burst_length else 1)
+    return args.rate
+
+
+def schedule(args):
+    """Send offsets (seconds from start) for the whole run."""
+    offsets, t = [], 0.0
+    while t < args.duration:
+        offsets.append(t)
+        t += 1.0 / max(rate_at(t, args), 1e-6)
+    return offsets
+
+
+# -------------------------------
+# Call payloads
+# -------------------------------
+class CallFactory:
+    """Builds POST /calls payloads from the augmentation templates and real townships."""
+
+    def __init__(self, township_coords, seed):
+        self.township_coords = township_coords
+        self.rng = random.Random(seed)
+        self.lock = threading.Lock()
+        self.types = list(TYPE_WEIGHTS)
+        self.weights = [TYPE_WEIGHTS[t] for t in self.types]
+
+    def make(self):
+        with self.lock:
+            emergency_type = self.rng.choices(self.types, self.weights)[0]
+            templates = TEMPLATES_BY_TYPE[emergency_type]
+            subtype = self.rng.choice(list(templates))
+            description = self.rng.choice(templates[subtype])
+            call = random_call(self.township_coords, description)
+        return emergency_type, {
+            'timestamp': datetime.now(timezone.utc).strftime('%Y-%m-%dT%H:%M:%SZ'),
+            'description': call['description'],
+            'latitude': call['latitude'],
+            'longitude': call['longitude'],
+            'district': call['township'],
+            'gender': call['gender'],
+            'age': call['age'],
+            'caller_name': 'Load Test',
+            'caller_number': None,
+        }
+
+
+# -------------------------------
+# Run state shared by senders and the sampler
+# -------------------------------
+class RunState:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.interval = {'sent': 0, 'ok': 0, 'errors': 0, 'latencies': [], 'late': []}
+        self.totals = {'sent': 0, 'ok': 0, 'errors': 0, 'latencies': [], 'late': []}
+        self.pending = {}          # raw_id -> (sent at, intended type)
+        self.enriched = []         # (enrichment seconds, type matched)
+
+    def record(self, ok, latency, late, raw_id=None, sent_at=None, emergency_type=None):
+        with self.lock:
+            for bucket in (self.interval, self.totals):
+                bucket['sent'] += 1
+                bucket['ok' if ok else 'errors'] += 1
+                bucket['latencies'].append(latency)
+                bucket['late'].append(late)
+            if raw_id is not None:
+                self.pending[raw_id] = (sent_at, emergency_type)
+
+    def take_interval(self):
+        with self.lock:
+            interval = self.interval
+            self.interval = {'sent': 0, 'ok': 0, 'errors': 0, 'latencies': [], 'late': []}
+        return interval
+
+
+def send_call(session, url, factory, state, due, timeout):
+    late = max(0.0, perf_counter() - due)
+    emergency_type, payload = factory.make()
+    sent_at = time()
+    started = perf_counter()
+    try:
+        response = session.post(f"{url}/calls", json=payload, timeout=timeout)
+        latency = perf_counter() - started
+        if response.status_code == 201:
+            state.record(True, latency, late, response.json().get('raw_id'), sent_at, emergency_type)
+        else:
+            state.record(False, latency, late)
+    except requests.RequestException:
+        state.record(False, perf_counter() - started, late)
+
+
+# -------------------------------
+# Observers
+# -------------------------------
+def queue_depth(session, url):
+    """crisislens_queue_depth from GET /metrics (None if the API doesn't answer)."""
+    try:
+        body = session.get(f"{url}/metrics", timeout=5).text
+    except requests.RequestException:
+        return None
+    for line in body.splitlines():
+        if line.startswith('crisislens_queue_depth '):
+            return float(line.split()[1])
+    return None
+
+
+def poll_enriched(state):
+    """Move calls that now have an enriched_calls row out of `pending`."""
+    with state.lock:
+        pending = dict(state.pending)
+    if not pending:
+        return
+    with get_connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute(
+            "SELECT raw_call_id, emergency_type FROM enriched_calls WHERE raw_call_id BETWEEN %s AND %s",
+            (min(pending), max(pending)),
+        )
+        rows = cursor.fetchall()
+        cursor.close()
+    now = time()
+    with state.lock:
+        for raw_id, emergency_type in rows:
+            entry = state.pending.pop(raw_id, None)
+            if entry is not None:
+                sent_at, intended = entry
+                state.enriched.append((now - sent_at, emergency_type == intended))
+
+
+def sample(state, session, url, started, target_rate, interval_seconds, track_enrichment):
+    interval = state.take_interval()
+    if track_enrichment:
+        try:
+            poll_enriched(state)
+        except Exception as e:
+            print(f"⚠️  Could not poll enriched_calls: {e}")
+    with state.lock:
+        pending = len(state.pending)
+        oldest = min((sent_at for sent_at, _ in state.pending.values()), default=None)
+        enriched = len(state.enriched)
+    latencies = interval['latencies']
+    return {
+        't': round(perf_counter() - started, 1),
+        'target_rate': target_rate,
+        'rate': interval['sent'] / interval_seconds,
+        'sent': interval['sent'],
+        'ok': interval['ok'],
+        'errors': interval['errors'],
+        'ingest_p50_ms': percentile(latencies, 0.5) * 1000,
+        'ingest_p95_ms': percentile(latencies, 0.95) * 1000,
+        'ingest_max_ms': max(latencies) * 1000 if latencies else float('nan'),
+        'schedule_lag_max_ms': max(interval['late']) * 1000 if interval['late'] else 0.0,
+        'queue_depth': queue_depth(session, url),
+        'enriched_total': enriched if track_enrichment else None,
+        'pending': pending if track_enrichment else None,
+        'enrichment_lag_s': (time() - oldest if oldest else 0.0) if track_enrichment else None,
+    }
+
+
+def print_sample(row):
+    def fmt(value, spec):
+        return format(value, spec) if value is not None else '-'
+    print(f"{row['t']:>6.1f}s  target {row['target_rate']:>6.1f}/s  sent {row['rate']:>6.1f}/s  "
+          f"err {row['errors']:>3}  ingest p50 {row['ingest_p50_ms']:>7.1f} p95 {row['ingest_p95_ms']:>7.1f} ms  "
+          f"queue {fmt(row['queue_depth'], '>5.0f')}  enriched {fmt(row['enriched_total'], '>6')}  "
+          f"pending {fmt(row['pending'], '>5')}  lag {fmt(row['enrichment_lag_s'], '>6.1f')}s")
+
+
+# -------------------------------
+# Main
+# -------------------------------
+def run(args):
+    random.seed(args.seed)
+    factory = CallFactory(fetch_township_coords(), args.seed)
+    offsets = schedule(args)
+    print(f"Profile {args.profile}: {len(offsets):,} calls over {args.duration}s "
+          f"against {args.url} with {args.concurrency} senders")
+
+    state = RunState()
+    local = threading.local()
+
+    def session():
+        if not hasattr(local, 'session'):
+            local.session = requests.Session()
+        return local.session
+
+    def worker(due):
+        send_call(session(), args.url, factory, state, due, args.timeout)
+
+    observer = requests.Session()
+    timeline = []
+    started = perf_counter()
+    next_sample = started + args.interval
+
+    with ThreadPoolExecutor(max_workers=args.concurrency) as pool:
+        for offset in offsets:
+            due = started + offset
+            while True:
+                now = perf_counter()
+                if now >= next_sample:
+                    row = sample(state, observer, args.url, started, rate_at(now - started, args),
+                                 args.interval, not args.no_db)
+                    timeline.append(row)
+                    print_sample(row)
+                    next_sample += args.interval
+                    continue
+                if now >= due:
+                    break
+                sleep(min(due, next_sample) - now)
+            pool.submit(worker, due)
+
+    sent_seconds = perf_counter() - started
+    # keep sampling until every sent call is enriched (or the drain timeout passes)
+    drain_deadline = perf_counter() + args.drain_timeout
+    while not args.no_db and perf_counter() < drain_deadline:
+        sleep(max(0.0, next_sample - perf_counter()))
+        row = sample(state, observer, args.url, started, 0.0, args.interval, True)
+        timeline.append(row)
+        print_sample(row)
+        next_sample += args.interval
+        if not row['pending']:
+            break
+
+    totals = state.totals
+    enrichment = [seconds for seconds, _ in state.enriched]
+    summary = {
+        'profile': args.profile,
+        'target_rate': args.rate,
+        'duration_s': args.duration,
+        'concurrency': args.concurrency,
+        'sent': totals['sent'],
+        'ok': totals['ok'],
+        'errors': totals['errors'],
+        'achieved_rate': totals['sent'] / sent_seconds if sent_seconds else 0.0,
+        'ingest_p50_ms': percentile(totals['latencies'], 0.5) * 1000,
+        'ingest_p95_ms': percentile(totals['latencies'], 0.95) * 1000,
+        'ingest_p99_ms': percentile(totals['latencies'], 0.99) * 1000,
+        'schedule_lag_p95_ms': percentile(totals['late'], 0.95) * 1000,
+        'max_queue_depth': max((r['queue_depth'] for r in timeline if r['queue_depth'] is not None), default=None),
+    }
+    if not args.no_db:
+        summary.update({
+            'enriched': len(enrichment),
+            'not_enriched': len(state.pending),
+            # measured to the poll that saw the row, so resolution is --interval
+            'enrichment_p50_s': percentile(enrichment, 0.5),
+            'enrichment_p95_s': percentile(enrichment, 0.95),
+            'type_agreement': (sum(match for _, match in state.enriched) / len(state.enriched)
+                               if state.enriched else None),
+        })
+    return summary, timeline
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Drive POST /calls at a target rate and watch the pipeline")
+    parser.add_argument('--url', default=API_URL)
+    parser.add_argument('--rate', type=float, default=5.0, help="base calls per second")
+    parser.add_argument('--duration', type=float, default=60.0, help="seconds of sending")
+    parser.add_argument('--concurrency', type=int, default=8, help="parallel HTTP senders")
+    parser.add_argument('--profile', choices=['steady', 'burst', 'ramp', 'spike'], default='steady')
+    parser.add_argument('--burst-factor', type=float, default=4.0)
+    parser.add_argument('--burst-every', type=float, default=20.0)
+    parser.add_argument('--burst-length', type=float, default=5.0)
+    parser.add_argument('--interval', type=float, default=1.0, help="seconds between samples")
+    parser.add_argument('--timeout', type=float, default=10.0, help="per-request timeout")
+    parser.add_argument('--drain-timeout', type=float, default=60.0,
+                        help="seconds to wait for enrichment to catch up after sending")
+    parser.add_argument('--no-db', action='store_true', help="don't poll enriched_calls (no enrichment lag)")
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--report', help="write summary + timeline as JSON")
+    args = parser.parse_args()
+
+    summary, timeline = run(args)
+
+    print("\n" + "=" * 60)
+    print("LOAD TEST SUMMARY")
+    print("=" * 60)
+    for key, value in summary.items():
+        print(f"  {key:<22} {value:.3f}" if isinstance(value, float) else f"  {key:<22} {value}")
+
+    if args.report:
+        with open(args.report, 'w') as f:
+            json.dump({'args': vars(args), 'summary': summary, 'timeline': timeline}, f, indent=2)
+        print(f"\n✅ Report written to {args.report}")
+
+
+if __name__ == '__main__':
+    main()
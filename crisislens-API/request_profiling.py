@@ -0,0 +1,258 @@
+"""
+Request-scoped profiling for the Flask API.
+
+For every request this records SQL query count/time/rows (via wrapped
+get_connection cursors), named sections such as clustering or serialization,
+and total time. It returns them in a Server-Timing header and keeps rolling
+per-route percentiles. Slow requests can optionally be captured with a
+sampling profiler and dumped as collapsed stacks (flamegraph input).
+"""
+import os
+import sys
+import random
+import threading
+from collections import defaultdict, deque, Counter
+from contextlib import contextmanager
+from datetime import datetime
+from time import perf_counter
+
+from flask import g, request, has_request_context
+
+WINDOW = 1000  # requests kept per route for percentiles
+PROFILE_SLOW_MS = float(os.getenv("API_PROFILE_SLOW_MS", "0"))          # 0 = profiler off
+PROFILE_SAMPLE_RATE = float(os.getenv("API_PROFILE_SAMPLE_RATE", "1.0"))  # fraction of requests sampled
+PROFILE_INTERVAL = 0.005  # seconds between stack samples
+PROFILE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "logs", "profiles")
+UNMATCHED_ROUTE = "<unmatched>"  # one shared key for 404s, so scanners can't grow _route_stats
+
+_route_stats = defaultdict(lambda: {"total": deque(maxlen=WINDOW), "db": deque(maxlen=WINDOW)})
+_stats_lock = threading.Lock()
+
+
+class RequestProfile:
+    def __init__(self):
+        self.started = perf_counter()
+        self.queries = 0
+        self.sql_seconds = 0.0
+        self.rows = 0
+        self.sections = defaultdict(float)
+        self.sampler = None
+
+
+def current_profile():
+    return getattr(g, "profile", None) if has_request_context() else None
+
+
+@contextmanager
+def section(name):
+    """Time a named block of the current request (no-op outside a request)."""
+    profile = current_profile()
+    started = perf_counter()
+    try:
+        yield
+    finally:
+        if profile is not None:
+            profile.sections[name] += perf_counter() - started
+
+
+# -------------------------
+# Database instrumentation
+# -------------------------
+class ProfiledCursor:
+    """Cursor proxy that charges execute/fetch time and rows to the current request."""
+
+    def __init__(self, cursor):
+        self._cursor = cursor
+
+    def _timed(self, fn, *args, count_query=False, **kwargs):
+        started = perf_counter()
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            profile = current_profile()
+            if profile is not None:
+                profile.sql_seconds += perf_counter() - started
+                if count_query:
+                    profile.queries += 1
+
+    def execute(self, *args, **kwargs):
+        return self._timed(self._cursor.execute, *args, count_query=True, **kwargs)
+
+    def executemany(self, *args, **kwargs):
+        return self._timed(self._cursor.executemany, *args, count_query=True, **kwargs)
+
+    def fetchall(self):
+        rows = self._timed(self._cursor.fetchall)
+        self._count_rows(len(rows))
+        return rows
+
+    def fetchmany(self, *args, **kwargs):
+        rows = self._timed(self._cursor.fetchmany, *args, **kwargs)
+        self._count_rows(len(rows))
+        return rows
+
+    def fetchone(self):
+        row = self._timed(self._cursor.fetchone)
+        self._count_rows(1 if row is not None else 0)
+        return row
+
+    def _count_rows(self, n):
+        profile = current_profile()
+        if profile is not None:
+            profile.rows += n
+
+    def __enter__(self):
+        self._cursor.__enter__()
+        return self
+
+    def __exit__(self, *exc):
+        return self._cursor.__exit__(*exc)
+
+    def __getattr__(self, name):
+        return getattr(self._cursor, name)
+
+
+class ProfiledConnection:
+    def __init__(self, conn):
+        self._conn = conn
+
+    def cursor(self, *args, **kwargs):
+        return ProfiledCursor(self._conn.cursor(*args, **kwargs))
+
+    def __getattr__(self, name):
+        return getattr(self._conn, name)
+
+
+def profiled_connections(get_connection):
+    """Wrap a get_connection() context manager so its cursors report to the request profile."""
+    @contextmanager
+    def wrapper(*args, **kwargs):
+        with get_connection(*args, **kwargs) as conn:
+            yield ProfiledConnection(conn)
+    return wrapper
+
+
+# -------------------------
+# Sampling profiler
+# -------------------------
+class StackSampler:
+    """Samples one thread's Python stack on a timer; cheap enough to leave on for slow-request capture."""
+
+    def __init__(self, thread_id, interval=PROFILE_INTERVAL):
+        self.thread_id = thread_id
+        self.interval = interval
+        self.stacks = Counter()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="request-sampler", daemon=True)
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append(f"{os.path.basename(code.co_filename)}:{code.co_name}:{frame.f_lineno}")
+                frame = frame.f_back
+            if stack:
+                self.stacks[";".join(reversed(stack))] += 1
+
+    def dump(self, route, total_ms):
+        os.makedirs(PROFILE_DIR, exist_ok=True)
+        name = route.strip("/").replace("/", "_").replace("<", "").replace(">", "") or "root"
+        path = os.path.join(PROFILE_DIR, f"{name}_{datetime.now():%Y%m%d_%H%M%S_%f}_{int(total_ms)}ms.txt")
+        with open(path, "w", encoding="utf-8") as f:
+            for stack, count in self.stacks.most_common():
+                f.write(f"{stack} {count}\n")
+        return path
+
+
+# -------------------------
+# Flask hooks
+# -------------------------
+def percentile(values, q):
+    """Quantile of raw samples: the sample at rank round(q * (n - 1)); NaN when empty."""
+    ordered = sorted(values)
+    if not ordered:
+        return float("nan")
+    index = min(len(ordered) - 1, int(round(q * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def route_summaries(quantiles=(0.5, 0.95, 0.99)):
+    """{route: {"count": n, "total": {...}, "db": {...}}} over the rolling window; each holds quantiles + "sum"."""
+    with _stats_lock:
+        snapshot = {route: {k: list(v) for k, v in stats.items()} for route, stats in _route_stats.items()}
+    return {
+        route: {
+            "count": len(stats["total"]),
+            "total": {**{q: percentile(stats["total"], q) for q in quantiles}, "sum": sum(stats["total"])},
+            "db": {**{q: percentile(stats["db"], q) for q in quantiles}, "sum": sum(stats["db"])},
+        }
+        for route, stats in snapshot.items()
+    }
+
+
+def render_route_summaries():
+    """Prometheus summary lines for per-route request and SQL time."""
+    lines = []
+    for metric, field, help_text in [
+        ("crisislens_http_request_seconds", "total", "Request time per route over the last requests."),
+        ("crisislens_http_request_db_seconds", "db", "SQL time per request per route over the last requests."),
+    ]:
+        lines += [f"# HELP {metric} {help_text}", f"# TYPE {metric} summary"]
+        for route, summary in route_summaries().items():
+            values = dict(summary[field])
+            total = values.pop("sum")
+            for q, value in values.items():
+                lines.append(f'{metric}{{route="{route}",quantile="{q}"}} {value!r}')
+            lines.append(f'{metric}_sum{{route="{route}"}} {total!r}')
+            lines.append(f'{metric}_count{{route="{route}"}} {summary["count"]}')
+    return "\n".join(lines) + "\n"
+
+
+def init_app(app):
+    """Install before/after request hooks that build the profile and Server-Timing header."""
+
+    @app.before_request
+    def _start_profile():
+        g.profile = RequestProfile()
+        if PROFILE_SLOW_MS > 0 and random.random() < PROFILE_SAMPLE_RATE:
+            g.profile.sampler = StackSampler(threading.get_ident()).start()
+
+    @app.after_request
+    def _finish_profile(response):
+        profile = current_profile()
+        if profile is None:
+            return response
+
+        total = perf_counter() - profile.started
+        route = request.url_rule.rule if request.url_rule else UNMATCHED_ROUTE
+
+        timings = [
+            f'db;dur={profile.sql_seconds * 1000:.1f};desc="{profile.queries} queries, {profile.rows} rows"'
+        ]
+        timings += [f"{name};dur={seconds * 1000:.1f}" for name, seconds in profile.sections.items()]
+        timings.append(f"total;dur={total * 1000:.1f}")
+        response.headers["Server-Timing"] = ", ".join(timings)
+
+        with _stats_lock:
+            stats = _route_stats[route]
+            stats["total"].append(total)
+            stats["db"].append(profile.sql_seconds)
+
+        if profile.sampler is not None:
+            profile.sampler.stop()
+            if total * 1000 >= PROFILE_SLOW_MS:
+                path = profile.sampler.dump(route, total * 1000)
+                print(f"🐢 Slow request {route} took {total * 1000:.0f}ms; profile saved to {path}")
+        return response
+
+    return app
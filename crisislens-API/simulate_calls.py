@@ -57,39 +57,49 @@ def random_age():
     return random.randint(18, 85)
 
 # -------------------------------
-# 4. Insert Simulated Raw Call
+# 4. Build / Insert Simulated Raw Call
 # -------------------------------
-def insert_simulated_call(township_coords):
-    """Insert one simulated raw call using real township + jittered coordinates."""
+def random_call(township_coords, description=None):
+    """One simulated call (real township + jittered coordinates) as a raw_calls row dict."""
     township = random.choice(list(township_coords.keys()))
     base_lat, base_lon = township_coords[township]
-    lat = round(base_lat + random.uniform(-0.002, 0.002), 6)
-    lon = round(base_lon + random.uniform(-0.002, 0.002), 6)
+    return {
+        'timestamp': datetime.datetime.now() - datetime.timedelta(minutes=random.randint(0, 1440)),
+        'description': description or random_description(),
+        'latitude': round(base_lat + random.uniform(-0.002, 0.002), 6),
+        'longitude': round(base_lon + random.uniform(-0.002, 0.002), 6),
+        'township': township,
+        'gender': random_gender(),
+        'age': random_age(),
+    }
 
-    timestamp = datetime.datetime.now() - datetime.timedelta(minutes=random.randint(0, 1440))
-    description = random_description()
-    gender = random_gender()
-    age = random_age()
-
-    conn = mysql.connector.connect(**DB_CONFIG)
+def insert_simulated_call(township_coords, conn):
+    """Insert one simulated raw call on an open connection."""
+    call = random_call(township_coords)
     cursor = conn.cursor()
     cursor.execute("""
         INSERT INTO raw_calls (timestamp, description, latitude, longitude, township, gender, age, processed)
         VALUES (%s, %s, %s, %s, %s, %s, %s, 0)
-    """, (timestamp, description, lat, lon, township, gender, age))
+    """, (call['timestamp'], call['description'], call['latitude'], call['longitude'],
+          call['township'], call['gender'], call['age']))
     conn.commit()
     cursor.close()
-    conn.close()
 
-    print(f"✅ Inserted simulated call: {description} in {township} @ {lat},{lon}")
+    print(f"✅ Inserted simulated call: {call['description']} in {call['township']} "
+          f"@ {call['latitude']},{call['longitude']}")
 
 # -------------------------------
 # 5. Main Function
 # -------------------------------
 def simulate_calls(n=10):
+    """Write n calls straight into raw_calls (no API, no queue); see load_generator.py for load tests."""
     township_coords = fetch_township_coords()
-    for _ in range(n):
-        insert_simulated_call(township_coords)
+    conn = mysql.connector.connect(**DB_CONFIG)
+    try:
+        for _ in range(n):
+            insert_simulated_call(township_coords, conn)
+    finally:
+        conn.close()
 
 if __name__ == '__main__':
     simulate_calls(20)  # Change number as needed
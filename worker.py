@@ -11,7 +11,7 @@ sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 from Classifier.production.tasks import process_emergency_call
 
 listen = ['crisislens']
-redis_conn = Redis(host='localhost', port=6379, db=0)
+redis_conn = Redis.from_url(os.getenv('REDIS_URL', 'redis://localhost:6379/0'))
 
 if __name__ == '__main__':
     print("🚀 CrisisLens Worker Starting...")